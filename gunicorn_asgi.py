@@ -0,0 +1,22 @@
+# gunicorn_asgi.py - PERFIL DE DEPLOY ASGI
+# Uso: gunicorn -c gunicorn_asgi.py ponto.asgi:application
+# Workers uvicorn atendem várias requisições por processo enquanto esperam o banco;
+# ponto/asgi.py ativa as views assíncronas do kiosk (PONTO_ASYNC_VIEWS).
+import multiprocessing
+import os
+
+# Vários workers: o cache do Django (resposta de /api/ultimo-ponto/) precisa ser compartilhado entre eles
+os.environ.setdefault('PONTO_CACHE_BACKEND', 'arquivo')
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+
+
+def on_starting(server):
+    # Métricas (PONTO_METRICAS_DIR): descarta os arquivos dos workers da execução anterior
+    from main.metricas import limpar_diretorio_metricas
+    limpar_diretorio_metricas(os.environ.get('PONTO_METRICAS_DIR'))
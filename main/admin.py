@@ -1,13 +1,20 @@
 from django.contrib import admin
-from .models import Funcionario, RegistroPonto
-from django.http import HttpResponse
+from .models import Escala, Feriado, Funcionario, RegistroPonto, TarefaRelatorio
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.html import format_html
 from datetime import timedelta
-from .utils import gerar_relatorio_ponto_pdf
+from .banco_horas import saldo_atual_subquery
+from .cache_pdf import obter_relatorio_pdf
+from .fuso import DIAS_SEMANA, horario_local
+from .fila_relatorios import enfileirar_relatorio
+from .relatorios_lote import zip_relatorios
+from .utils import formatar_minutos, formatar_saldo, periodo_mes_atual
 
 
 class AdminFuncionario(admin.ModelAdmin):
-    list_display = ("id", "nome_completo", 'cpf', 'telefone', 'cargo', 'data_admissao')
+    list_display = ("id", "nome_completo", 'cpf', 'telefone', 'cargo', 'data_admissao', 'banco_horas')
     list_display_links = ("id", "nome_completo")
     list_filter = ['cargo', 'data_admissao']
     search_fields = ['user__first_name', 'user__last_name', 'user__username', 'cpf']
@@ -19,43 +26,67 @@ class AdminFuncionario(admin.ModelAdmin):
             'fields': ('cpf', 'telefone', 'data_nascimento', 'endereco')
         }),
         ('Informações Profissionais', {
-            'fields': ('cargo', 'data_admissao')
+            'fields': ('cargo', 'escala', 'data_admissao'),
+            'description': 'Sem escala própria vale a escala do cargo e, sem ela, 7h30 de segunda a sexta.'
         }),
     )
 
     # 🟢 ACTION PARA GERAR RELATÓRIO EM PDF
-    actions = ['gerar_relatorio_mensal_pdf']
+    actions = ['gerar_relatorio_mensal_pdf', 'enfileirar_relatorio_mensal']
+
+    def get_queryset(self, request):
+        # Funcionario.__str__ e nome_completo leem o User: um JOIN em vez de uma consulta por linha;
+        # o saldo do banco de horas vem de uma subconsulta na mesma consulta
+        return super().get_queryset(request).select_related('user').annotate(
+            saldo_banco_horas=saldo_atual_subquery())
 
     def nome_completo(self, obj):
-        return obj.user.get_full_name() or obj.user.username
+        return str(obj)
 
     nome_completo.short_description = 'Nome'
     nome_completo.admin_order_field = 'user__first_name'
 
+    def banco_horas(self, obj):
+        return formatar_saldo(obj.saldo_banco_horas)
+
+    banco_horas.short_description = 'Banco de horas'
+    banco_horas.admin_order_field = 'saldo_banco_horas'
+
     def gerar_relatorio_mensal_pdf(self, request, queryset):
         """
         Gera relatório mensal em PDF para funcionários selecionados
+        (vários funcionários: um ZIP com um PDF para cada)
         """
-        if len(queryset) != 1:
-            self.message_user(request, "❌ Selecione apenas UM funcionário para gerar o relatório.", level='ERROR')
-            return
-
-        funcionario = queryset[0]
+        funcionarios = list(queryset)
 
         # Definir período do mês atual
         hoje = timezone.now().date()
         primeiro_dia_mes = hoje.replace(day=1)
         ultimo_dia_mes = (primeiro_dia_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
+        if len(funcionarios) > 1:
+            # 🆕 PDFs gerados em paralelo (PONTO_RELATORIOS_WORKERS processos) e enviados em streaming;
+            # resumo.csv no ZIP traz o status e o erro de cada funcionário
+            response = StreamingHttpResponse(
+                zip_relatorios([funcionario.pk for funcionario in funcionarios], primeiro_dia_mes, ultimo_dia_mes),
+                content_type='application/zip'
+            )
+            nome_arquivo = f"relatorios_ponto_{hoje.strftime('%Y_%m')}.zip"
+            response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+            self.message_user(request, f"📦 Gerando {len(funcionarios)} relatórios (ZIP)")
+            return response
+
+        funcionario = funcionarios[0]
+
         try:
-            # Gerar PDF
-            buffer = gerar_relatorio_ponto_pdf(funcionario, primeiro_dia_mes, ultimo_dia_mes)
+            # Gerar PDF (ou reaproveitar do cache em disco, se o período não mudou)
+            caminho, _ = obter_relatorio_pdf(funcionario.pk, primeiro_dia_mes, ultimo_dia_mes)
 
             # Configurar resposta
             nome_arquivo = f"relatorio_ponto_{funcionario.user.username}_{hoje.strftime('%Y_%m')}.pdf"
 
-            response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+            response = FileResponse(open(caminho, 'rb'), as_attachment=True, filename=nome_arquivo,
+                                    content_type='application/pdf')
 
             self.message_user(request, f"✅ Relatório gerado com sucesso para {self.nome_completo(funcionario)}")
             return response
@@ -63,7 +94,19 @@ class AdminFuncionario(admin.ModelAdmin):
         except Exception as e:
             self.message_user(request, f"❌ Erro ao gerar relatório: {str(e)}", level='ERROR')
 
-    gerar_relatorio_mensal_pdf.short_description = "📄 Gerar relatório mensal (PDF)"
+    gerar_relatorio_mensal_pdf.short_description = "📄 Gerar relatório mensal (PDF / ZIP)"
+
+    def enfileirar_relatorio_mensal(self, request, queryset):
+        """
+        Enfileira o relatório do mês atual; o arquivo fica em "Tarefas de Relatório" quando pronto
+        """
+        data_inicio, data_fim = periodo_mes_atual()
+        tarefa = enfileirar_relatorio(queryset.values_list('pk', flat=True), data_inicio, data_fim,
+                                      solicitado_por=request.user)
+        self.message_user(request, f"⏳ Relatório #{tarefa.pk} na fila ({tarefa.total} funcionário(s)). "
+                                   f"Acompanhe em Tarefas de Relatório.")
+
+    enfileirar_relatorio_mensal.short_description = "⏳ Gerar relatório mensal em segundo plano"
 
 
 # 🟢 REGISTRE CADA MODELO APENAS UMA VEZ
@@ -89,14 +132,26 @@ class AdminRegistroPonto(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # funcionario_nome e RegistroPonto.__str__ (ações, exclusão) leem funcionário + usuário
+        return super().get_queryset(request).select_related('funcionario__user')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'funcionario':
+            # As opções do select chamam Funcionario.__str__ para cada funcionário
+            kwargs['queryset'] = Funcionario.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     def funcionario_nome(self, obj):
-        return obj.funcionario.user.get_full_name() or obj.funcionario.user.username
+        return str(obj.funcionario)
 
     funcionario_nome.short_description = 'Funcionário'
     funcionario_nome.admin_order_field = 'funcionario__user__first_name'
 
     def timestamp_formatado(self, obj):
-        return obj.timestamp.strftime('%d/%m/%Y %H:%M')
+        # Horário de Manaus, como no histórico e nos relatórios
+        horario = horario_local(obj.timestamp)
+        return f"{horario.data_formatada} {horario.hora}"
 
     timestamp_formatado.short_description = 'Data/Hora'
     timestamp_formatado.admin_order_field = 'timestamp'
@@ -107,4 +162,70 @@ class AdminRegistroPonto(admin.ModelAdmin):
             return obj.observacao[:50] + "..." if len(obj.observacao) > 50 else obj.observacao
         return "-"
 
-    observacao_resumida.short_description = 'Observação'
\ No newline at end of file
+    observacao_resumida.short_description = 'Observação'
+
+
+@admin.register(TarefaRelatorio)
+class AdminTarefaRelatorio(admin.ModelAdmin):
+    list_display = ('id', 'status', 'progresso', 'data_inicio', 'data_fim', 'solicitado_por', 'criada_em',
+                    'finalizada_em', 'download')
+    list_filter = ('status',)
+    list_select_related = ('solicitado_por',)
+    readonly_fields = ('status', 'funcionario_ids', 'concluidos', 'total', 'arquivo', 'erro', 'worker',
+                       'criada_em', 'iniciada_em', 'ultimo_sinal_em', 'finalizada_em')
+
+    def has_add_permission(self, request):
+        # Tarefas nascem pela ação de Funcionários ou pela API
+        return False
+
+    def progresso(self, obj):
+        return f"{obj.concluidos}/{obj.total}"
+
+    progresso.short_description = 'Progresso'
+
+    def download(self, obj):
+        if obj.status != TarefaRelatorio.CONCLUIDA:
+            return "-"
+        return format_html('<a href="{}">⬇️ Baixar</a>', reverse('main:relatorio_download_api', args=[obj.pk]))
+
+    download.short_description = 'Arquivo'
+
+
+@admin.register(Feriado)
+class AdminFeriado(admin.ModelAdmin):
+    list_display = ('data', 'dia_semana', 'descricao')
+    list_display_links = ('data', 'descricao')
+    search_fields = ('descricao',)
+    date_hierarchy = 'data'
+
+    def dia_semana(self, obj):
+        return DIAS_SEMANA[obj.data.weekday()]
+
+    dia_semana.short_description = 'Dia'
+
+
+@admin.register(Escala)
+class AdminEscala(admin.ModelAdmin):
+    list_display = ('nome', 'cargo', 'semana', 'total_semanal')
+    search_fields = ('nome', 'cargo')
+    fieldsets = (
+        (None, {
+            'fields': ('nome', 'cargo')
+        }),
+        ('Minutos previstos por dia (0 = folga)', {
+            'fields': Escala.CAMPOS_SEMANA,
+            'description': 'Alterações valem do dia atual em diante; dias passados mantêm a jornada prevista da época.'
+        }),
+    )
+
+    def semana(self, obj):
+        return ' | '.join(
+            f"{dia[:3]} {formatar_minutos(minutos)}" for dia, minutos in zip(DIAS_SEMANA, obj.minutos_semana) if minutos
+        )
+
+    semana.short_description = 'Jornada por dia'
+
+    def total_semanal(self, obj):
+        return formatar_minutos(sum(obj.minutos_semana))
+
+    total_semanal.short_description = 'Total semanal'
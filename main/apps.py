@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metricas import instalar_medicao_consultas
+
+        # Contagem de consultas por requisição (main/metricas.py)
+        connection_created.connect(instalar_medicao_consultas, dispatch_uid='ponto_medicao_consultas')
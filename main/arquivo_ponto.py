@@ -0,0 +1,240 @@
+# arquivo_ponto.py - ARQUIVAMENTO MENSAL DE RegistroPonto (TABELA QUENTE PEQUENA)
+# Meses fechados são movidos em lotes para RegistroPontoArquivado (manage.py arquivar_registros).
+# Consultas de histórico/relatório pedem os registros por registros_periodo(): se o período não chega
+# aos meses arquivados (o caso do dia a dia), é o QuerySet de sempre sobre RegistroPonto; senão,
+# RegistrosComArquivo, que aplica os mesmos filtros nas duas tabelas e avalia um UNION ALL ordenado.
+# Um dia de um funcionário nunca fica dividido entre as tabelas (o dia do último ponto de cada
+# funcionário fica na quente e RegistroPonto.clean recusa registros em dias já arquivados), então
+# pareamentos por dia valem em cada parte do UNION.
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from .banco_horas import mes_de, proximo_mes
+from .fuso import data_local, inicio_do_dia
+from .models import EstadoPonto, MesArquivado, RegistroPonto, RegistroPontoArquivado
+from .utils import filtrar_periodo, limites_periodo_manaus
+
+CAMPOS_ARQUIVADOS = ('id', 'funcionario_id', 'tipo', 'timestamp', 'observacao')
+
+
+def limite_arquivo():
+    """
+    Primeiro dia depois do último mês arquivado (ou em arquivamento); None se nada foi arquivado
+    """
+    ultimo = MesArquivado.objects.aggregate(ultimo=Max('mes'))['ultimo']
+    return proximo_mes(ultimo) if ultimo else None
+
+
+def precisa_arquivo(data_inicio):
+    """
+    O período que começa em data_inicio (None = desde sempre) chega aos meses arquivados?
+    Só meses fechados são arquivados: a partir do mês atual a resposta é não, sem consulta.
+    """
+    if data_inicio is not None and data_inicio >= mes_de(timezone.localdate()):
+        return False
+    limite = limite_arquivo()
+    return limite is not None and (data_inicio is None or data_inicio < limite)
+
+
+def dia_arquivado(funcionario_id, timestamp):
+    """
+    O dia local do timestamp já tem registros do funcionário no arquivo? Um registro novo nesse dia
+    o dividiria entre as tabelas. A partir do mês atual a resposta é não, sem consulta.
+    """
+    dia = data_local(timestamp)
+    if not precisa_arquivo(dia):
+        return False
+    return RegistroPontoArquivado.objects.filter(
+        funcionario_id=funcionario_id, timestamp__gte=inicio_do_dia(dia),
+        timestamp__lt=inicio_do_dia(dia + timedelta(days=1))
+    ).exists()
+
+
+def registros_periodo(data_inicio=None, data_fim=None):
+    """
+    Registros do período (datas locais, inclusivas): QuerySet de RegistroPonto ou, se o período
+    chega aos meses arquivados, RegistrosComArquivo com as duas tabelas
+    """
+    quentes = filtrar_periodo(RegistroPonto.objects.all(), data_inicio, data_fim)
+    if not precisa_arquivo(data_inicio):
+        return quentes
+    arquivados = filtrar_periodo(RegistroPontoArquivado.objects.all(), data_inicio, data_fim)
+    return RegistrosComArquivo([quentes, arquivados])
+
+
+class RegistrosComArquivo:
+    """
+    Registros quentes + arquivados com a parte da interface de QuerySet usada pelo histórico e pelos
+    relatórios. filter/exclude/annotate valem para as duas tabelas; a avaliação (iteração, fatia,
+    iterator, query) é um UNION ALL na ordem de order_by. Avalie por values()/values_list(): as
+    tabelas não têm as mesmas colunas de modelo.
+    """
+
+    def __init__(self, partes, ordem=(), campos=None, modo=None):
+        self.partes = partes
+        self.ordem = ordem
+        self.campos = campos
+        self.modo = modo
+
+    def _copiar(self, **mudancas):
+        atributos = {'partes': self.partes, 'ordem': self.ordem, 'campos': self.campos, 'modo': self.modo}
+        atributos.update(mudancas)
+        return RegistrosComArquivo(**atributos)
+
+    def filter(self, *args, **kwargs):
+        return self._copiar(partes=[parte.filter(*args, **kwargs) for parte in self.partes])
+
+    def exclude(self, *args, **kwargs):
+        return self._copiar(partes=[parte.exclude(*args, **kwargs) for parte in self.partes])
+
+    def annotate(self, *args, **kwargs):
+        return self._copiar(partes=[parte.annotate(*args, **kwargs) for parte in self.partes])
+
+    def order_by(self, *ordem):
+        return self._copiar(ordem=ordem)
+
+    def values(self, *campos):
+        return self._copiar(campos=campos, modo='dict')
+
+    def values_list(self, *campos, flat=False):
+        return self._copiar(campos=campos, modo='flat' if flat else 'tupla')
+
+    @property
+    def db(self):
+        return self.partes[0].db
+
+    def _extras(self):
+        # O ORDER BY de um UNION só aceita colunas do SELECT: as da ordenação que faltam entram
+        # no fim e saem das linhas devolvidas
+        extras = []
+        for campo in self.ordem:
+            campo = campo.lstrip('-')
+            if campo not in self.campos and campo not in extras:
+                extras.append(campo)
+        return extras
+
+    def _combinada(self, limite=None):
+        if self.campos is None:
+            raise TypeError('RegistrosComArquivo deve ser avaliado por values() ou values_list().')
+        colunas = (*self.campos, *self._extras())
+        partes = [parte.values_list(*colunas).order_by() for parte in self.partes]
+        if limite is not None and self.ordem and connections[self.db].features.supports_slicing_ordering_in_compound:
+            # Cada tabela devolve no máximo `limite` linhas, já pelo seu índice
+            partes = [parte.order_by(*self.ordem)[:limite] for parte in partes]
+        combinada = partes[0].union(*partes[1:], all=True)
+        return combinada.order_by(*self.ordem) if self.ordem else combinada
+
+    @property
+    def query(self):
+        return self._combinada().query
+
+    def _linhas(self, linhas):
+        quantidade = len(self.campos)
+        if self.modo == 'flat':
+            return (linha[0] for linha in linhas)
+        if self.modo == 'dict':
+            return (dict(zip(self.campos, linha)) for linha in linhas)
+        if self._extras():
+            return (linha[:quantidade] for linha in linhas)
+        return iter(linhas)
+
+    def iterator(self, chunk_size=None):
+        return self._linhas(self._combinada().iterator(chunk_size=chunk_size))
+
+    def __iter__(self):
+        return self._linhas(list(self._combinada()))
+
+    def __getitem__(self, fatia):
+        if not isinstance(fatia, slice) or fatia.step is not None or (fatia.start or 0) < 0 or fatia.stop is None:
+            raise TypeError('RegistrosComArquivo aceita só fatias [inicio:fim].')
+        return list(self._linhas(list(self._combinada(fatia.stop)[fatia.start:fatia.stop])))
+
+
+# ---------- Arquivamento (manage.py arquivar_registros) ----------
+
+def meses_arquivaveis(meses_quentes, hoje=None):
+    """
+    Meses com registros na tabela quente anteriores ao corte (mês atual - meses_quentes), do mais antigo
+    """
+    corte = mes_de(hoje or timezone.localdate())
+    for _ in range(meses_quentes):
+        corte = mes_de(corte - timedelta(days=1))
+
+    primeiro = RegistroPonto.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    if primeiro is None:
+        return []
+    meses = []
+    mes = mes_de(data_local(primeiro))
+    while mes < corte:
+        meses.append(mes)
+        mes = proximo_mes(mes)
+    return meses
+
+
+def _dias_fixos(inicio, fim):
+    """
+    Dia local do último ponto de cada funcionário no período: fica na tabela quente
+    (EstadoPonto.ultimo_registro aponta para ele e o dia não pode ficar dividido)
+    """
+    fixos = []
+    for funcionario_id, ultimo_timestamp in EstadoPonto.objects.filter(
+        ultimo_registro__isnull=False, ultimo_timestamp__gte=inicio, ultimo_timestamp__lt=fim
+    ).values_list('funcionario_id', 'ultimo_timestamp'):
+        dia = data_local(ultimo_timestamp)
+        fixos.append(Q(funcionario_id=funcionario_id, timestamp__gte=inicio_do_dia(dia),
+                       timestamp__lt=inicio_do_dia(dia + timedelta(days=1))))
+    return fixos
+
+
+def _apagar_quentes(menor_id, maior_id):
+    """
+    Remove da tabela quente os registros do lote que já estão no arquivo. SQL direto: o delete() do ORM
+    dispararia os signals, que recalculariam estado e jornada de cada registro
+    """
+    conexao = connections[RegistroPonto.objects.db]
+    quentes = conexao.ops.quote_name(RegistroPonto._meta.db_table)
+    arquivados = conexao.ops.quote_name(RegistroPontoArquivado._meta.db_table)
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quentes} WHERE id BETWEEN %s AND %s '
+            f'AND id IN (SELECT id FROM {arquivados} WHERE id BETWEEN %s AND %s)',
+            [menor_id, maior_id, menor_id, maior_id]
+        )
+
+
+def arquivar_mes(mes, tamanho_lote=5000, max_lotes=None):
+    """
+    Move os registros do mês para o arquivo, um lote por transação. Pode ser interrompido e
+    retomado a qualquer momento. Devolve (registros movidos, concluído?)
+    """
+    # Registrado antes de mover: a partir daqui as consultas do período já incluem o arquivo
+    MesArquivado.objects.get_or_create(mes=mes)
+
+    inicio, fim = limites_periodo_manaus(mes, proximo_mes(mes) - timedelta(days=1))
+    pendentes = RegistroPonto.objects.filter(timestamp__gte=inicio, timestamp__lt=fim)
+    for fixo in _dias_fixos(inicio, fim):
+        pendentes = pendentes.exclude(fixo)
+
+    movidos = lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        with transaction.atomic():
+            linhas = list(pendentes.select_for_update().order_by('id').values(*CAMPOS_ARQUIVADOS)[:tamanho_lote])
+            if not linhas:
+                break
+            RegistroPontoArquivado.objects.bulk_create(
+                [RegistroPontoArquivado(**linha) for linha in linhas], batch_size=1000, ignore_conflicts=True
+            )
+            _apagar_quentes(linhas[0]['id'], linhas[-1]['id'])
+            MesArquivado.objects.filter(mes=mes).update(registros=F('registros') + len(linhas))
+        movidos += len(linhas)
+        lotes += 1
+    else:
+        # Limite de lotes atingido: o mês continua pendente (concluido_em vazio)
+        if pendentes.exists():
+            return movidos, False
+
+    MesArquivado.objects.filter(mes=mes).update(concluido_em=timezone.now())
+    return movidos, True
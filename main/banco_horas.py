@@ -0,0 +1,161 @@
+# banco_horas.py - BANCO DE HORAS MENSAL COM SALDO ACUMULADO (BancoHoras)
+# O saldo do mês é a soma dos saldos de JornadaDiaria; o acumulado carrega o do mês anterior.
+# Uma alteração de jornada recalcula só do mês afetado em diante, partindo do acumulado já gravado
+# antes dele: o histórico anterior não é relido. O saldo atual é a linha mais recente (uma consulta).
+# No caso comum (ponto do kiosk, dia do mês mais recente do funcionário) nem isso: somar_saldo_dos_dias
+# aplica a diferença do dia ao mês e ao acumulado num único UPDATE.
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import BancoHoras, JornadaDiaria
+
+_CAMPOS_ATUALIZADOS = ('saldo_mes_minutos', 'saldo_acumulado_minutos', 'atualizado_em')
+
+
+def mes_de(data):
+    return data.replace(day=1)
+
+
+def proximo_mes(mes):
+    return (mes + timedelta(days=32)).replace(day=1)
+
+
+def saldos_mensais(filtro=None):
+    """
+    {funcionario_id: {mes: soma de saldo_minutos}} das jornadas que atendem ao filtro
+    """
+    jornadas = JornadaDiaria.objects.all()
+    if filtro is not None:
+        jornadas = jornadas.filter(filtro)
+    # order_by() vazio: a ordenação padrão por data entraria no GROUP BY
+    linhas = jornadas.order_by().annotate(mes=TruncMonth('data')).values('funcionario_id', 'mes').annotate(
+        saldo=Sum('saldo_minutos')).values_list('funcionario_id', 'mes', 'saldo')
+
+    saldos = defaultdict(dict)
+    for funcionario_id, mes, saldo in linhas:
+        saldos[funcionario_id][mes] = saldo
+    return saldos
+
+
+def montar_meses(funcionario_id, inicio, fim, acumulado, saldos):
+    """
+    [BancoHoras] (não gravados) de inicio a fim, mês a mês, somando ao acumulado anterior
+    """
+    linhas = []
+    mes = inicio
+    while mes <= fim:
+        saldo_mes = saldos.get(mes, 0)
+        acumulado += saldo_mes
+        linhas.append(BancoHoras(funcionario_id=funcionario_id, mes=mes, saldo_mes_minutos=saldo_mes,
+                                 saldo_acumulado_minutos=acumulado))
+        mes = proximo_mes(mes)
+    return linhas
+
+
+def somar_saldo_dos_dias(funcionario_id, mes, datas, saldo_novo):
+    """
+    Dias alterados dentro do mês mais recente do funcionário: um UPDATE soma ao mês e ao acumulado a
+    diferença entre saldo_novo (soma dos dias recalculados) e o que JornadaDiaria ainda tem gravado
+    para eles, então deve rodar antes do upsert das jornadas. False (nada alterado) se o mês não é a
+    última linha do funcionário: aí vale atualizar_banco_horas.
+    """
+    diferenca = Value(saldo_novo) - Coalesce(Subquery(
+        JornadaDiaria.objects.filter(funcionario_id=funcionario_id, data__in=datas).order_by()
+        .values('funcionario_id').annotate(saldo=Sum('saldo_minutos')).values('saldo')
+    ), 0)
+    return BancoHoras.objects.filter(
+        ~Exists(BancoHoras.objects.filter(funcionario_id=funcionario_id, mes__gt=mes)),
+        funcionario_id=funcionario_id, mes=mes,
+    ).update(
+        saldo_mes_minutos=F('saldo_mes_minutos') + diferenca,
+        saldo_acumulado_minutos=F('saldo_acumulado_minutos') + diferenca,
+        atualizado_em=timezone.now(),
+    ) > 0
+
+
+def atualizar_banco_horas(inicios):
+    """
+    inicios: {funcionario_id: primeira data alterada}. Duas leituras (linhas do banco a partir do mês
+    anterior à alteração e saldos das jornadas a partir dela) e um upsert dos meses recalculados;
+    o DELETE só acontece quando o último mês com jornada deixou de ter jornada.
+    """
+    if not inicios:
+        return
+    meses = {funcionario_id: mes_de(data) for funcionario_id, data in inicios.items()}
+
+    # Linhas do mês alterado em diante + a última antes dele (o acumulado de partida)
+    existentes = defaultdict(dict)
+    for funcionario_id, mes, acumulado in BancoHoras.objects.filter(reduce(or_, [
+        Q(funcionario_id=funcionario_id, mes__gte=mes)
+        | Q(pk=Subquery(BancoHoras.objects.filter(funcionario_id=funcionario_id, mes__lt=mes)
+                        .order_by('-mes').values('pk')[:1]))
+        for funcionario_id, mes in meses.items()
+    ])).values_list('funcionario_id', 'mes', 'saldo_acumulado_minutos'):
+        existentes[funcionario_id][mes] = acumulado
+
+    saldos = saldos_mensais(reduce(or_, [
+        Q(funcionario_id=funcionario_id, data__gte=mes) for funcionario_id, mes in meses.items()
+    ]))
+
+    gravar = []
+    remover = []
+    for funcionario_id, mes_inicial in meses.items():
+        atuais = existentes[funcionario_id]
+        anteriores = [mes for mes in atuais if mes < mes_inicial]
+        meses_com_jornada = saldos[funcionario_id]
+
+        if anteriores:
+            base = max(anteriores)
+            # Meses entre a base e a alteração não têm jornada (senão teriam linha): entram com saldo 0
+            inicio, acumulado = proximo_mes(base), atuais[base]
+            fim = max(meses_com_jornada, default=base)
+        elif meses_com_jornada:
+            inicio, acumulado = min(meses_com_jornada), 0
+            fim = max(meses_com_jornada)
+        else:
+            inicio = fim = None
+
+        if inicio is not None:
+            gravar.extend(montar_meses(funcionario_id, inicio, fim, acumulado, meses_com_jornada))
+
+        # Meses depois da última jornada (ou todos, se não sobrou nenhuma) deixam de existir
+        if any(mes >= mes_inicial and (fim is None or mes > fim) for mes in atuais):
+            remover.append(Q(funcionario_id=funcionario_id, mes__gte=mes_inicial) if fim is None
+                           else Q(funcionario_id=funcionario_id, mes__gt=fim))
+
+    if gravar:
+        BancoHoras.objects.bulk_create(gravar, batch_size=500, update_conflicts=True,
+                                       unique_fields=['funcionario', 'mes'], update_fields=_CAMPOS_ATUALIZADOS)
+    if remover:
+        BancoHoras.objects.filter(reduce(or_, remover)).delete()
+
+
+def reconstruir_banco_horas():
+    """
+    Reconstrói a tabela inteira a partir de JornadaDiaria (comandos de manutenção)
+    """
+    with transaction.atomic():
+        BancoHoras.objects.all().delete()
+        linhas = []
+        for funcionario_id, meses in saldos_mensais().items():
+            linhas.extend(montar_meses(funcionario_id, min(meses), max(meses), 0, meses))
+        BancoHoras.objects.bulk_create(linhas, batch_size=1000)
+    return len(linhas)
+
+
+def saldo_atual_subquery(campo='pk'):
+    """
+    Saldo acumulado mais recente do funcionário em OuterRef(campo), 0 sem banco de horas.
+    Para anotar querysets (admin, API): nenhuma consulta extra por linha.
+    """
+    return Coalesce(Subquery(
+        BancoHoras.objects.filter(funcionario_id=OuterRef(campo)).order_by('-mes')
+        .values('saldo_acumulado_minutos')[:1]
+    ), 0)
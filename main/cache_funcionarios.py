@@ -0,0 +1,142 @@
+# cache_funcionarios.py - CACHE DO MAPEAMENTO user_id -> FUNCIONÁRIO (POR PROCESSO)
+# Evita o SELECT em Funcionario a cada ponto/login/consulta. Invalidado pelos signals de
+# Funcionario e User (main/signals.py); o TTL limita a defasagem entre workers do gunicorn.
+from collections import namedtuple
+
+from django.conf import settings
+
+from .cache_local import CacheLRU
+from .models import Funcionario
+
+
+class FuncionarioResumo(namedtuple('FuncionarioResumo', 'id user_id username nome_completo')):
+    __slots__ = ()
+
+    @property
+    def nome(self):
+        # Mesmo critério de Funcionario.__str__
+        return self.nome_completo or self.username
+
+
+cache_funcionarios = CacheLRU(
+    max_itens=getattr(settings, 'PONTO_CACHE_FUNCIONARIOS_MAX', 5000),
+    ttl=getattr(settings, 'PONTO_CACHE_FUNCIONARIOS_TTL_SEGUNDOS', 300)
+)
+
+_CAMPOS = ('id', 'user_id', 'user__username', 'user__first_name', 'user__last_name')
+
+
+def _resumo(linha):
+    funcionario_id, user_id, username, first_name, last_name = linha
+    # Mesmo resultado de User.get_full_name()
+    return FuncionarioResumo(funcionario_id, user_id, username, f'{first_name} {last_name}'.strip())
+
+
+def _guardar(resumo):
+    cache_funcionarios.set(('user', resumo.user_id), resumo)
+    cache_funcionarios.set(('funcionario', resumo.id), resumo)
+    return resumo
+
+
+def obter_funcionario_por_user(user_id):
+    """
+    Resumo do funcionário associado ao usuário, ou None se o usuário não for funcionário
+    """
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    resumo = cache_funcionarios.get(('user', user_id))
+    if resumo is None:
+        linha = Funcionario.objects.filter(user_id=user_id).values_list(*_CAMPOS).first()
+        if linha is None:
+            return None
+        resumo = _guardar(_resumo(linha))
+    return resumo
+
+
+async def aobter_funcionario_por_user(user_id):
+    """
+    Versão assíncrona de obter_funcionario_por_user
+    """
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    resumo = cache_funcionarios.get(('user', user_id))
+    if resumo is None:
+        linha = await Funcionario.objects.filter(user_id=user_id).values_list(*_CAMPOS).afirst()
+        if linha is None:
+            return None
+        resumo = _guardar(_resumo(linha))
+    return resumo
+
+
+def obter_funcionarios(funcionario_ids):
+    """
+    {funcionario_id: FuncionarioResumo}; os que faltam no cache vêm numa única consulta
+    """
+    resumos = {}
+    faltantes = []
+    for funcionario_id in set(funcionario_ids):
+        resumo = cache_funcionarios.get(('funcionario', funcionario_id))
+        if resumo is None:
+            faltantes.append(funcionario_id)
+        else:
+            resumos[funcionario_id] = resumo
+
+    if faltantes:
+        for linha in Funcionario.objects.filter(pk__in=faltantes).values_list(*_CAMPOS):
+            resumo = _guardar(_resumo(linha))
+            resumos[resumo.id] = resumo
+
+    return resumos
+
+
+def obter_funcionarios_por_user(user_ids):
+    """
+    {user_id: FuncionarioResumo}; os que faltam no cache vêm numa única consulta
+    """
+    resumos = {}
+    faltantes = []
+    for user_id in set(user_ids):
+        resumo = cache_funcionarios.get(('user', user_id))
+        if resumo is None:
+            faltantes.append(user_id)
+        else:
+            resumos[user_id] = resumo
+
+    if faltantes:
+        for linha in Funcionario.objects.filter(user_id__in=faltantes).values_list(*_CAMPOS):
+            resumo = _guardar(_resumo(linha))
+            resumos[resumo.user_id] = resumo
+
+    return resumos
+
+
+def obter_funcionario(funcionario_id):
+    return obter_funcionarios([funcionario_id]).get(funcionario_id)
+
+
+def invalidar_funcionario(funcionario_id=None, user_id=None):
+    """
+    Remove as duas chaves (user e funcionario) do resumo afetado
+    """
+    pendentes = [('funcionario', funcionario_id), ('user', user_id)]
+    removidas = set()
+    while pendentes:
+        chave = pendentes.pop()
+        if chave[1] is None or chave in removidas:
+            continue
+        removidas.add(chave)
+        resumo = cache_funcionarios.delete(chave)
+        if resumo is not None:
+            # O resumo pode apontar para o outro lado (ex.: funcionário trocou de usuário)
+            pendentes.append(('funcionario', resumo.id))
+            pendentes.append(('user', resumo.user_id))
+
+
+def estatisticas_cache_funcionarios():
+    return cache_funcionarios.estatisticas()
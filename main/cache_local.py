@@ -0,0 +1,67 @@
+# cache_local.py - CACHE EM MEMÓRIA DO PROCESSO (LRU COM TTL OPCIONAL)
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache LRU limitado, seguro entre threads, com expiração opcional (TTL em segundos).
+    Vale apenas para o processo atual (cada worker do gunicorn tem o seu).
+    """
+
+    def __init__(self, max_itens=1024, ttl=None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave, _AUSENTE)
+            if item is not _AUSENTE:
+                valor, expira_em = item
+                if expira_em is None or expira_em > time.monotonic():
+                    self._dados.move_to_end(chave)
+                    self.hits += 1
+                    return valor
+                del self._dados[chave]
+            self.misses += 1
+            return padrao
+
+    def set(self, chave, valor):
+        expira_em = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_itens:
+                self._dados.popitem(last=False)
+
+    def delete(self, chave):
+        """
+        Remove a chave; devolve o valor removido (ou None)
+        """
+        with self._lock:
+            item = self._dados.pop(chave, None)
+        return item[0] if item else None
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def estatisticas(self):
+        return {
+            'itens': len(self._dados),
+            'max_itens': self.max_itens,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
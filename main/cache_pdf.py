@@ -0,0 +1,177 @@
+# cache_pdf.py - CACHE EM DISCO DOS RELATÓRIOS PDF (ENDEREÇADO POR CONTEÚDO)
+# A chave inclui uma impressão digital das jornadas (realizadas e previstas) e dos dias úteis do período:
+# qualquer ponto, feriado ou escala novo, editado ou excluído muda a chave, então não há invalidação
+# explícita. Arquivos antigos saem por LRU (tamanho).
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+# Modelos e utils são importados dentro das funções: este módulo também roda nos processos
+# do pool de main/relatorios_lote.py, importado antes do django.setup()
+
+# Mude quando o layout do PDF mudar: relatórios em cache com o layout antigo deixam de ser usados
+VERSAO_RELATORIO = 4
+
+# Campos de _resumo_periodo que entram na assinatura (ultima_alteracao vai no fim, em ISO)
+CAMPOS_ASSINATURA = ('dias', 'max_id', 'registros', 'dias_previstos', 'previstos')
+
+
+def diretorio_cache_pdf():
+    diretorio = Path(getattr(settings, 'PONTO_CACHE_PDF_DIR', settings.BASE_DIR / 'cache_pdf'))
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return diretorio
+
+
+def _agregado(linhas, expressao):
+    return Subquery(linhas.order_by().values('funcionario_id').annotate(valor=expressao).values('valor'))
+
+
+def _resumo_periodo(funcionario_id, data_inicio, data_fim):
+    from .models import Funcionario, JornadaDiaria, JornadaPrevista
+
+    periodo = {'funcionario_id': OuterRef('pk'), 'data__gte': data_inicio, 'data__lte': data_fim}
+    jornadas = JornadaDiaria.objects.filter(**periodo)
+    previstas = JornadaPrevista.objects.filter(**periodo)
+    return Funcionario.objects.filter(pk=funcionario_id).values(
+        dias=_agregado(jornadas, Count('id')),
+        max_id=_agregado(jornadas, Max('id')),
+        registros=_agregado(jornadas, Sum('quantidade_registros')),
+        ultima_alteracao=_agregado(jornadas, Max('atualizado_em')),
+        dias_previstos=_agregado(previstas, Count('id')),
+        # Ponderado pelo id (estável no upsert): detecta minutos trocados de um dia para outro
+        previstos=_agregado(previstas, Sum(F('minutos_previstos') * F('id'))),
+    ).first() or {}
+
+
+def impressao_digital(funcionario_id, data_inicio, data_fim):
+    """
+    Resume as entradas do relatório no período (JornadaDiaria e JornadaPrevista) numa única consulta
+    """
+    from .escala import garantir_previstos
+
+    resumo = _resumo_periodo(funcionario_id, data_inicio, data_fim)
+    if resumo and (resumo['dias_previstos'] or 0) < (data_fim - data_inicio).days + 1:
+        # Período ainda não expandido: expande agora para a chave não mudar depois da primeira renderização
+        garantir_previstos(data_inicio, data_fim, [funcionario_id])
+        resumo = _resumo_periodo(funcionario_id, data_inicio, data_fim)
+
+    ultima_alteracao = resumo['ultima_alteracao'].isoformat() if resumo.get('ultima_alteracao') else ''
+    return ':'.join(str(resumo.get(campo)) for campo in CAMPOS_ASSINATURA) + f':{ultima_alteracao}'
+
+
+def chave_relatorio(funcionario_id, data_inicio, data_fim, modo='platypus'):
+    from .calendario import assinatura_calendario
+
+    # Dias úteis sem registro só viram "Falta" depois que passam: num período em andamento
+    # o relatório também muda com a data de hoje
+    corte = min(timezone.localdate(), data_fim + timedelta(days=1))
+    bruto = '|'.join([
+        str(VERSAO_RELATORIO),
+        modo,
+        str(funcionario_id),
+        data_inicio.isoformat(),
+        data_fim.isoformat(),
+        impressao_digital(funcionario_id, data_inicio, data_fim),
+        assinatura_calendario(data_inicio, data_fim),
+        corte.isoformat(),
+    ])
+    return hashlib.sha256(bruto.encode()).hexdigest()
+
+
+def obter_relatorio_pdf(funcionario_id, data_inicio, data_fim, modo=None):
+    """
+    Caminho do PDF do período, gerando-o só se ainda não estiver em cache.
+    modo: 'platypus' ou 'canvas' (padrão PONTO_PDF_MODO). Devolve (caminho, veio_do_cache).
+    """
+    from .utils import gerar_relatorio_ponto_pdf
+
+    if modo is None:
+        modo = getattr(settings, 'PONTO_PDF_MODO', 'platypus')
+    diretorio = diretorio_cache_pdf()
+    caminho = diretorio / f'{chave_relatorio(funcionario_id, data_inicio, data_fim, modo)}.pdf'
+
+    if caminho.exists():
+        try:
+            # mtime marca o último uso (LRU)
+            os.utime(caminho)
+            return caminho, True
+        except FileNotFoundError:
+            pass  # removido por outro processo entre exists() e utime()
+
+    buffer = gerar_relatorio_ponto_pdf(funcionario_id, data_inicio, data_fim, modo)
+
+    # Grava num temporário do mesmo diretório e renomeia: leitores nunca veem arquivo pela metade
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.parcial')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(buffer.getbuffer())
+    os.replace(temporario, caminho)
+
+    aplicar_limite_cache_pdf(manter=caminho)
+    return caminho, False
+
+
+def _arquivos_cache(diretorio):
+    arquivos = []
+    for entrada in os.scandir(diretorio):
+        if entrada.is_file() and entrada.name.endswith('.pdf'):
+            try:
+                estado = entrada.stat()
+            except FileNotFoundError:
+                continue
+            arquivos.append((estado.st_mtime, estado.st_size, Path(entrada.path)))
+    return arquivos
+
+
+def aplicar_limite_cache_pdf(max_bytes=None, manter=None):
+    """
+    Remove os PDFs usados há mais tempo até o cache caber em max_bytes; devolve quantos removeu
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'PONTO_CACHE_PDF_MAX_BYTES', 512 * 1024 * 1024)
+
+    arquivos = _arquivos_cache(diretorio_cache_pdf())
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    removidos = 0
+
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= max_bytes:
+            break
+        if caminho == manter:
+            continue
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+        removidos += 1
+
+    return removidos
+
+
+def limpar_cache_pdf():
+    """
+    Apaga todo o cache (inclusive temporários órfãos); devolve (arquivos, bytes) removidos
+    """
+    arquivos = 0
+    liberados = 0
+    for entrada in os.scandir(diretorio_cache_pdf()):
+        if entrada.is_file() and entrada.name.endswith(('.pdf', '.parcial')):
+            try:
+                liberados += entrada.stat().st_size
+                os.unlink(entrada.path)
+                arquivos += 1
+            except FileNotFoundError:
+                continue
+    return arquivos, liberados
+
+
+def estatisticas_cache_pdf():
+    arquivos = _arquivos_cache(diretorio_cache_pdf())
+    return {
+        'arquivos': len(arquivos),
+        'bytes': sum(tamanho for _, tamanho, _ in arquivos),
+        'max_bytes': getattr(settings, 'PONTO_CACHE_PDF_MAX_BYTES', 512 * 1024 * 1024),
+    }
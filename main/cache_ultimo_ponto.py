@@ -0,0 +1,105 @@
+# cache_ultimo_ponto.py - RESPOSTA DE /api/ultimo-ponto/ EM CACHE (FRAMEWORK DE CACHE DO DJANGO)
+# O kiosk chama a API ao abrir e depois de cada ponto. O JSON pronto e o ETag ficam no cache por
+# funcionário e são regravados (write-through) sempre que EstadoPonto muda: ponto do kiosk, lote e
+# edição/exclusão no admin. A chave sai do cache já na alteração e o valor novo entra no commit: se a
+# transação for desfeita, a próxima leitura reconstrói do banco.
+# O write-through só alcança os outros workers se o cache for compartilhado (PONTO_CACHE_BACKEND=arquivo):
+# sem PONTO_CACHE_ULTIMO_PONTO, cada leitura monta a resposta do EstadoPonto (uma leitura pela PK).
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .fuso import horario_local
+from .models import EstadoPonto
+
+
+def _chave(funcionario_id):
+    return f'ponto:ultimo:{funcionario_id}'
+
+
+def _ttl():
+    return getattr(settings, 'PONTO_CACHE_ULTIMO_PONTO_TTL_SEGUNDOS', 60)
+
+
+def _ativo():
+    return getattr(settings, 'PONTO_CACHE_ULTIMO_PONTO', False)
+
+
+def montar_resposta_ultimo_ponto(estado):
+    """
+    Monta o payload de /api/ultimo-ponto/ a partir do estado do funcionário
+    """
+    # Determinar o próximo tipo
+    if estado.ultimo_tipo:
+        proximo_tipo = estado.proximo_tipo
+        ultimo_tipo = estado.ultimo_tipo
+
+        # 🆕 CONVERTER PARA UTC-4 (Manaus)
+        horario = horario_local(estado.ultimo_timestamp)
+        ultimo_timestamp = f"{horario.data_formatada} {horario.hora}"
+
+    else:
+        proximo_tipo = 'E'
+        ultimo_tipo = None
+        ultimo_timestamp = None
+
+    return {
+        'proximo_tipo': proximo_tipo,
+        'proximo_tipo_display': 'Saída' if proximo_tipo == 'S' else 'Entrada',
+        'ultimo_tipo': ultimo_tipo,
+        'ultimo_timestamp': ultimo_timestamp,
+        'cor_botao': 'vermelho' if proximo_tipo == 'S' else 'verde'
+    }
+
+
+def serializar_ultimo_ponto(estado):
+    """
+    (JSON em bytes, ETag) do estado: o ETag é o hash do próprio conteúdo
+    """
+    conteudo = json.dumps(montar_resposta_ultimo_ponto(estado)).encode()
+    return conteudo, f'"{hashlib.md5(conteudo).hexdigest()}"'
+
+
+def obter_ultimo_ponto(funcionario_id, carregar_estado):
+    """
+    (conteúdo, ETag) do funcionário; no cache frio, carregar_estado(funcionario_id) lê o EstadoPonto
+    """
+    if not _ativo():
+        return serializar_ultimo_ponto(carregar_estado(funcionario_id))
+    item = cache.get(_chave(funcionario_id))
+    if item is None:
+        item = serializar_ultimo_ponto(carregar_estado(funcionario_id))
+        cache.set(_chave(funcionario_id), item, _ttl())
+    return item
+
+
+async def aobter_ultimo_ponto(funcionario_id, acarregar_estado):
+    if not _ativo():
+        return serializar_ultimo_ponto(await acarregar_estado(funcionario_id))
+    item = await cache.aget(_chave(funcionario_id))
+    if item is None:
+        item = serializar_ultimo_ponto(await acarregar_estado(funcionario_id))
+        await cache.aset(_chave(funcionario_id), item, _ttl())
+    return item
+
+
+def gravar_ultimo_ponto(funcionario_id, ultimo_tipo, ultimo_timestamp):
+    """
+    Write-through depois de alterar o EstadoPonto do funcionário (dentro ou fora de transação)
+    """
+    if not _ativo():
+        return
+    item = serializar_ultimo_ponto(
+        EstadoPonto(funcionario_id=funcionario_id, ultimo_tipo=ultimo_tipo, ultimo_timestamp=ultimo_timestamp)
+    )
+    cache.delete(_chave(funcionario_id))
+    transaction.on_commit(lambda: cache.set(_chave(funcionario_id), item, _ttl()))
+
+
+def invalidar_ultimo_ponto(funcionario_ids):
+    if not _ativo():
+        return
+    cache.delete_many([_chave(funcionario_id) for funcionario_id in funcionario_ids])
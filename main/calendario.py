@@ -0,0 +1,155 @@
+# calendario.py - CALENDÁRIO DE DIAS ÚTEIS (BITMAP POR ANO) E GRADE DO PERÍODO
+# Cada ano vira um inteiro com um bit por dia (1 = dia útil), montado uma vez a partir dos fins de
+# semana e da tabela Feriado (editável no admin). A grade do período cruza esse bitmap com as
+# jornadas já consolidadas: faltas, folgas e feriados sem nenhuma consulta por dia.
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache_local import CacheLRU
+from .fuso import dia_semana
+from .models import Feriado
+
+# Observações dos dias sem jornada (as demais vêm de JornadaDiaria.OBSERVACOES)
+OBSERVACOES_CALENDARIO = {
+    'falta': 'Falta',
+    'feriado': 'Feriado',
+    'folga': 'Folga',
+    '': '-',  # Dia ainda não encerrado
+}
+
+# Um item por ano; o TTL limita a defasagem entre workers quando um feriado muda em outro processo
+cache_calendario = CacheLRU(
+    max_itens=16,
+    ttl=getattr(settings, 'PONTO_CACHE_CALENDARIO_TTL_SEGUNDOS', 300)
+)
+
+
+class CalendarioAno(namedtuple('CalendarioAno', 'ano dias_uteis feriados')):
+    """
+    dias_uteis: bitmap (bit n = n-ésimo dia do ano, a partir de 0); feriados: {data: descrição}
+    """
+    __slots__ = ()
+
+    def dia_util(self, data):
+        return bool(self.dias_uteis >> (data.toordinal() - date(self.ano, 1, 1).toordinal()) & 1)
+
+    @property
+    def total_dias_uteis(self):
+        return self.dias_uteis.bit_count()
+
+
+def montar_calendario_ano(ano, feriados):
+    """
+    CalendarioAno a partir de {data: descrição} dos feriados do ano
+    """
+    primeiro_dia = date(ano, 1, 1)
+    quantidade = (date(ano + 1, 1, 1) - primeiro_dia).days
+
+    # Segunda a sexta: padrão de 7 bits repetido a partir do dia da semana de 1º de janeiro
+    semana = sum(1 << ((dia - primeiro_dia.weekday()) % 7) for dia in range(5))
+    dias_uteis = 0
+    for inicio in range(0, quantidade, 7):
+        dias_uteis |= semana << inicio
+    dias_uteis &= (1 << quantidade) - 1
+
+    for data in feriados:
+        dias_uteis &= ~(1 << (data - primeiro_dia).days)
+
+    return CalendarioAno(ano, dias_uteis, feriados)
+
+
+def calendario_ano(ano):
+    calendario = cache_calendario.get(ano)
+    if calendario is None:
+        feriados = dict(Feriado.objects.filter(data__year=ano).values_list('data', 'descricao'))
+        calendario = montar_calendario_ano(ano, feriados)
+        cache_calendario.set(ano, calendario)
+    return calendario
+
+
+def dia_util(data):
+    return calendario_ano(data.year).dia_util(data)
+
+
+def invalidar_calendario(*anos):
+    """
+    Descarta os anos informados (ou todos) do cache deste processo
+    """
+    if not anos:
+        cache_calendario.clear()
+    for ano in anos:
+        cache_calendario.delete(ano)
+
+
+def assinatura_calendario(data_inicio, data_fim):
+    """
+    Texto que muda sempre que os dias úteis do período mudam (usado na chave do cache de PDFs)
+    """
+    partes = []
+    for ano in range(data_inicio.year, data_fim.year + 1):
+        partes.append(f'{ano}:{calendario_ano(ano).dias_uteis:x}')
+    return ';'.join(partes)
+
+
+class DiaCalendario(namedtuple('DiaCalendario', 'data dia_semana tipo feriado jornada observacao minutos_previstos')):
+    """
+    Um dia da grade. tipo: 'util', 'fim_de_semana' ou 'feriado'; jornada: JornadaDiaria ou None;
+    minutos_previstos: da escala (None se a grade foi montada sem previstos)
+    """
+    __slots__ = ()
+
+    @property
+    def observacao_display(self):
+        if self.jornada is not None:
+            return self.jornada.get_observacao_display()
+        return OBSERVACOES_CALENDARIO[self.observacao]
+
+
+def grade_periodo(data_inicio, data_fim, jornadas, hoje=None, previstos=None):
+    """
+    [DiaCalendario] de todos os dias do período, em ordem.
+    jornadas: {data: JornadaDiaria} (os dias com registro); previstos: {data: minutos} da escala
+    (main/escala.py). Dias com jornada prevista e sem registro antes de hoje são falta; sem previstos,
+    vale o calendário (dias úteis).
+    """
+    if hoje is None:
+        hoje = timezone.localdate()
+
+    grade = []
+    calendario = None
+    data = data_inicio
+    while data <= data_fim:
+        if calendario is None or calendario.ano != data.year:
+            calendario = calendario_ano(data.year)
+
+        feriado = calendario.feriados.get(data, '')
+        if feriado:
+            tipo = 'feriado'
+        elif data.weekday() >= 5:
+            tipo = 'fim_de_semana'
+        else:
+            tipo = 'util'
+
+        minutos_previstos = previstos.get(data, 0) if previstos is not None else None
+        dia_de_trabalho = tipo == 'util' if previstos is None else minutos_previstos > 0
+
+        jornada = jornadas.get(data)
+        if jornada is not None:
+            observacao = jornada.observacao
+        elif tipo == 'feriado':
+            observacao = 'feriado'
+        elif not dia_de_trabalho:
+            observacao = 'folga'
+        elif data < hoje:
+            observacao = 'falta'
+        else:
+            observacao = ''
+
+        grade.append(DiaCalendario(data, dia_semana(data), tipo, feriado, jornada, observacao,
+                                   minutos_previstos))
+        data += timedelta(days=1)
+
+    return grade
@@ -0,0 +1,182 @@
+# carga.py - GERADOR DE CARGA HTTP CONCORRENTE (SÓ BIBLIOTECA PADRÃO)
+# Usado pelos comandos de benchmark para medir servidores locais já em execução.
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Requisicao:
+    """
+    series_por_status: {status: nome} separa no resultado respostas do mesmo endpoint que seguem
+    caminhos diferentes no servidor (ex.: 201 ponto gravado, 200 toque duplo)
+    """
+
+    def __init__(self, nome, metodo, caminho, corpo=None, headers=None, series_por_status=None):
+        self.nome = nome
+        self.metodo = metodo
+        self.caminho = caminho
+        self.corpo = json.dumps(corpo).encode() if corpo is not None else b''
+        self.headers = headers or {}
+        self.series_por_status = series_por_status or {}
+
+    def serie(self, status):
+        return self.series_por_status.get(status, self.nome)
+
+
+# Séries do registro de ponto: o toque duplo (mesmo funcionário dentro de PONTO_JANELA_DUPLICIDADE_SEGUNDOS)
+# devolve 200 sem gravar e não pode se misturar às latências do ponto gravado
+SERIES_REGISTRO = {201: 'registro-ponto:gravado', 200: 'registro-ponto:toque-duplo'}
+DESCRICAO_SERIES_REGISTRO = {
+    'registro-ponto:gravado': '201: ponto gravado',
+    'registro-ponto:toque-duplo': '200: toque duplo dentro de PONTO_JANELA_DUPLICIDADE_SEGUNDOS, nada gravado',
+}
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return None
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+class Resultado:
+    """
+    Latências e status por nome de requisição
+    """
+
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+        self.status = {}
+        self.inicio = None
+        self.fim = None
+
+    def registrar(self, nome, latencia, status):
+        self.latencias.setdefault(nome, []).append(latencia)
+        chave = str(status)
+        self.status.setdefault(nome, {}).setdefault(chave, 0)
+        self.status[nome][chave] += 1
+        if status is None or status >= 500:
+            self.erros[nome] = self.erros.get(nome, 0) + 1
+
+    def resumo(self):
+        duracao = max((self.fim or time.perf_counter()) - (self.inicio or 0), 1e-9)
+        por_requisicao = {}
+        total = 0
+        total_erros = 0
+        for nome, latencias in self.latencias.items():
+            ordenadas = sorted(latencias)
+            erros = self.erros.get(nome, 0)
+            total += len(ordenadas)
+            total_erros += erros
+            por_requisicao[nome] = {
+                'requisicoes': len(ordenadas),
+                'req_por_segundo': round(len(ordenadas) / duracao, 1),
+                'p50_ms': round(percentil(ordenadas, 50) * 1000, 2),
+                'p95_ms': round(percentil(ordenadas, 95) * 1000, 2),
+                'p99_ms': round(percentil(ordenadas, 99) * 1000, 2),
+                'taxa_erro': round(erros / len(ordenadas), 4),
+                'status': self.status.get(nome, {}),
+            }
+        return {
+            'duracao_s': round(duracao, 2),
+            'requisicoes': total,
+            'req_por_segundo': round(total / duracao, 1),
+            'taxa_erro': round(total_erros / total, 4) if total else 0,
+            'por_requisicao': por_requisicao,
+        }
+
+
+async def _ler_resposta(reader):
+    linha_status = await reader.readline()
+    if not linha_status:
+        raise ConnectionError('Conexão encerrada pelo servidor')
+    status = int(linha_status.split()[1])
+
+    tamanho = 0
+    fechar = False
+    chunked = False
+    while True:
+        linha = await reader.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        nome = nome.strip().lower()
+        valor = valor.strip().lower()
+        if nome == 'content-length':
+            tamanho = int(valor)
+        elif nome == 'transfer-encoding' and 'chunked' in valor:
+            chunked = True
+        elif nome == 'connection' and valor == 'close':
+            fechar = True
+
+    if chunked:
+        while True:
+            tamanho_chunk = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(tamanho_chunk + 2)
+            if tamanho_chunk == 0:
+                break
+    elif tamanho:
+        await reader.readexactly(tamanho)
+    return status, fechar
+
+
+async def _cliente(host, porta, proxima_requisicao, prazo, resultado, cookies):
+    reader = writer = None
+    while time.perf_counter() < prazo:
+        requisicao = proxima_requisicao()
+        headers = {
+            'Host': f'{host}:{porta}',
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(requisicao.corpo)),
+            'Connection': 'keep-alive',
+        }
+        if cookies:
+            headers['Cookie'] = cookies
+        headers.update(requisicao.headers)
+        bruto = f'{requisicao.metodo} {requisicao.caminho} HTTP/1.1\r\n'.encode()
+        bruto += ''.join(f'{k}: {v}\r\n' for k, v in headers.items()).encode() + b'\r\n' + requisicao.corpo
+
+        inicio = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, porta)
+            writer.write(bruto)
+            await writer.drain()
+            status, fechar = await _ler_resposta(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status, fechar = None, True
+
+        resultado.registrar(requisicao.serie(status), time.perf_counter() - inicio, status)
+
+        if fechar and writer is not None:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def _executar(url_base, proxima_requisicao, clientes, duracao, cookies):
+    partes = urlsplit(url_base)
+    host = partes.hostname or '127.0.0.1'
+    porta = partes.port or 80
+
+    resultado = Resultado()
+    resultado.inicio = time.perf_counter()
+    prazo = resultado.inicio + duracao
+    await asyncio.gather(*[
+        _cliente(host, porta, proxima_requisicao, prazo, resultado, cookies)
+        for _ in range(clientes)
+    ])
+    resultado.fim = time.perf_counter()
+    return resultado
+
+
+def executar_carga(url_base, proxima_requisicao, clientes=200, duracao=10, cookies=None):
+    """
+    Dispara `clientes` conexões keep-alive simultâneas contra url_base durante `duracao`
+    segundos. proxima_requisicao() devolve a próxima Requisicao a enviar.
+    """
+    return asyncio.run(_executar(url_base, proxima_requisicao, clientes, duracao, cookies)).resumo()
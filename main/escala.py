@@ -0,0 +1,198 @@
+# escala.py - JORNADA PREVISTA POR FUNCIONÁRIO E DIA (EXPANDIDA DAS ESCALAS)
+# Ordem de prioridade: escala do funcionário -> escala do cargo -> jornada padrão (7h30, segunda a sexta).
+# Feriados (main/calendario.py) têm 0 minutos previstos. O resultado fica em JornadaPrevista:
+# leitores buscam pelo índice (funcionario, data) e só os dias que faltam são expandidos.
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache_local import CacheLRU
+from .calendario import calendario_ano
+from .models import Escala, Funcionario, JornadaPrevista
+
+JORNADA_PADRAO_MINUTOS = 7 * 60 + 30  # 7h30
+
+# Índice = date.weekday() (0 = segunda)
+SEMANA_PADRAO = (JORNADA_PADRAO_MINUTOS,) * 5 + (0, 0)
+
+# Todas as escalas num único item: são poucas e mudam raramente
+cache_escalas = CacheLRU(
+    max_itens=1,
+    ttl=getattr(settings, 'PONTO_CACHE_ESCALAS_TTL_SEGUNDOS', 300)
+)
+
+
+def tabela_escalas():
+    """
+    ({escala_id: minutos da semana}, {cargo: minutos da semana})
+    """
+    tabela = cache_escalas.get('escalas')
+    if tabela is None:
+        por_id, por_cargo = {}, {}
+        for escala_id, cargo, *minutos in Escala.objects.values_list('id', 'cargo', *Escala.CAMPOS_SEMANA):
+            por_id[escala_id] = tuple(minutos)
+            if cargo:
+                por_cargo[cargo] = tuple(minutos)
+        tabela = (por_id, por_cargo)
+        cache_escalas.set('escalas', tabela)
+    return tabela
+
+
+def invalidar_escalas():
+    cache_escalas.clear()
+
+
+def semana_prevista(escala_id, cargo, tabela=None):
+    por_id, por_cargo = tabela or tabela_escalas()
+    if escala_id in por_id:
+        return por_id[escala_id]
+    return por_cargo.get(cargo, SEMANA_PADRAO)
+
+
+def minutos_no_dia(semana, data):
+    if data in calendario_ano(data.year).feriados:
+        return 0
+    return semana[data.weekday()]
+
+
+def dias_do_periodo(data_inicio, data_fim):
+    return [data_inicio + timedelta(days=dias) for dias in range((data_fim - data_inicio).days + 1)]
+
+
+def calcular_previstos(pares):
+    """
+    {(funcionario_id, data): minutos} calculados da escala atual (sem ler nem gravar JornadaPrevista)
+    """
+    pares = set(pares)
+    if not pares:
+        return {}
+
+    tabela = tabela_escalas()
+    semanas = {
+        funcionario_id: semana_prevista(escala_id, cargo, tabela)
+        for funcionario_id, escala_id, cargo in Funcionario.objects.filter(
+            pk__in={funcionario_id for funcionario_id, _ in pares}
+        ).values_list('id', 'escala_id', 'cargo')
+    }
+    return {
+        (funcionario_id, data): minutos_no_dia(semanas.get(funcionario_id, SEMANA_PADRAO), data)
+        for funcionario_id, data in pares
+    }
+
+
+def _gravar(previstos, sobrescrever=False):
+    linhas = [
+        JornadaPrevista(funcionario_id=funcionario_id, data=data, minutos_previstos=minutos)
+        for (funcionario_id, data), minutos in previstos.items()
+    ]
+    if sobrescrever:
+        JornadaPrevista.objects.bulk_create(linhas, batch_size=1000, update_conflicts=True,
+                                            unique_fields=['funcionario', 'data'],
+                                            update_fields=['minutos_previstos'])
+    else:
+        # Outro processo pode ter expandido o mesmo dia: mantém o que já está gravado
+        JornadaPrevista.objects.bulk_create(linhas, batch_size=1000, ignore_conflicts=True)
+
+
+def obter_previstos(pares):
+    """
+    {(funcionario_id, data): minutos previstos}: uma leitura da tabela; os dias que ainda não
+    foram expandidos são calculados da escala e gravados
+    """
+    pares = set(pares)
+    if not pares:
+        return {}
+
+    datas = [data for _, data in pares]
+    encontrados = JornadaPrevista.objects.filter(
+        funcionario_id__in={funcionario_id for funcionario_id, _ in pares},
+        data__gte=min(datas),
+        data__lte=max(datas),
+    ).values_list('funcionario_id', 'data', 'minutos_previstos')
+    previstos = {
+        (funcionario_id, data): minutos
+        for funcionario_id, data, minutos in encontrados
+        if (funcionario_id, data) in pares
+    }
+
+    faltantes = pares - previstos.keys()
+    if faltantes:
+        novos = calcular_previstos(faltantes)
+        _gravar(novos)
+        previstos.update(novos)
+    return previstos
+
+
+def previstos_periodo(funcionario_id, data_inicio, data_fim):
+    """
+    {data: minutos previstos} de um funcionário em todos os dias do período
+    """
+    previstos = obter_previstos((funcionario_id, data) for data in dias_do_periodo(data_inicio, data_fim))
+    return {data: minutos for (_, data), minutos in previstos.items()}
+
+
+def garantir_previstos(data_inicio, data_fim, funcionario_ids=None):
+    """
+    Expande o período para os funcionários informados (ou todos) que ainda não o têm completo.
+    Uma consulta de contagem quando já está tudo expandido; devolve quantos funcionários foram expandidos.
+    """
+    previstas = JornadaPrevista.objects.filter(data__gte=data_inicio, data__lte=data_fim)
+    if funcionario_ids is None:
+        funcionario_ids = Funcionario.objects.values_list('id', flat=True)
+    else:
+        funcionario_ids = set(funcionario_ids)
+        previstas = previstas.filter(funcionario_id__in=funcionario_ids)
+    dias = dias_do_periodo(data_inicio, data_fim)
+
+    contagem = dict(previstas.order_by().values('funcionario_id').annotate(
+        dias=Count('id')).values_list('funcionario_id', 'dias'))
+    incompletos = [funcionario_id for funcionario_id in funcionario_ids if contagem.get(funcionario_id, 0) < len(dias)]
+
+    if incompletos:
+        _gravar(calcular_previstos((funcionario_id, data) for funcionario_id in incompletos for data in dias))
+    return len(incompletos)
+
+
+def reexpandir_previstos(funcionario_ids=None, datas=None, a_partir_de=None):
+    """
+    Recalcula as linhas já expandidas depois de uma mudança de escala/feriado.
+    Devolve os pares (funcionario_id, data) cujo valor mudou, para recalcular as jornadas desses dias.
+    """
+    linhas = JornadaPrevista.objects.all()
+    if funcionario_ids is not None:
+        linhas = linhas.filter(funcionario_id__in=funcionario_ids)
+    if datas is not None:
+        linhas = linhas.filter(data__in=datas)
+    if a_partir_de is not None:
+        linhas = linhas.filter(data__gte=a_partir_de)
+
+    atuais = {
+        (funcionario_id, data): minutos
+        for funcionario_id, data, minutos in linhas.values_list('funcionario_id', 'data', 'minutos_previstos')
+    }
+    alterados = {
+        par: minutos for par, minutos in calcular_previstos(atuais).items() if minutos != atuais[par]
+    }
+    if alterados:
+        _gravar(alterados, sobrescrever=True)
+    return set(alterados)
+
+
+def reexpandir_a_partir_de_hoje(funcionario_ids=None):
+    """
+    Mudança de escala vale do dia atual em diante: jornadas passadas mantêm o previsto da época
+    """
+    return reexpandir_previstos(funcionario_ids, a_partir_de=timezone.localdate())
+
+
+def funcionarios_da_escala(escala_id, cargos=()):
+    """
+    Funcionários afetados por uma escala: os que a têm diretamente e os do(s) cargo(s) sem escala própria
+    """
+    ids = set(Funcionario.objects.filter(escala_id=escala_id).values_list('id', flat=True))
+    cargos = [cargo for cargo in cargos if cargo]
+    if cargos:
+        ids |= set(Funcionario.objects.filter(escala__isnull=True, cargo__in=cargos).values_list('id', flat=True))
+    return ids
@@ -0,0 +1,182 @@
+# estado_ponto.py - ESTADO ATUAL DO PONTO POR FUNCIONÁRIO
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .cache_ultimo_ponto import gravar_ultimo_ponto, invalidar_ultimo_ponto
+from .models import EstadoPonto, Funcionario, RegistroPonto
+
+
+def _ultimo_registro(funcionario_id):
+    return RegistroPonto.objects.filter(
+        funcionario_id=funcionario_id
+    ).order_by('-timestamp', '-id').only('id', 'tipo', 'timestamp').first()
+
+
+def _campos_estado(registro):
+    # .update() não dispara auto_now, então atualizado_em vai explícito
+    if registro is None:
+        return {
+            'ultimo_tipo': None,
+            'ultimo_timestamp': None,
+            'ultimo_registro': None,
+            'atualizado_em': timezone.now(),
+        }
+    return {
+        'ultimo_tipo': registro.tipo,
+        'ultimo_timestamp': registro.timestamp,
+        'ultimo_registro': registro,
+        'atualizado_em': timezone.now(),
+    }
+
+
+def recalcular_estado_ponto(funcionario_id):
+    """
+    Reconstrói o estado de um funcionário a partir do histórico (caminho lento)
+    """
+    estado, _ = EstadoPonto.objects.update_or_create(
+        funcionario_id=funcionario_id,
+        defaults=_campos_estado(_ultimo_registro(funcionario_id))
+    )
+    gravar_ultimo_ponto(funcionario_id, estado.ultimo_tipo, estado.ultimo_timestamp)
+    return estado
+
+
+def criar_estado_ponto(funcionario_id, bloquear=False):
+    """
+    Primeiro acesso ao estado: constrói a partir do histórico. Funcionario.DoesNotExist se o
+    funcionário foi excluído (id vindo do cache desatualizado de outro worker); com bloquear,
+    a linha do funcionário fica travada até o fim da transação
+    """
+    funcionarios = Funcionario.objects.filter(pk=funcionario_id)
+    if bloquear:
+        funcionarios = funcionarios.select_for_update()
+    if funcionarios.values_list('pk', flat=True).first() is None:
+        raise Funcionario.DoesNotExist
+    return recalcular_estado_ponto(funcionario_id)
+
+
+def obter_estado_ponto(funcionario_id):
+    """
+    Lê o estado por chave primária; se ainda não existir, constrói a partir do histórico
+    """
+    estado = EstadoPonto.objects.filter(pk=funcionario_id).first()
+    if estado is None:
+        estado = criar_estado_ponto(funcionario_id)
+    return estado
+
+
+def bloquear_estado_ponto(funcionario_id):
+    """
+    Obtém o estado com lock de linha (SELECT ... FOR UPDATE).
+    Deve ser chamado dentro de transaction.atomic().
+    """
+    estado = EstadoPonto.objects.select_for_update().filter(pk=funcionario_id).first()
+    if estado is None:
+        criar_estado_ponto(funcionario_id, bloquear=True)
+        estado = EstadoPonto.objects.select_for_update().get(pk=funcionario_id)
+    return estado
+
+
+def aplicar_registro(registro):
+    """
+    Atualiza o estado após gravar um registro.
+    Caminho rápido: um único UPDATE quando o registro é o mais recente.
+    """
+    atualizados = EstadoPonto.objects.filter(
+        Q(ultimo_timestamp__isnull=True) | Q(ultimo_timestamp__lte=registro.timestamp),
+        funcionario_id=registro.funcionario_id,
+    ).update(**_campos_estado(registro))
+
+    if atualizados:
+        gravar_ultimo_ponto(registro.funcionario_id, registro.tipo, registro.timestamp)
+    else:
+        # Registro retroativo (ou estado inexistente): recalcula pelo histórico
+        recalcular_estado_ponto(registro.funcionario_id)
+
+
+def aplicar_troca_funcionario(registro):
+    """
+    Se um registro editado mudou de funcionário, corrige o estado do funcionário anterior
+    """
+    anteriores = EstadoPonto.objects.filter(
+        ultimo_registro_id=registro.pk
+    ).exclude(funcionario_id=registro.funcionario_id).values_list('pk', flat=True)
+    for funcionario_id in list(anteriores):
+        recalcular_estado_ponto(funcionario_id)
+
+
+def remover_registro(registro):
+    """
+    Atualiza o estado após excluir um registro.
+    Só recalcula se o registro excluído era o último do funcionário.
+    """
+    # ultimo_registro usa SET_NULL, então o estado afetado já está sem registro
+    afetados = EstadoPonto.objects.filter(
+        funcionario_id=registro.funcionario_id,
+        ultimo_registro__isnull=True,
+        ultimo_timestamp__isnull=False,
+    )
+    for estado in afetados:
+        # Apenas UPDATE: o funcionário pode estar sendo excluído em cascata
+        campos = _campos_estado(_ultimo_registro(estado.pk))
+        EstadoPonto.objects.filter(pk=estado.pk).update(**campos)
+        gravar_ultimo_ponto(estado.pk, campos['ultimo_tipo'], campos['ultimo_timestamp'])
+
+
+def _estados_do_historico(funcionarios):
+    """
+    Monta (sem gravar) os estados dos funcionários a partir do histórico, em duas consultas
+    """
+    ultimo_id = RegistroPonto.objects.filter(
+        funcionario=OuterRef('pk')
+    ).order_by('-timestamp', '-id').values('id')[:1]
+
+    ids = {
+        funcionario_id: registro_id
+        for funcionario_id, registro_id in funcionarios.annotate(
+            ultimo_registro_id=Subquery(ultimo_id)
+        ).values_list('id', 'ultimo_registro_id')
+    }
+
+    registros = RegistroPonto.objects.only('id', 'tipo', 'timestamp').in_bulk(
+        [registro_id for registro_id in ids.values() if registro_id]
+    )
+
+    return [
+        EstadoPonto(funcionario_id=funcionario_id, **_campos_estado(registros.get(registro_id)))
+        for funcionario_id, registro_id in ids.items()
+    ]
+
+
+def bloquear_estados_ponto(funcionario_ids):
+    """
+    Versão em lote de bloquear_estado_ponto: {funcionario_id: EstadoPonto} com lock de linha.
+    Estados ainda inexistentes são criados a partir do histórico de uma só vez.
+    """
+    funcionario_ids = list(funcionario_ids)
+    estados = EstadoPonto.objects.select_for_update().in_bulk(funcionario_ids)
+
+    faltantes = [funcionario_id for funcionario_id in funcionario_ids if funcionario_id not in estados]
+    if faltantes:
+        EstadoPonto.objects.bulk_create(
+            _estados_do_historico(Funcionario.objects.filter(pk__in=faltantes)),
+            ignore_conflicts=True
+        )
+        estados.update(EstadoPonto.objects.select_for_update().in_bulk(faltantes))
+
+    return estados
+
+
+def reconstruir_todos_estados():
+    """
+    Reconstrói a tabela inteira a partir do histórico (usado pelo comando de manutenção)
+    """
+    estados = _estados_do_historico(Funcionario.objects.all())
+
+    with transaction.atomic():
+        EstadoPonto.objects.all().delete()
+        EstadoPonto.objects.bulk_create(estados, batch_size=1000)
+        invalidar_ultimo_ponto(estado.funcionario_id for estado in estados)
+
+    return len(estados)
@@ -0,0 +1,52 @@
+# exportacao.py - EXPORTAÇÃO EM STREAMING DO HISTÓRICO (NDJSON / CSV)
+# Memória constante: linhas vêm do banco em blocos (iterator) e saem formatadas uma a uma.
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+
+from .cache_funcionarios import obter_funcionarios
+from .serializers import CAMPOS_HISTORICO, formatar_historico_lote
+
+CAMPOS_EXPORTACAO = ('id', 'funcionarioId', 'funcionarioNome', 'tipo', 'timestamp', 'timestamp_local',
+                     'data', 'hora', 'observacao')
+
+
+class _Eco:
+    """
+    Pseudo-arquivo para csv.writer: devolve a linha em vez de gravá-la
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def linhas_exportacao(queryset):
+    """
+    Gera dicts com o mesmo formato de PontoHistoricoSerializer, lendo em blocos
+    """
+    tamanho_bloco = getattr(settings, 'PONTO_EXPORTACAO_CHUNK_SIZE', 2000)
+
+    linhas = queryset.values(*CAMPOS_HISTORICO).iterator(chunk_size=tamanho_bloco)
+    while True:
+        bloco = list(islice(linhas, tamanho_bloco))
+        if not bloco:
+            break
+
+        # Nomes dos funcionários do bloco de uma vez (cache + no máximo um IN)
+        funcionarios = obter_funcionarios(linha['funcionario_id'] for linha in bloco)
+
+        yield from formatar_historico_lote(bloco, funcionarios)
+
+
+def exportar_ndjson(queryset):
+    for linha in linhas_exportacao(queryset):
+        yield json.dumps(linha, ensure_ascii=False) + '\n'
+
+
+def exportar_csv(queryset):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(CAMPOS_EXPORTACAO)
+    for linha in linhas_exportacao(queryset):
+        yield escritor.writerow([linha[campo] for campo in CAMPOS_EXPORTACAO])
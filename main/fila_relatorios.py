@@ -0,0 +1,151 @@
+# fila_relatorios.py - FILA DE RELATÓRIOS NO BANCO (TarefaRelatorio)
+# O request só enfileira; "manage.py processar_relatorios" gera os PDFs fora do gunicorn.
+import os
+import re
+import socket
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache_funcionarios import obter_funcionario
+from .models import TarefaRelatorio
+from .relatorios_lote import nome_arquivo_relatorio, renderizar_relatorio, zip_relatorios
+
+
+def diretorio_relatorios():
+    diretorio = Path(getattr(settings, 'PONTO_RELATORIOS_DIR', settings.BASE_DIR / 'relatorios'))
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return diretorio
+
+
+def identificador_worker():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enfileirar_relatorio(funcionario_ids, data_inicio, data_fim, solicitado_por=None):
+    funcionario_ids = sorted(set(funcionario_ids))
+    return TarefaRelatorio.objects.create(
+        funcionario_ids=funcionario_ids,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        solicitado_por=solicitado_por,
+        total=len(funcionario_ids),
+    )
+
+
+def reservar_proxima_tarefa(worker=None):
+    """
+    Reserva a tarefa mais antiga da fila, ou None se a fila estiver vazia.
+    Vários workers podem rodar juntos: skip_locked pula linhas já travadas por outro worker
+    (no PostgreSQL); o UPDATE condicional garante a reserva também onde não há FOR UPDATE (SQLite).
+    """
+    with transaction.atomic():
+        tarefa = TarefaRelatorio.objects.select_for_update(skip_locked=True).filter(
+            status=TarefaRelatorio.NA_FILA
+        ).order_by('criada_em', 'id').first()
+        if tarefa is None:
+            return None
+
+        agora = timezone.now()
+        campos = {
+            'status': TarefaRelatorio.EXECUTANDO,
+            'iniciada_em': agora,
+            'ultimo_sinal_em': agora,
+            'worker': worker or identificador_worker(),
+        }
+        reservada = TarefaRelatorio.objects.filter(
+            pk=tarefa.pk, status=TarefaRelatorio.NA_FILA
+        ).update(**campos)
+        if not reservada:
+            return None
+
+    for campo, valor in campos.items():
+        setattr(tarefa, campo, valor)
+    return tarefa
+
+
+def recuperar_tarefas_travadas(timeout_segundos=None):
+    """
+    Devolve à fila as tarefas "executando" sem sinal do worker há mais que o timeout (worker morreu
+    no meio). Uma tarefa longa, mas viva, renova o sinal a cada relatório e não é pega de novo.
+    """
+    if timeout_segundos is None:
+        timeout_segundos = getattr(settings, 'PONTO_FILA_TIMEOUT_SEGUNDOS', 3600)
+    limite = timezone.now() - timedelta(seconds=timeout_segundos)
+    return TarefaRelatorio.objects.filter(
+        # Sem sinal: reservada antes de o campo existir, vale o início
+        Q(ultimo_sinal_em__lt=limite) | Q(ultimo_sinal_em__isnull=True, iniciada_em__lt=limite),
+        status=TarefaRelatorio.EXECUTANDO,
+    ).update(status=TarefaRelatorio.NA_FILA, iniciada_em=None, ultimo_sinal_em=None, worker='', concluidos=0)
+
+
+def _nome_arquivo(tarefa):
+    if len(tarefa.funcionario_ids) == 1:
+        funcionario = obter_funcionario(tarefa.funcionario_ids[0])
+        username = funcionario.username if funcionario else str(tarefa.funcionario_ids[0])
+        return f'{tarefa.pk}_{nome_arquivo_relatorio(username, tarefa.data_inicio)}'
+    return f"{tarefa.pk}_relatorios_ponto_{tarefa.data_inicio.strftime('%Y_%m')}.zip"
+
+
+def executar_tarefa(tarefa):
+    """
+    Gera o PDF (um funcionário) ou o ZIP (vários) da tarefa e grava o resultado.
+    Se a tarefa voltou para a fila e outro worker a pegou, este descarta o que gerou.
+    """
+    def ainda_minha():
+        return TarefaRelatorio.objects.filter(pk=tarefa.pk, status=TarefaRelatorio.EXECUTANDO, worker=tarefa.worker)
+
+    def progresso(concluidos, total, funcionario_id, erro):
+        ainda_minha().update(concluidos=concluidos, ultimo_sinal_em=timezone.now())
+
+    destino = diretorio_relatorios() / _nome_arquivo(tarefa)
+    # Um arquivo parcial por worker: dois workers na mesma tarefa não escrevem no mesmo arquivo
+    worker = re.sub(r'[^\w.-]', '_', tarefa.worker)
+    temporario = destino.with_name(f'{destino.name}.{worker}.parcial')
+
+    try:
+        with open(temporario, 'wb') as arquivo:
+            if len(tarefa.funcionario_ids) == 1:
+                arquivo.write(renderizar_relatorio(tarefa.funcionario_ids[0], tarefa.data_inicio, tarefa.data_fim))
+                progresso(1, 1, tarefa.funcionario_ids[0], None)
+            else:
+                for parte in zip_relatorios(tarefa.funcionario_ids, tarefa.data_inicio, tarefa.data_fim,
+                                            progresso=progresso):
+                    arquivo.write(parte)
+    except Exception as e:
+        temporario.unlink(missing_ok=True)
+        campos = {'status': TarefaRelatorio.FALHOU, 'erro': str(e)}
+    else:
+        campos = {'status': TarefaRelatorio.CONCLUIDA, 'arquivo': str(destino), 'concluidos': tarefa.total}
+    campos['finalizada_em'] = timezone.now()
+
+    with transaction.atomic():
+        gravada = ainda_minha().update(**campos)
+        if gravada and campos['status'] == TarefaRelatorio.CONCLUIDA:
+            # Só aparece com o nome final depois de completo (e antes do commit que o anuncia)
+            os.replace(temporario, destino)
+    if not gravada:
+        temporario.unlink(missing_ok=True)
+        return tarefa
+
+    for campo, valor in campos.items():
+        setattr(tarefa, campo, valor)
+    return tarefa
+
+
+def processar_fila(worker=None, limite=None):
+    """
+    Executa tarefas até a fila esvaziar (ou até "limite" tarefas); devolve quantas executou
+    """
+    executadas = 0
+    while limite is None or executadas < limite:
+        tarefa = reservar_proxima_tarefa(worker)
+        if tarefa is None:
+            break
+        executar_tarefa(tarefa)
+        executadas += 1
+    return executadas
@@ -0,0 +1,224 @@
+# folha_numpy.py - FECHAMENTO DA FOLHA EM LOTE (NUMPY VETORIZADO)
+# Carrega os registros do período uma vez, em colunas (funcionário, instante, tipo), e calcula
+# pares E->S, dias locais e totais contra a jornada prevista de cada dia (JornadaPrevista, busca
+# binária sobre as chaves ordenadas) sem laço Python por registro.
+# Mesma regra de jornada.calcular_minutos_trabalhados / calcular_saldo.
+# NumPy é opcional para o resto do sistema: só este módulo precisa dele.
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.db import connections
+from django.db.models import DateTimeField, F, Value
+
+from .escala import JORNADA_PADRAO_MINUTOS, garantir_previstos
+from .fuso import FUSO_LOCAL
+from .horas_sql import MicrossegundosEntre
+from .arquivo_ponto import registros_periodo
+from .models import JornadaPrevista
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+ENTRADA = 1
+SAIDA = 0
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROS_DIA = 86_400 * 1_000_000
+_MICROS_MINUTO = 60 * 1_000_000
+# Chave (funcionário, dia) num único int64: funcionario * 2**20 + dias desde a época (até o ano 4840)
+_DIAS_POR_FUNCIONARIO = 1 << 20
+
+TotaisFolha = namedtuple('TotaisFolha', 'funcionario_id dias minutos_trabalhados minutos_extras minutos_deficit')
+
+
+def numpy_disponivel():
+    return np is not None
+
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError('NumPy não está instalado: pip install numpy (veja requirements.txt)')
+
+
+def carregar_colunas(data_inicio, data_fim, funcionario_ids=None):
+    """
+    Registros do período como arrays ordenados por (funcionário, instante, id):
+    funcionario (int64), instante (int64, microssegundos desde a época), tipo (int8: 1 = E, 0 = S)
+    """
+    _exigir_numpy()
+    registros = registros_periodo(data_inicio, data_fim)
+    if funcionario_ids is not None:
+        registros = registros.filter(funcionario_id__in=funcionario_ids)
+    registros = registros.order_by('funcionario_id', 'timestamp', 'id')
+    conexao = connections[registros.db]
+
+    if conexao.vendor == 'sqlite':
+        # SQLite guarda o timestamp como texto em UTC: lê sem os conversores do Django
+        # e deixa o NumPy converter a coluna inteira de uma vez (id: coluna da ordenação, exigida no
+        # ORDER BY do UNION com o arquivo)
+        sql, params = registros.values_list('funcionario_id', 'timestamp', 'tipo', 'id').query.sql_with_params()
+        with conexao.cursor() as cursor:
+            cursor.execute(sql, params)
+            linhas = cursor.fetchall()
+    else:
+        # Demais bancos devolvem o instante já como inteiro (sem montar um datetime por linha)
+        linhas = list(registros.annotate(
+            instante=MicrossegundosEntre(F('timestamp'), Value(_EPOCA, output_field=DateTimeField())),
+        ).values_list('funcionario_id', 'instante', 'tipo'))
+
+    if not linhas:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio, np.array([], dtype=np.int8)
+
+    funcionarios, instantes, tipos = list(zip(*linhas))[:3]
+    if conexao.vendor == 'sqlite':
+        instantes = np.array(instantes, dtype='datetime64[us]').astype(np.int64)
+
+    return (
+        np.array(funcionarios, dtype=np.int64),
+        np.array(instantes, dtype=np.int64),
+        (np.array(tipos) == 'E').astype(np.int8),
+    )
+
+
+def carregar_previstos(data_inicio, data_fim, funcionario_ids=None):
+    """
+    Jornada prevista do período como arrays: chaves (funcionário, dia) ordenadas (int64) e minutos (int64).
+    Expande antes os dias que ainda não estão em JornadaPrevista.
+    """
+    _exigir_numpy()
+    garantir_previstos(data_inicio, data_fim, funcionario_ids)
+
+    previstas = JornadaPrevista.objects.filter(data__gte=data_inicio, data__lte=data_fim)
+    if funcionario_ids is not None:
+        previstas = previstas.filter(funcionario_id__in=funcionario_ids)
+    previstas = previstas.order_by('funcionario_id', 'data').values_list('funcionario_id', 'data', 'minutos_previstos')
+    conexao = connections[previstas.db]
+
+    if conexao.vendor == 'sqlite':
+        # Mesmo atalho de carregar_colunas: datas como texto, convertidas pelo NumPy de uma vez
+        sql, params = previstas.query.sql_with_params()
+        with conexao.cursor() as cursor:
+            cursor.execute(sql, params)
+            linhas = cursor.fetchall()
+    else:
+        linhas = list(previstas)
+
+    if not linhas:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio
+
+    funcionarios, datas, minutos = zip(*linhas)
+    dias = np.array(datas, dtype='datetime64[D]').astype(np.int64)
+    chaves = np.array(funcionarios, dtype=np.int64) * _DIAS_POR_FUNCIONARIO + dias
+    return chaves, np.array(minutos, dtype=np.int64)
+
+
+def buscar_previstos(previstos, funcionarios, dias):
+    """
+    Minutos previstos de cada (funcionário, dia); previstos = (chaves, minutos) de carregar_previstos.
+    Dia não expandido cai na jornada padrão.
+    """
+    chaves, minutos = previstos
+    if len(chaves) == 0:
+        return np.full(len(funcionarios), JORNADA_PADRAO_MINUTOS, dtype=np.int64)
+
+    procuradas = funcionarios * _DIAS_POR_FUNCIONARIO + dias
+    posicoes = np.minimum(np.searchsorted(chaves, procuradas), len(chaves) - 1)
+    return np.where(chaves[posicoes] == procuradas, minutos[posicoes], JORNADA_PADRAO_MINUTOS)
+
+
+def _deslocamento_local(data_inicio, data_fim):
+    """
+    UTC -> Manaus em microssegundos, se for o mesmo no período todo (Manaus não tem horário de verão
+    desde 2000); None se mudar dentro do período
+    """
+    deslocamentos = {
+        datetime.combine(dia, time(12), tzinfo=FUSO_LOCAL).utcoffset()
+        for dia in (data_inicio, data_fim)
+    }
+    if len(deslocamentos) != 1:
+        return None
+    return deslocamentos.pop() // timedelta(microseconds=1)
+
+
+def dias_locais(instantes, data_inicio, data_fim):
+    """
+    Dia local (dias desde 1970-01-01) de cada instante
+    """
+    deslocamento = _deslocamento_local(data_inicio, data_fim)
+    if deslocamento is not None:
+        return (instantes + deslocamento) // _MICROS_DIA
+
+    # Período cruzando mudança de fuso: resolve instante a instante
+    return np.array([
+        ((_EPOCA + timedelta(microseconds=int(instante))).astimezone(FUSO_LOCAL).date() - date(1970, 1, 1)).days
+        for instante in instantes
+    ], dtype=np.int64)
+
+
+def calcular_dias(funcionarios, instantes, tipos, dias, previstos=None):
+    """
+    Totais por (funcionário, dia local). Arrays de entrada ordenados por (funcionário, instante, id).
+    previstos: (chaves, minutos) de carregar_previstos; sem eles o saldo usa a jornada padrão.
+    Devolve (funcionario, dia, minutos_trabalhados, saldo_minutos), um elemento por dia com registro.
+    """
+    if len(funcionarios) == 0:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio, vazio, vazio
+
+    # Grupo = (funcionário, dia); um novo grupo começa onde um dos dois muda
+    novo_grupo = np.empty(len(funcionarios), dtype=bool)
+    novo_grupo[0] = True
+    novo_grupo[1:] = (funcionarios[1:] != funcionarios[:-1]) | (dias[1:] != dias[:-1])
+    inicio_grupo = np.flatnonzero(novo_grupo)
+
+    # Par = Entrada seguida imediatamente de Saída no mesmo grupo
+    # (uma Entrada nunca é a metade final de um par, então o pareamento guloso equivale a isto)
+    par = (tipos[:-1] == ENTRADA) & (tipos[1:] == SAIDA) & ~novo_grupo[1:]
+    # duracoes[i] = par que começa no registro i; o último registro de cada grupo nunca abre par
+    duracoes = np.zeros(len(funcionarios), dtype=np.int64)
+    duracoes[:-1] = np.where(par, instantes[1:] - instantes[:-1], 0)
+
+    # Arrays ordenados por grupo: reduceat soma cada fatia contígua em int64 (sem float)
+    micros = np.add.reduceat(duracoes, inicio_grupo)
+    minutos = micros // _MICROS_MINUTO
+
+    funcionario_grupo, dia_grupo = funcionarios[inicio_grupo], dias[inicio_grupo]
+    if previstos is None:
+        minutos_previstos = JORNADA_PADRAO_MINUTOS
+    else:
+        minutos_previstos = buscar_previstos(previstos, funcionario_grupo, dia_grupo)
+    saldo = np.where(minutos == 0, 0, minutos - minutos_previstos)
+
+    return funcionario_grupo, dia_grupo, minutos, saldo
+
+
+def fechar_periodo(data_inicio, data_fim, funcionario_ids=None):
+    """
+    {funcionario_id: TotaisFolha} do período para todos os funcionários com registro (ou os informados)
+    """
+    funcionarios, instantes, tipos = carregar_colunas(data_inicio, data_fim, funcionario_ids)
+    if len(funcionarios) == 0:
+        return {}
+
+    dias = dias_locais(instantes, data_inicio, data_fim)
+    previstos = carregar_previstos(data_inicio, data_fim, funcionario_ids)
+    funcionario_dia, _, minutos, saldo = calcular_dias(funcionarios, instantes, tipos, dias, previstos)
+
+    # Dias já vêm agrupados por funcionário: cada funcionário é uma fatia contígua
+    inicio_funcionario = np.flatnonzero(np.r_[True, funcionario_dia[1:] != funcionario_dia[:-1]])
+    ids = funcionario_dia[inicio_funcionario]
+    dias_por_funcionario = np.diff(np.r_[inicio_funcionario, len(funcionario_dia)])
+    trabalhados = np.add.reduceat(minutos, inicio_funcionario)
+    extras = np.add.reduceat(np.maximum(saldo, 0), inicio_funcionario)
+    deficit = np.add.reduceat(np.maximum(-saldo, 0), inicio_funcionario)
+
+    return {
+        int(funcionario_id): TotaisFolha(int(funcionario_id), int(dias_funcionario), int(total), int(extra), int(falta))
+        for funcionario_id, dias_funcionario, total, extra, falta in zip(
+            ids, dias_por_funcionario, trabalhados, extras, deficit
+        )
+    }
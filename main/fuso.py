@@ -0,0 +1,92 @@
+# fuso.py - FUSO HORÁRIO LOCAL (MANAUS, UTC-4) E FORMATAÇÃO DE DATAS/HORAS
+# Um único ZoneInfo por processo, no lugar das cópias de converter_para_manaus que faziam um
+# pytz.timezone() por chamada. O que depende só do dia (dd/mm/AAAA, dia da semana) é memorizado:
+# num histórico, milhares de linhas caem nos mesmos poucos dias.
+# Não importa Django: também serve a main/relatorio_pdf.py e aos processos do pool.
+from collections import namedtuple
+from datetime import datetime, time, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+FUSO_LOCAL = ZoneInfo('America/Manaus')
+
+DIAS_SEMANA = ('Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo')
+
+# local: datetime em Manaus; data_formatada: dd/mm/AAAA; hora: HH:MM; hora_segundos: HH:MM:SS;
+# completo: "dd/mm/AAAA HH:MM:SS"
+HorarioLocal = namedtuple('HorarioLocal', 'local data data_formatada hora hora_segundos completo')
+
+
+def para_local(timestamp):
+    """
+    Timestamp no fuso de Manaus; naive é considerado UTC e None continua None
+    """
+    if timestamp is None:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(FUSO_LOCAL)
+
+
+def interpretar_iso(valor):
+    """
+    Timestamp ISO 8601 enviado pelo kiosk (ponto em tempo real ou lote offline) -> datetime em Manaus.
+    Sem fuso explícito é considerado UTC, como em para_local. ValueError se inválido.
+    """
+    return para_local(datetime.fromisoformat(str(valor).replace('Z', '+00:00')))
+
+
+def data_local(timestamp):
+    return timestamp.astimezone(FUSO_LOCAL).date()
+
+
+def localizar(momento):
+    """
+    Horário local sem fuso (naive) -> aware em Manaus
+    """
+    return momento.replace(tzinfo=FUSO_LOCAL)
+
+
+def inicio_do_dia(data):
+    return datetime.combine(data, time.min, tzinfo=FUSO_LOCAL)
+
+
+@lru_cache(maxsize=4096)
+def formatar_data(data):
+    return data.strftime('%d/%m/%Y')
+
+
+@lru_cache(maxsize=4096)
+def dia_semana(data):
+    return DIAS_SEMANA[data.weekday()]
+
+
+def hora_minuto(timestamp):
+    local = timestamp.astimezone(FUSO_LOCAL)
+    return f'{local.hour:02d}:{local.minute:02d}'
+
+
+def horario_local(timestamp):
+    return converter_lote((timestamp,))[0]
+
+
+def converter_lote(timestamps):
+    """
+    [HorarioLocal] de uma sequência de timestamps, numa única passada: sem strftime por linha
+    (a data formatada vem do cache do dia; hora e minuto são montados direto)
+    """
+    fuso = FUSO_LOCAL
+    utc = timezone.utc
+    formatar = formatar_data
+    horarios = []
+    for timestamp in timestamps:
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=utc)
+        local = timestamp.astimezone(fuso)
+        data = local.date()
+        data_formatada = formatar(data)
+        hora = f'{local.hour:02d}:{local.minute:02d}'
+        hora_segundos = f'{hora}:{local.second:02d}'
+        horarios.append(HorarioLocal(local, data, data_formatada, hora, hora_segundos,
+                                     f'{data_formatada} {hora_segundos}'))
+    return horarios
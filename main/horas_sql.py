@@ -0,0 +1,130 @@
+# horas_sql.py - HORAS TRABALHADAS CALCULADAS NO BANCO (WINDOW FUNCTIONS)
+# Mesma regra de pareamento de jornada.calcular_minutos_trabalhados: dentro de cada dia local,
+# uma Entrada seguida imediatamente de uma Saída forma um par; marcações sem par não contam.
+# Com LEAD sobre (timestamp, id), cada 'E' cujo próximo registro do dia é 'S' soma a diferença.
+from collections import namedtuple
+from datetime import date
+
+from django.db import NotSupportedError, connections
+from django.db.models import BigIntegerField, Case, F, Func, Value, When, Window
+from django.db.models.functions import Lead, TruncDate
+
+from .arquivo_ponto import registros_periodo
+from .fuso import FUSO_LOCAL
+from .jornada import calcular_saldo, classificar_dia, previsto_sem_escala
+from .models import JornadaPrevista
+
+
+class MicrossegundosEntre(Func):
+    """
+    (fim - inicio) em microssegundos inteiros, calculado pelo banco
+    """
+    output_field = BigIntegerField()
+
+    def __init__(self, fim, inicio, **extra):
+        super().__init__(fim, inicio, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f'MicrossegundosEntre não implementado para {connection.vendor}')
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Função registrada pelo backend SQLite do Django (já devolve microssegundos)
+        return super().as_sql(compiler, connection, template='django_timestamp_diff(%(expressions)s)',
+                              **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template='CAST(EXTRACT(EPOCH FROM (%(expressions)s)) * 1000000 AS bigint)',
+            arg_joiner=' - ',
+            **extra_context
+        )
+
+
+class HorasDia(namedtuple('HorasDia', 'funcionario_id data microssegundos quantidade_registros minutos_previstos')):
+    """
+    minutos_previstos vem de JornadaPrevista (None se o dia ainda não foi expandido: vale o calendário)
+    """
+    __slots__ = ()
+
+    @property
+    def segundos_trabalhados(self):
+        return self.microssegundos // 1_000_000
+
+    @property
+    def minutos_trabalhados(self):
+        return self.microssegundos // 60_000_000
+
+    @property
+    def previstos(self):
+        if self.minutos_previstos is None:
+            return previsto_sem_escala(self.data)
+        return self.minutos_previstos
+
+    @property
+    def saldo_minutos(self):
+        return calcular_saldo(self.minutos_trabalhados, self.previstos)
+
+    @property
+    def observacao(self):
+        return classificar_dia(self.data, self.quantidade_registros, self.minutos_trabalhados, self.previstos)
+
+
+def consulta_pares(data_inicio, data_fim, funcionario_ids=None):
+    """
+    Uma linha por registro: funcionario_id, dia local e microssegundos do par que ele abre (0 se não abre par)
+    """
+    # Com meses arquivados no período, as janelas rodam em cada tabela (um dia nunca fica dividido)
+    registros = registros_periodo(data_inicio, data_fim)
+    if funcionario_ids is not None:
+        registros = registros.filter(funcionario_id__in=funcionario_ids)
+
+    janela = {
+        'partition_by': [F('funcionario_id'), F('dia')],
+        'order_by': [F('timestamp').asc(), F('id').asc()],
+    }
+    return registros.annotate(
+        dia=TruncDate('timestamp', tzinfo=FUSO_LOCAL),
+    ).annotate(
+        proximo_tipo=Window(Lead('tipo'), **janela),
+        proximo_timestamp=Window(Lead('timestamp'), **janela),
+    ).annotate(
+        microssegundos=Case(
+            When(tipo='E', proximo_tipo='S', then=MicrossegundosEntre(F('proximo_timestamp'), F('timestamp'))),
+            default=Value(0),
+            output_field=BigIntegerField(),
+        ),
+    ).order_by().values('funcionario_id', 'dia', 'microssegundos')
+
+
+def horas_por_dia(data_inicio, data_fim, funcionario_ids=None):
+    """
+    {(funcionario_id, dia): HorasDia} de todos os funcionários (ou dos informados) numa única consulta,
+    já com a jornada prevista de cada dia (expanda o período antes com escala.garantir_previstos).
+    Só os dias com registro aparecem.
+    """
+    pares = consulta_pares(data_inicio, data_fim, funcionario_ids)
+    sql, params = pares.query.sql_with_params()
+    conexao = connections[pares.db]
+    previstas = conexao.ops.quote_name(JornadaPrevista._meta.db_table)
+
+    # Soma fora da janela: SQL não permite agregar uma window function no mesmo SELECT
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            f'SELECT dias.funcionario_id, dias.dia, dias.microssegundos, dias.quantidade, previstas.minutos_previstos '
+            f'FROM (SELECT funcionario_id, dia, SUM(microssegundos) AS microssegundos, COUNT(*) AS quantidade '
+            f'FROM ({sql}) pares GROUP BY funcionario_id, dia) dias '
+            f'LEFT JOIN {previstas} previstas '
+            f'ON previstas.funcionario_id = dias.funcionario_id AND previstas.data = dias.dia',
+            params
+        )
+        linhas = cursor.fetchall()
+
+    resultado = {}
+    for funcionario_id, dia, microssegundos, quantidade, minutos_previstos in linhas:
+        if isinstance(dia, str):
+            # SQLite devolve a data como texto
+            dia = date.fromisoformat(dia)
+        resultado[(funcionario_id, dia)] = HorasDia(funcionario_id, dia, int(microssegundos), quantidade,
+                                                    minutos_previstos)
+    return resultado
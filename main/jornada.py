@@ -0,0 +1,248 @@
+# jornada.py - JORNADA DIÁRIA MATERIALIZADA (UMA LINHA POR FUNCIONÁRIO E DIA LOCAL)
+# Cada alteração em RegistroPonto recalcula só o(s) dia(s) afetado(s); relatórios não reprocessam o período.
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from .arquivo_ponto import registros_periodo
+from .banco_horas import atualizar_banco_horas, mes_de, reconstruir_banco_horas, somar_saldo_dos_dias
+from .calendario import dia_util
+from .fuso import data_local, hora_minuto
+from .escala import JORNADA_PADRAO_MINUTOS, obter_previstos
+from .models import JornadaDiaria
+
+_CAMPOS_ATUALIZADOS = ('minutos_trabalhados', 'saldo_minutos', 'primeira_entrada', 'ultima_saida',
+                       'quantidade_registros', 'observacao', 'horarios', 'atualizado_em')
+
+
+# Dia local (Manaus) do timestamp; mesmo nome usado pelos signals e pelo lote
+dia_local = data_local
+
+
+def calcular_minutos_trabalhados(marcacoes):
+    """
+    Soma os pares Entrada -> Saída consecutivos; marcações sem par são ignoradas.
+    marcacoes: [(tipo, timestamp)] em ordem cronológica
+    """
+    total_segundos = 0
+    i = 0
+    while i < len(marcacoes) - 1:
+        if marcacoes[i][0] == 'E' and marcacoes[i + 1][0] == 'S':
+            total_segundos += (marcacoes[i + 1][1] - marcacoes[i][1]).total_seconds()
+            i += 2  # Pular para o próximo par
+        else:
+            i += 1  # Avançar se não for um par válido
+    return int(total_segundos // 60)
+
+
+def calcular_saldo(minutos_trabalhados, minutos_previstos=JORNADA_PADRAO_MINUTOS):
+    # Dia sem nenhum par completo não gera déficit (mesmo critério do relatório original)
+    if minutos_trabalhados == 0:
+        return 0
+    return minutos_trabalhados - minutos_previstos
+
+
+def previsto_sem_escala(data):
+    """
+    Jornada padrão pelo calendário (dias úteis), para quem não consulta JornadaPrevista
+    """
+    return JORNADA_PADRAO_MINUTOS if dia_util(data) else 0
+
+
+def classificar_dia(data, quantidade_registros, minutos_trabalhados, minutos_previstos=None):
+    if minutos_previstos is None:
+        minutos_previstos = previsto_sem_escala(data)
+    if minutos_previstos == 0:  # Fim de semana, folga da escala ou feriado
+        return 'compensado'
+    if quantidade_registros == 0:
+        return 'falta'
+    if minutos_trabalhados == 0:
+        return 'ok'
+    if minutos_trabalhados < minutos_previstos:
+        return 'incompleta'
+    if minutos_trabalhados > minutos_previstos:
+        return 'extras'
+    return 'ok'
+
+
+def montar_jornada(funcionario_id, data, marcacoes, minutos_previstos):
+    """
+    JornadaDiaria (não gravada) de um dia; marcacoes: [(tipo, timestamp)] em ordem cronológica
+    """
+    horarios = ['-'] * 8
+    entradas = saidas = 0
+    for tipo, timestamp in marcacoes:
+        hora = hora_minuto(timestamp)
+        if tipo == 'E' and entradas < 4:
+            horarios[entradas * 2] = hora
+            entradas += 1
+        elif tipo == 'S' and saidas < 4:
+            horarios[saidas * 2 + 1] = hora
+            saidas += 1
+
+    minutos = calcular_minutos_trabalhados(marcacoes)
+    entradas_dia = [timestamp for tipo, timestamp in marcacoes if tipo == 'E']
+    saidas_dia = [timestamp for tipo, timestamp in marcacoes if tipo == 'S']
+
+    return JornadaDiaria(
+        funcionario_id=funcionario_id,
+        data=data,
+        minutos_trabalhados=minutos,
+        saldo_minutos=calcular_saldo(minutos, minutos_previstos),
+        primeira_entrada=entradas_dia[0] if entradas_dia else None,
+        ultima_saida=saidas_dia[-1] if saidas_dia else None,
+        quantidade_registros=len(marcacoes),
+        observacao=classificar_dia(data, len(marcacoes), minutos, minutos_previstos),
+        horarios=horarios,
+    )
+
+
+def _agrupar_por_dia(linhas):
+    """
+    (funcionario_id, tipo, timestamp) em ordem cronológica -> {(funcionario_id, dia): [(tipo, timestamp)]}
+    """
+    por_dia = defaultdict(list)
+    for funcionario_id, tipo, timestamp in linhas:
+        por_dia[(funcionario_id, dia_local(timestamp))].append((tipo, timestamp))
+    return por_dia
+
+
+def _gravar(jornadas):
+    JornadaDiaria.objects.bulk_create(
+        jornadas,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['funcionario', 'data'],
+        update_fields=_CAMPOS_ATUALIZADOS,
+    )
+
+
+def recalcular_jornadas(pares):
+    """
+    Recalcula os dias (funcionario_id, data) informados: uma leitura dos registros,
+    um upsert e, se algum dia ficou sem registros, um DELETE. O banco de horas recebe a diferença
+    num UPDATE quando os dias são de um funcionário só, no seu mês mais recente (o ponto do kiosk);
+    senão é recalculado a partir do mês do dia mais antigo de cada funcionário.
+    """
+    pares = set(pares)
+    if not pares:
+        return
+
+    # Edição no admin de um dia de mês arquivado: o dia é lido também do arquivo
+    linhas = registros_periodo(min(data for _, data in pares), max(data for _, data in pares)).filter(
+        funcionario_id__in={funcionario_id for funcionario_id, _ in pares},
+    ).order_by('funcionario_id', 'timestamp', 'id').values_list('funcionario_id', 'tipo', 'timestamp')
+    por_dia = _agrupar_por_dia(linhas)
+    previstos = obter_previstos(par for par in pares if par in por_dia)
+
+    jornadas = []
+    vazios = []
+    for funcionario_id, data in pares:
+        marcacoes = por_dia.get((funcionario_id, data))
+        if marcacoes:
+            jornadas.append(montar_jornada(funcionario_id, data, marcacoes, previstos[(funcionario_id, data)]))
+        else:
+            vazios.append(Q(funcionario_id=funcionario_id, data=data))
+
+    # Antes do upsert: a diferença é calculada contra o saldo ainda gravado dos dias
+    if not vazios and len({(funcionario_id, mes_de(data)) for funcionario_id, data in pares}) == 1:
+        funcionario_id, data = next(iter(pares))
+        somado = somar_saldo_dos_dias(funcionario_id, mes_de(data), [data for _, data in pares],
+                                      sum(jornada.saldo_minutos for jornada in jornadas))
+    else:
+        somado = False
+
+    if jornadas:
+        _gravar(jornadas)
+    if vazios:
+        JornadaDiaria.objects.filter(reduce(or_, vazios)).delete()
+    if somado:
+        return
+
+    inicios = {}
+    for funcionario_id, data in pares:
+        if funcionario_id not in inicios or data < inicios[funcionario_id]:
+            inicios[funcionario_id] = data
+    atualizar_banco_horas(inicios)
+
+
+def recalcular_jornadas_existentes(pares):
+    """
+    Recalcula só os dias que já têm jornada gravada (mudança de feriado/escala)
+    """
+    pares = set(pares)
+    if not pares:
+        return
+    datas = [data for _, data in pares]
+    existentes = JornadaDiaria.objects.filter(
+        funcionario_id__in={funcionario_id for funcionario_id, _ in pares},
+        data__gte=min(datas),
+        data__lte=max(datas),
+    ).values_list('funcionario_id', 'data')
+    recalcular_jornadas(pares.intersection(existentes))
+
+
+def aplicar_registro_jornada(registro, anterior=None):
+    """
+    Atualiza o dia do registro e, numa edição, o dia/funcionário de antes
+    """
+    pares = {(registro.funcionario_id, dia_local(registro.timestamp))}
+    if anterior is not None:
+        pares.add(anterior)
+    recalcular_jornadas(pares)
+
+
+def remover_registro_jornada(registro):
+    recalcular_jornadas({(registro.funcionario_id, dia_local(registro.timestamp))})
+
+
+def reconstruir_jornadas(tamanho_bloco=2000):
+    """
+    Reconstrói a tabela inteira a partir do histórico, arquivo incluído (usado pelo comando de manutenção),
+    e o banco de horas
+    """
+    linhas = registros_periodo().order_by('funcionario_id', 'timestamp', 'id').values_list(
+        'funcionario_id', 'tipo', 'timestamp'
+    ).iterator(chunk_size=tamanho_bloco)
+
+    total = 0
+    with transaction.atomic():
+        JornadaDiaria.objects.all().delete()
+
+        pendentes = []
+        dia_atual = None
+        marcacoes = []
+        for funcionario_id, tipo, timestamp in linhas:
+            chave = (funcionario_id, dia_local(timestamp))
+            if chave != dia_atual:
+                if marcacoes:
+                    pendentes.append((dia_atual, marcacoes))
+                dia_atual, marcacoes = chave, []
+            marcacoes.append((tipo, timestamp))
+
+            if len(pendentes) >= tamanho_bloco:
+                total += _gravar_bloco(pendentes)
+                pendentes = []
+
+        if marcacoes:
+            pendentes.append((dia_atual, marcacoes))
+        total += _gravar_bloco(pendentes)
+
+        reconstruir_banco_horas()
+
+    return total
+
+
+def _gravar_bloco(pendentes):
+    """
+    [((funcionario_id, data), marcacoes)] -> uma leitura de JornadaPrevista e um bulk_create
+    """
+    previstos = obter_previstos(chave for chave, _ in pendentes)
+    JornadaDiaria.objects.bulk_create(
+        [montar_jornada(*chave, marcacoes, previstos[chave]) for chave, marcacoes in pendentes],
+        batch_size=500
+    )
+    return len(pendentes)
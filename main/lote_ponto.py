@@ -0,0 +1,152 @@
+# lote_ponto.py - INGESTÃO EM LOTE DE PONTOS (KIOSKS QUE FICARAM OFFLINE)
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_funcionarios import obter_funcionarios_por_user
+from .cache_ultimo_ponto import gravar_ultimo_ponto
+from .estado_ponto import bloquear_estados_ponto
+from .fuso import interpretar_iso
+from .jornada import dia_local, recalcular_jornadas
+from .models import EstadoPonto, RegistroPonto
+
+
+class ItemLote:
+    """
+    Um ponto do lote, com o resultado do processamento
+    """
+
+    def __init__(self, indice, dados):
+        self.indice = indice
+        self.dados = dados
+        self.user_id = None
+        self.timestamp = None
+        self.chave_idempotencia = None
+        self.status = None
+        self.detail = None
+        # (registro, tipo, timestamp): registro é o RegistroPonto criado ou o id do ponto repetido
+        self.registro = None
+        self.payload = None
+
+    def erro(self, status, detail):
+        self.status = status
+        self.detail = detail
+
+
+def validar_itens(itens):
+    """
+    Valida todos os itens numa única passada (sem acessar o banco)
+    """
+    validos = []
+    for item in itens:
+        if not isinstance(item.dados, dict):
+            item.erro(400, 'Item inválido: esperado um objeto.')
+            continue
+
+        try:
+            item.user_id = int(item.dados.get('funcionario_id'))
+        except (TypeError, ValueError):
+            item.erro(400, 'ID do funcionário inválido ou não fornecido.')
+            continue
+
+        if not item.dados.get('timestamp'):
+            item.erro(400, 'Timestamp não fornecido.')
+            continue
+        try:
+            item.timestamp = interpretar_iso(item.dados['timestamp'])
+        except ValueError:
+            item.erro(400, 'Timestamp inválido.')
+            continue
+
+        chave = item.dados.get('idempotency_key')
+        if chave:
+            item.chave_idempotencia = (str(item.user_id), str(chave))
+
+        validos.append(item)
+    return validos
+
+
+def processar_lote(itens):
+    """
+    Registra os pontos válidos: resolve os funcionários (cache + no máximo um IN),
+    calcula a alternância E/S em memória (por funcionário, em ordem de timestamp)
+    e insere tudo com bulk_create numa única transação.
+    """
+    if not itens:
+        return
+
+    # Cache de funcionários; os que faltam vêm num único SELECT ... WHERE user_id IN (...)
+    funcionarios = obter_funcionarios_por_user({item.user_id for item in itens})
+
+    por_funcionario = defaultdict(list)
+    for item in itens:
+        funcionario = funcionarios.get(item.user_id)
+        if funcionario is None:
+            item.erro(404, 'Funcionário não encontrado.')
+        else:
+            por_funcionario[funcionario.id].append(item)
+
+    if not por_funcionario:
+        return
+
+    janela_duplicidade = timedelta(
+        seconds=getattr(settings, 'PONTO_JANELA_DUPLICIDADE_SEGUNDOS', 60)
+    )
+
+    with transaction.atomic():
+        # Trava as linhas de estado: serializa com registro_ponto_api e outros lotes
+        estados = bloquear_estados_ponto(por_funcionario)
+
+        novos = []
+        for funcionario_id, itens_funcionario in por_funcionario.items():
+            estado = estados[funcionario_id]
+            ultimo = None
+            if estado.ultimo_registro_id:
+                ultimo = (estado.ultimo_registro_id, estado.ultimo_tipo, estado.ultimo_timestamp)
+
+            for item in sorted(itens_funcionario, key=lambda i: i.timestamp):
+                if ultimo and item.timestamp < ultimo[2]:
+                    item.erro(409, 'Registro anterior ao último ponto do funcionário.')
+                    continue
+
+                if ultimo and janela_duplicidade and item.timestamp - ultimo[2] < janela_duplicidade:
+                    item.status = 200
+                    item.detail = 'Ponto já registrado há instantes.'
+                    item.registro = ultimo
+                    continue
+
+                tipo = 'S' if ultimo and ultimo[1] == 'E' else 'E'
+                registro = RegistroPonto(funcionario_id=funcionario_id, tipo=tipo, timestamp=item.timestamp)
+                novos.append(registro)
+
+                item.status = 201
+                item.detail = 'Ponto registrado com sucesso.'
+                item.registro = (registro, tipo, item.timestamp)
+                ultimo = item.registro
+
+        RegistroPonto.objects.bulk_create(novos, batch_size=500)
+
+        # bulk_create não dispara post_save: atualiza os estados aqui, na mesma transação
+        agora = timezone.now()
+        alterados = {}
+        for registro in novos:
+            estado = estados[registro.funcionario_id]
+            estado.ultimo_tipo = registro.tipo
+            estado.ultimo_timestamp = registro.timestamp
+            estado.ultimo_registro_id = registro.pk
+            estado.atualizado_em = agora
+            alterados[estado.pk] = estado
+
+        EstadoPonto.objects.bulk_update(
+            list(alterados.values()),
+            ['ultimo_tipo', 'ultimo_timestamp', 'ultimo_registro', 'atualizado_em'],
+            batch_size=500
+        )
+        for estado in alterados.values():
+            gravar_ultimo_ponto(estado.pk, estado.ultimo_tipo, estado.ultimo_timestamp)
+
+        # Idem para a jornada diária: recalcula de uma vez todos os dias tocados pelo lote
+        recalcular_jornadas({(registro.funcionario_id, dia_local(registro.timestamp)) for registro in novos})
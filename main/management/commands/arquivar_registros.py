@@ -0,0 +1,44 @@
+import math
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.arquivo_ponto import arquivar_mes, meses_arquivaveis
+
+
+class Command(BaseCommand):
+    help = ('Move os registros de ponto dos meses fechados para RegistroPontoArquivado, em lotes (uma transação '
+            'por lote), mantendo na tabela quente o mês atual e os --meses-quentes anteriores. Pode ser '
+            'interrompido e rodado de novo: continua de onde parou. Histórico e relatórios continuam vendo '
+            'os registros arquivados.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses-quentes', type=int,
+                            default=getattr(settings, 'PONTO_ARQUIVO_MESES_QUENTES', 3),
+                            help='Meses fechados mantidos na tabela quente, além do atual')
+        parser.add_argument('--lote', type=int, default=getattr(settings, 'PONTO_ARQUIVO_LOTE', 5000),
+                            help='Registros movidos por transação')
+        parser.add_argument('--max-lotes', type=int, default=None,
+                            help='Para depois de N lotes (execuções curtas; a próxima continua)')
+
+    def handle(self, *args, **options):
+        if options['meses_quentes'] < 0 or options['lote'] < 1:
+            raise CommandError('--meses-quentes não pode ser negativo e --lote deve ser positivo.')
+
+        restantes = options['max_lotes']
+        total = 0
+        for mes in meses_arquivaveis(options['meses_quentes']):
+            if restantes is not None and restantes <= 0:
+                self.stdout.write('Limite de lotes atingido: rode o comando de novo para continuar.')
+                break
+            movidos, concluido = arquivar_mes(mes, options['lote'], restantes)
+            total += movidos
+            if restantes is not None:
+                restantes -= math.ceil(movidos / options['lote'])
+            situacao = 'concluído' if concluido else 'pendente'
+            self.stdout.write(f'{mes:%m/%Y}: {movidos} registro(s) arquivado(s) ({situacao}).')
+            if not concluido:
+                self.stdout.write('Limite de lotes atingido: rode o comando de novo para continuar.')
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} registro(s) movido(s) para o arquivo.'))
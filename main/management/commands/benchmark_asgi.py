@@ -0,0 +1,117 @@
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.carga import DESCRICAO_SERIES_REGISTRO, SERIES_REGISTRO, Requisicao, executar_carga
+from main.models import Funcionario
+
+
+class Command(BaseCommand):
+    help = ('Compara requisições/s das APIs do kiosk servidas por WSGI (gunicorn sync) '
+            'e por ASGI (gunicorn + uvicorn, views assíncronas) com N clientes simultâneos. '
+            'Os servidores iniciados aqui rodam sem janela de toque duplo, para que cada registro grave '
+            'um ponto; o registro é medido em séries separadas para 201 (gravado) e 200 (toque duplo).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=200)
+        parser.add_argument('--duracao', type=float, default=10, help='Segundos de carga por servidor')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--endpoint', choices=['ultimo', 'registro', 'misto'], default='misto')
+        parser.add_argument('--porta-wsgi', type=int, default=8101)
+        parser.add_argument('--porta-asgi', type=int, default=8102)
+        parser.add_argument('--url-wsgi', help='Usa um servidor WSGI já em execução em vez de subir um')
+        parser.add_argument('--url-asgi', help='Usa um servidor ASGI já em execução em vez de subir um')
+
+    def handle(self, *args, **options):
+        user_ids = self.preparar_funcionarios(options['clientes'])
+        requisicoes = self.gerador_requisicoes(options['endpoint'], user_ids)
+
+        resultados = {}
+        perfis = [
+            ('wsgi', options['url_wsgi'], options['porta_wsgi'],
+             ['ponto.wsgi:application', '--worker-class', 'sync']),
+            ('asgi', options['url_asgi'], options['porta_asgi'],
+             ['ponto.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker']),
+        ]
+        for nome, url, porta, argumentos in perfis:
+            processo = None
+            if not url:
+                url = f'http://127.0.0.1:{porta}'
+                processo = self.subir_servidor(porta, options['workers'], argumentos)
+            try:
+                self.stderr.write(f"Medindo {nome.upper()} em {url} com {options['clientes']} clientes...")
+                resultados[nome] = executar_carga(
+                    url, requisicoes, clientes=options['clientes'], duracao=options['duracao']
+                )
+            finally:
+                if processo:
+                    processo.terminate()
+                    processo.wait(timeout=30)
+
+        wsgi = resultados['wsgi']['req_por_segundo']
+        asgi = resultados['asgi']['req_por_segundo']
+        resultados['asgi_sobre_wsgi'] = round(asgi / wsgi, 2) if wsgi else None
+        resultados['series_registro'] = DESCRICAO_SERIES_REGISTRO
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def preparar_funcionarios(self, quantidade):
+        """
+        Um funcionário por cliente simulado (evita disputar o mesmo lock de estado)
+        """
+        user_ids = []
+        for indice in range(quantidade):
+            user, _ = User.objects.get_or_create(username=f'benchmark_{indice:04d}')
+            Funcionario.objects.get_or_create(user=user)
+            user_ids.append(user.pk)
+        return user_ids
+
+    def gerador_requisicoes(self, endpoint, user_ids):
+        ciclo_usuarios = itertools.cycle(user_ids)
+        contador = itertools.count()
+
+        def ultimo():
+            return Requisicao('ultimo-ponto', 'GET', f'/api/ultimo-ponto/?funcionario_id={next(ciclo_usuarios)}')
+
+        def registro():
+            return Requisicao('registro-ponto', 'POST', '/api/registro-ponto/',
+                              corpo={'funcionario_id': next(ciclo_usuarios)}, series_por_status=SERIES_REGISTRO)
+
+        if endpoint == 'ultimo':
+            return ultimo
+        if endpoint == 'registro':
+            return registro
+        # Misto: o kiosk consulta o último ponto ~3x para cada registro
+        return lambda: registro() if next(contador) % 4 == 0 else ultimo()
+
+    def subir_servidor(self, porta, workers, argumentos):
+        comando = [
+            sys.executable, '-m', 'gunicorn', *argumentos,
+            '--bind', f'127.0.0.1:{porta}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+        ]
+        # Sem janela de toque duplo: os clientes repetem funcionários em segundos e o registro
+        # mediria só o atalho "ponto já registrado"
+        ambiente = {**os.environ, 'PONTO_JANELA_DUPLICIDADE_SEGUNDOS': '0'}
+        processo = subprocess.Popen(comando, cwd=settings.BASE_DIR, env=ambiente)
+
+        prazo = time.monotonic() + 30
+        while time.monotonic() < prazo:
+            if processo.poll() is not None:
+                raise CommandError(f"Servidor terminou ao iniciar: {' '.join(comando)}")
+            try:
+                with socket.create_connection(('127.0.0.1', porta), timeout=0.5):
+                    return processo
+            except OSError:
+                time.sleep(0.2)
+
+        processo.terminate()
+        raise CommandError(f'Servidor não respondeu na porta {porta}')
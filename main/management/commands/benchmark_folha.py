@@ -0,0 +1,116 @@
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main import folha_numpy
+from main.escala import garantir_previstos, previstos_periodo
+from main.fuso import localizar
+from main.jornada import calcular_minutos_trabalhados, calcular_saldo, dia_local
+from main.models import Funcionario, RegistroPonto
+from main.utils import filtrar_periodo
+
+
+class Command(BaseCommand):
+    help = ('Fechamento de um mês para todos os funcionários: funções por funcionário/dia (Python) '
+            'contra o motor vetorizado de main/folha_numpy.py. '
+            'Os dados de teste são criados numa transação desfeita ao final.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--funcionarios', type=int, default=1000)
+        parser.add_argument('--ano', type=int, default=2025)
+        parser.add_argument('--mes', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not folha_numpy.numpy_disponivel():
+            raise CommandError('NumPy não está instalado (pip install numpy).')
+
+        data_inicio = date(options['ano'], options['mes'], 1)
+        data_fim = (data_inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        with transaction.atomic():
+            funcionario_ids, registros = self.criar_dados(options['funcionarios'], data_inicio, data_fim)
+
+            antes, totais_antes = self.medir(lambda: self.fechar_por_funcionario(funcionario_ids, data_inicio, data_fim))
+            depois, totais_depois = self.medir(lambda: {
+                funcionario_id: (totais.minutos_trabalhados, totais.minutos_extras, totais.minutos_deficit)
+                for funcionario_id, totais in folha_numpy.fechar_periodo(data_inicio, data_fim).items()
+            })
+
+            transaction.set_rollback(True)
+
+        resultados = {
+            'funcionarios': options['funcionarios'],
+            'registros': registros,
+            'periodo': [data_inicio.isoformat(), data_fim.isoformat()],
+            'antes': antes,
+            'depois': depois,
+            'ganho': round(antes['segundos'] / depois['segundos'], 1),
+            'resultados_iguais': totais_antes == totais_depois,
+        }
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def criar_dados(self, quantidade, data_inicio, data_fim):
+        usuarios = User.objects.bulk_create([
+            User(username=f'bench_folha_{indice}') for indice in range(quantidade)
+        ])
+        funcionarios = Funcionario.objects.bulk_create([Funcionario(user=user) for user in usuarios])
+
+        novos = []
+        dia = data_inicio
+        while dia <= data_fim:
+            if dia.weekday() < 5:
+                for indice, funcionario in enumerate(funcionarios):
+                    # Jornadas variadas: atrasos, horas extras e um ponto esquecido de vez em quando
+                    atraso = (indice * 7 + dia.day * 3) % 45
+                    horarios = [(8, atraso, 'E'), (12, 0, 'S'), (13, 0, 'E'), (17, 30 + atraso // 2, 'S')]
+                    if (indice + dia.day) % 17 == 0:
+                        horarios = horarios[:3]
+                    for hora, minuto, tipo in horarios:
+                        novos.append(RegistroPonto(
+                            funcionario=funcionario, tipo=tipo,
+                            timestamp=localizar(datetime.combine(dia, datetime.min.time()).replace(
+                                hour=hora, minute=minuto))
+                        ))
+            dia += timedelta(days=1)
+
+        RegistroPonto.objects.bulk_create(novos, batch_size=5000)
+        # Jornada prevista já expandida: os dois caminhos só leem JornadaPrevista
+        garantir_previstos(data_inicio, data_fim)
+        return [funcionario.pk for funcionario in funcionarios], len(novos)
+
+    def fechar_por_funcionario(self, funcionario_ids, data_inicio, data_fim):
+        """
+        Caminho atual: consultas por funcionário e as funções de jornada dia a dia
+        """
+        totais = {}
+        for funcionario_id in funcionario_ids:
+            registros = filtrar_periodo(
+                RegistroPonto.objects.filter(funcionario_id=funcionario_id), data_inicio, data_fim
+            ).order_by('timestamp', 'id')
+            previstos = previstos_periodo(funcionario_id, data_inicio, data_fim)
+
+            por_dia = {}
+            for registro in registros:
+                por_dia.setdefault(dia_local(registro.timestamp), []).append((registro.tipo, registro.timestamp))
+
+            trabalhados = extras = deficit = 0
+            for dia, marcacoes in por_dia.items():
+                minutos = calcular_minutos_trabalhados(marcacoes)
+                saldo = calcular_saldo(minutos, previstos[dia])
+                trabalhados += minutos
+                extras += max(saldo, 0)
+                deficit += max(-saldo, 0)
+
+            if por_dia:
+                totais[funcionario_id] = (trabalhados, extras, deficit)
+        return totais
+
+    def medir(self, fechar):
+        inicio = time.perf_counter()
+        totais = fechar()
+        duracao = time.perf_counter() - inicio
+        return {'segundos': round(duracao, 3)}, totais
@@ -0,0 +1,76 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from django.core.management.base import BaseCommand
+
+from main import fuso
+
+
+def converter_para_manaus_antigo(timestamp_utc):
+    """
+    Cópia da conversão antiga (views.py / utils.py / PontoHistoricoSerializer), como referência
+    """
+    try:
+        utc_tz = pytz.UTC
+        manaus_tz = pytz.timezone('America/Manaus')
+
+        if timestamp_utc.tzinfo is not None:
+            return timestamp_utc.astimezone(manaus_tz)
+        else:
+            timestamp_utc = utc_tz.localize(timestamp_utc)
+            return timestamp_utc.astimezone(manaus_tz)
+    except Exception as e:
+        print(f"Erro na conversão de timezone: {e}")
+        return timestamp_utc
+
+
+class Command(BaseCommand):
+    help = ('Custo por linha da conversão de fuso e formatação do histórico (timestamp_local, data, hora): '
+            'converter_para_manaus + strftime por campo contra main/fuso.py (ZoneInfo único, data '
+            'formatada memorizada, conversão em lote). Não usa o banco.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=200_000)
+        parser.add_argument('--dias', type=int, default=30,
+                            help='Dias distintos cobertos pelas linhas (o cache é por dia)')
+
+    def handle(self, *args, **options):
+        inicio = datetime(2025, 10, 1, 11, tzinfo=timezone.utc)
+        passo = timedelta(days=options['dias']) / options['linhas']
+        timestamps = [inicio + passo * indice for indice in range(options['linhas'])]
+
+        antes, valores_antes = self.medir(timestamps, self.formatar_antes)
+        fuso.formatar_data.cache_clear()
+        depois, valores_depois = self.medir(timestamps, self.formatar_depois)
+
+        resultados = {
+            'linhas': options['linhas'],
+            'dias': options['dias'],
+            'antes': antes,
+            'depois': depois,
+            'ganho': round(antes['segundos'] / depois['segundos'], 1),
+            'resultados_iguais': valores_antes == valores_depois,
+        }
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def formatar_antes(self, timestamps):
+        # Como PontoHistoricoSerializer fazia: uma conversão e um strftime por campo
+        return [(
+            converter_para_manaus_antigo(timestamp).strftime('%d/%m/%Y %H:%M:%S'),
+            converter_para_manaus_antigo(timestamp).strftime('%d/%m/%Y'),
+            converter_para_manaus_antigo(timestamp).strftime('%H:%M'),
+        ) for timestamp in timestamps]
+
+    def formatar_depois(self, timestamps):
+        return [(horario.completo, horario.data_formatada, horario.hora) for horario in fuso.converter_lote(timestamps)]
+
+    def medir(self, timestamps, formatar):
+        inicio = time.perf_counter()
+        valores = formatar(timestamps)
+        duracao = time.perf_counter() - inicio
+        return {
+            'segundos': round(duracao, 3),
+            'microssegundos_por_linha': round(duracao / len(timestamps) * 1_000_000, 2),
+        }, valores
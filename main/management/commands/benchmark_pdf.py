@@ -0,0 +1,157 @@
+import io
+import json
+import multiprocessing
+import re
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Os modelos são importados dentro dos métodos: renderizar_cenario roda num processo "spawn",
+# que importa este módulo sem django.setup() (main/relatorio_pdf.py não depende do Django)
+
+MODOS_BENCHMARK = ('platypus_tabela_unica', 'platypus', 'canvas')
+
+
+def pico_rss_mb():
+    """
+    Pico de memória residente deste processo. ru_maxrss sobrevive ao exec do "spawn" (herda o pico do
+    processo pai), então no Linux vale o VmHWM de /proc, que começa do zero no processo novo
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return round(int(linha.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    # ru_maxrss vem em KB no Linux e em bytes no macOS; aqui só chega fora do Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 / 1024, 1)
+
+
+def renderizar_cenario(lista_dados, modo):
+    """
+    Renderiza os relatórios de um cenário num processo novo: tempo, páginas e pico de memória (RSS) do processo
+    """
+    from main.relatorio_pdf import renderizar, renderizar_platypus
+
+    rss_antes = pico_rss_mb()
+    paginas = bytes_pdf = 0
+    inicio = time.perf_counter()
+    for dados in lista_dados:
+        buffer = io.BytesIO()
+        if modo == 'platypus_tabela_unica':
+            # Como era antes: um único Table com todas as linhas do período
+            renderizar_platypus(buffer, dados, linhas_por_bloco=None)
+        else:
+            renderizar(buffer, dados, modo)
+        pdf = buffer.getvalue()
+        paginas += len(re.findall(rb'/Type /Page\b(?!s)', pdf))
+        bytes_pdf += len(pdf)
+    duracao = time.perf_counter() - inicio
+
+    return {
+        'segundos': round(duracao, 3),
+        'paginas': paginas,
+        'paginas_por_segundo': round(paginas / duracao, 1),
+        'bytes': bytes_pdf,
+        'pico_rss_mb': pico_rss_mb(),
+        'rss_antes_mb': rss_antes,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Renderização do relatório de ponto em PDF: um funcionário em 1 mês e em 12 meses e um lote '
+            'de funcionários em 1 mês, com o platypus em tabela única, em blocos por página e o modo canvas. '
+            'Cada cenário roda num processo novo (pico de RSS isolado). '
+            'Os dados de teste são criados numa transação desfeita ao final.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--funcionarios', type=int, default=300)
+        parser.add_argument('--ano', type=int, default=2025)
+        parser.add_argument('--mes', type=int, default=10,
+                            help='Mês dos cenários de 1 mês (o de 12 meses termina nele)')
+
+    def handle(self, *args, **options):
+        from django.db import transaction
+
+        if options['funcionarios'] < 1:
+            raise CommandError('--funcionarios deve ser pelo menos 1.')
+
+        fim_mes = self.ultimo_dia(date(options['ano'], options['mes'], 1))
+        inicio_mes = fim_mes.replace(day=1)
+        inicio_ano = (fim_mes + timedelta(days=1)).replace(year=fim_mes.year - 1)
+
+        with transaction.atomic():
+            funcionario_ids = self.criar_dados(options['funcionarios'], inicio_ano, fim_mes)
+            cenarios = {
+                '1_mes': self.montar_dados(funcionario_ids[:1], inicio_mes, fim_mes),
+                '12_meses': self.montar_dados(funcionario_ids[:1], inicio_ano, fim_mes),
+                f"{options['funcionarios']}_funcionarios": self.montar_dados(funcionario_ids, inicio_mes, fim_mes),
+            }
+            transaction.set_rollback(True)
+
+        resultados = {}
+        for nome, lista_dados in cenarios.items():
+            resultados[nome] = {'relatorios': len(lista_dados)}
+            for modo in MODOS_BENCHMARK:
+                resultados[nome][modo] = self.medir(lista_dados, modo)
+            resultados[nome]['ganho_canvas'] = round(
+                resultados[nome]['platypus_tabela_unica']['segundos'] / resultados[nome]['canvas']['segundos'], 1)
+
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def ultimo_dia(self, data):
+        return (data.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    def criar_dados(self, quantidade, data_inicio, data_fim):
+        """
+        Funcionários com quatro marcações nos dias úteis; o primeiro tem o período inteiro (cenário de
+        12 meses), os demais só o último mês
+        """
+        from django.contrib.auth.models import User
+
+        from main.escala import garantir_previstos
+        from main.fuso import localizar
+        from main.jornada import recalcular_jornadas
+        from main.models import Funcionario, RegistroPonto
+
+        usuarios = User.objects.bulk_create([
+            User(username=f'bench_pdf_{indice}') for indice in range(quantidade)
+        ])
+        funcionarios = Funcionario.objects.bulk_create([Funcionario(user=user) for user in usuarios])
+
+        inicio_mes = data_fim.replace(day=1)
+        novos = []
+        dias = set()
+        dia = data_inicio
+        while dia <= data_fim:
+            if dia.weekday() < 5:
+                for indice, funcionario in enumerate(funcionarios if dia >= inicio_mes else funcionarios[:1]):
+                    atraso = (indice * 7 + dia.day * 3) % 45
+                    for hora, minuto, tipo in [(8, atraso, 'E'), (12, 0, 'S'), (13, 0, 'E'), (17, 30, 'S')]:
+                        novos.append(RegistroPonto(
+                            funcionario=funcionario, tipo=tipo,
+                            timestamp=localizar(datetime.combine(dia, datetime.min.time()).replace(
+                                hour=hora, minute=minuto))
+                        ))
+                    dias.add((funcionario.pk, dia))
+            dia += timedelta(days=1)
+
+        RegistroPonto.objects.bulk_create(novos, batch_size=5000)
+        garantir_previstos(data_inicio, data_fim, [funcionario.pk for funcionario in funcionarios])
+        # bulk_create não dispara os signals: consolida as jornadas dos dias criados
+        recalcular_jornadas(dias)
+        return [funcionario.pk for funcionario in funcionarios]
+
+    def montar_dados(self, funcionario_ids, data_inicio, data_fim):
+        from main.utils import dados_relatorio_ponto
+
+        return [dados_relatorio_ponto(funcionario_id, data_inicio, data_fim) for funcionario_id in funcionario_ids]
+
+    def medir(self, lista_dados, modo):
+        # Um processo por medição: o pico de RSS não herda o das medições anteriores
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return executor.submit(renderizar_cenario, lista_dados, modo).result()
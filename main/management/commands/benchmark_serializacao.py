@@ -0,0 +1,123 @@
+import json
+import time
+from datetime import timedelta
+
+import pytz
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from main.cache_funcionarios import cache_funcionarios
+from main.models import Funcionario, RegistroPonto
+from main.serializers import CAMPOS_HISTORICO, PontoHistoricoRapidoSerializer
+
+
+class PontoHistoricoSerializerAntigo(serializers.ModelSerializer):
+    """
+    Cópia do PontoHistoricoSerializer original, como referência: funcionario.user lido por linha
+    (duas consultas) e três converter_para_manaus com pytz por linha
+    """
+    funcionarioId = serializers.IntegerField(source='funcionario.user.id', read_only=True)
+    funcionarioNome = serializers.CharField(source='funcionario.user.get_full_name', read_only=True)
+    tipo = serializers.SerializerMethodField()
+    data = serializers.SerializerMethodField()
+    hora = serializers.SerializerMethodField()
+    timestamp_local = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RegistroPonto
+        fields = ('id', 'funcionarioId', 'funcionarioNome', 'tipo', 'timestamp', 'timestamp_local', 'data', 'hora',
+                  'observacao')
+
+    def get_tipo(self, obj):
+        return obj.get_tipo_display().lower()
+
+    def converter_para_manaus(self, timestamp_utc):
+        try:
+            utc_tz = pytz.UTC
+            manaus_tz = pytz.timezone('America/Manaus')
+
+            if timezone.is_aware(timestamp_utc):
+                return timestamp_utc.astimezone(manaus_tz)
+            else:
+                timestamp_utc = utc_tz.localize(timestamp_utc)
+                return timestamp_utc.astimezone(manaus_tz)
+        except Exception:
+            return timestamp_utc
+
+    def get_timestamp_local(self, obj):
+        timestamp_local = self.converter_para_manaus(obj.timestamp)
+        return timestamp_local.strftime('%d/%m/%Y %H:%M:%S')
+
+    def get_data(self, obj):
+        timestamp_local = self.converter_para_manaus(obj.timestamp)
+        return timestamp_local.strftime('%d/%m/%Y')
+
+    def get_hora(self, obj):
+        timestamp_local = self.converter_para_manaus(obj.timestamp)
+        return timestamp_local.strftime('%H:%M')
+
+
+class Command(BaseCommand):
+    help = ('Mede linhas/s do histórico: o PontoHistoricoSerializer original (instâncias do modelo, '
+            'funcionario.user por linha, pytz) contra o caminho rápido (values() + '
+            'PontoHistoricoRapidoSerializer). Os dados de teste são criados numa transação desfeita ao final.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=100_000)
+        parser.add_argument('--funcionarios', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            queryset = self.criar_dados(options['linhas'], options['funcionarios'])
+
+            resultados = {
+                'linhas': options['linhas'],
+                'antes': self.medir(lambda: PontoHistoricoSerializerAntigo(
+                    queryset, many=True
+                ).data),
+                'depois': self.medir(lambda: PontoHistoricoRapidoSerializer(
+                    queryset.values(*CAMPOS_HISTORICO), many=True
+                ).data),
+            }
+            resultados['ganho'] = round(
+                resultados['depois']['linhas_por_segundo'] / resultados['antes']['linhas_por_segundo'], 2
+            )
+
+            transaction.set_rollback(True)
+
+        cache_funcionarios.clear()
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def criar_dados(self, linhas, quantidade_funcionarios):
+        usuarios = User.objects.bulk_create([
+            User(username=f'bench_serializacao_{indice}', first_name='Funcionário', last_name=str(indice))
+            for indice in range(quantidade_funcionarios)
+        ])
+        funcionarios = Funcionario.objects.bulk_create([Funcionario(user=user) for user in usuarios])
+
+        inicio = timezone.now() - timedelta(days=365)
+        RegistroPonto.objects.bulk_create([
+            RegistroPonto(
+                funcionario=funcionarios[indice % len(funcionarios)],
+                tipo='ES'[(indice // len(funcionarios)) % 2],
+                timestamp=inicio + timedelta(minutes=indice),
+            )
+            for indice in range(linhas)
+        ], batch_size=5000)
+
+        return RegistroPonto.objects.filter(
+            funcionario__in=funcionarios
+        ).order_by('-timestamp', '-id')
+
+    def medir(self, serializar):
+        cache_funcionarios.clear()
+        inicio = time.perf_counter()
+        dados = serializar()
+        duracao = time.perf_counter() - inicio
+        return {
+            'segundos': round(duracao, 3),
+            'linhas_por_segundo': round(len(dados) / duracao),
+        }
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.escala import garantir_previstos
+
+
+class Command(BaseCommand):
+    help = ('Expande a jornada prevista (JornadaPrevista) de todos os funcionários a partir das escalas e '
+            'feriados. Dias já expandidos não mudam. Padrão: o ano atual.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inicio', type=date.fromisoformat, help='Data inicial (AAAA-MM-DD)')
+        parser.add_argument('--fim', type=date.fromisoformat, help='Data final (AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        hoje = timezone.localdate()
+        data_inicio = options['inicio'] or hoje.replace(month=1, day=1)
+        data_fim = options['fim'] or hoje.replace(month=12, day=31)
+
+        funcionarios = garantir_previstos(data_inicio, data_fim)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Jornada prevista de {data_inicio:%d/%m/%Y} a {data_fim:%d/%m/%Y}: "
+            f"{funcionarios} funcionário(s) expandido(s)."))
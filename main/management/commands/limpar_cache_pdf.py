@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from main.cache_pdf import aplicar_limite_cache_pdf, estatisticas_cache_pdf, limpar_cache_pdf
+
+
+class Command(BaseCommand):
+    help = ('Limpa o cache em disco dos relatórios PDF (PONTO_CACHE_PDF_DIR). '
+            'Com --max-bytes, só remove os menos usados até caber no limite.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, default=None,
+                            help='Mantém os PDFs usados mais recentemente até este tamanho total')
+
+    def handle(self, *args, **options):
+        if options['max_bytes'] is not None:
+            removidos = aplicar_limite_cache_pdf(options['max_bytes'])
+            estatisticas = estatisticas_cache_pdf()
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {removidos} PDF(s) removido(s); restam {estatisticas['arquivos']} "
+                f"({estatisticas['bytes']} bytes)."
+            ))
+            return
+
+        arquivos, liberados = limpar_cache_pdf()
+        self.stdout.write(self.style.SUCCESS(f"✅ Cache de PDFs limpo: {arquivos} arquivo(s), {liberados} bytes."))
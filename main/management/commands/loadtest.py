@@ -0,0 +1,128 @@
+import json
+import random
+import socket
+import subprocess
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.carga import DESCRICAO_SERIES_REGISTRO, SERIES_REGISTRO, Requisicao, executar_carga
+
+MIX_PADRAO = 'login=1,ultimo=6,registro=2,historico=1'
+
+
+def interpretar_mix(texto):
+    """
+    "login=1,ultimo=6,..." -> {nome: peso}
+    """
+    mix = {}
+    for parte in texto.split(','):
+        nome, _, peso = parte.partition('=')
+        nome = nome.strip()
+        if nome not in Command.REQUISICOES:
+            raise CommandError(f"Requisição desconhecida no --mix: {nome!r} (use {', '.join(Command.REQUISICOES)})")
+        try:
+            mix[nome] = float(peso)
+        except ValueError:
+            raise CommandError(f'Peso inválido no --mix: {parte!r}')
+    if not any(peso > 0 for peso in mix.values()):
+        raise CommandError('O --mix precisa de ao menos um peso positivo.')
+    return mix
+
+
+class Command(BaseCommand):
+    help = ('Gera carga concorrente contra um servidor local já em execução (runserver, gunicorn...) com os '
+            'usuários criados por seed_ponto: login, último ponto, registro de ponto e histórico, na proporção '
+            'de --mix. Imprime em JSON vazão, latências p50/p95/p99 e taxa de erro por requisição, com o commit '
+            'atual, para comparar execuções. O registro sai em duas séries: 201 (ponto gravado) e 200 (toque duplo '
+            'dentro da janela); suba o servidor com PONTO_JANELA_DUPLICIDADE_SEGUNDOS=0 para que todo registro '
+            'grave. Atenção: registra pontos de verdade no banco do servidor.')
+
+    REQUISICOES = ('login', 'ultimo', 'registro', 'historico')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--clientes', type=int, default=50, help='Conexões keep-alive simultâneas')
+        parser.add_argument('--duracao', type=float, default=30, help='Segundos de carga')
+        parser.add_argument('--mix', default=MIX_PADRAO, help=f'Pesos das requisições (padrão: {MIX_PADRAO})')
+        parser.add_argument('--prefixo', default='seed', help='Prefixo dos usuários de seed_ponto')
+        parser.add_argument('--senha', default='Senha@123', help='Senha usada em seed_ponto')
+        parser.add_argument('--usuarios', type=int, default=1000, help='Máximo de funcionários sorteados')
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--saida', help='Também grava o JSON neste arquivo')
+
+    def handle(self, *args, **options):
+        mix = interpretar_mix(options['mix'])
+        usuarios = list(User.objects.filter(
+            username__startswith=f"{options['prefixo']}_", funcionario__isnull=False
+        ).order_by('pk').values_list('pk', 'username')[:options['usuarios']])
+        if not usuarios:
+            raise CommandError(f"Nenhum funcionário \"{options['prefixo']}_*\": rode manage.py seed_ponto antes.")
+
+        self.verificar_servidor(options['url'])
+        if mix.get('registro') and getattr(settings, 'PONTO_JANELA_DUPLICIDADE_SEGUNDOS', 60):
+            self.stderr.write(self.style.WARNING(
+                'PONTO_JANELA_DUPLICIDADE_SEGUNDOS não é 0 aqui: se o servidor usar a mesma configuração, boa '
+                'parte dos registros será toque duplo (série registro-ponto:toque-duplo).'))
+        self.stderr.write(f"Carga em {options['url']}: {options['clientes']} clientes por {options['duracao']}s, "
+                          f"{len(usuarios)} funcionário(s), mix {mix}...")
+
+        resumo = executar_carga(
+            options['url'], self.gerador_requisicoes(mix, usuarios, options['senha'], options['semente']),
+            clientes=options['clientes'], duracao=options['duracao']
+        )
+
+        resultado = {
+            'commit': self.commit_atual(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'url': options['url'],
+            'clientes': options['clientes'],
+            'funcionarios': len(usuarios),
+            'mix': mix,
+            'series_registro': DESCRICAO_SERIES_REGISTRO,
+            **resumo,
+        }
+        texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto + '\n')
+        self.stdout.write(texto)
+
+    def gerador_requisicoes(self, mix, usuarios, senha, semente):
+        sorteio = random.Random(semente)
+        nomes = list(mix)
+        pesos = [mix[nome] for nome in nomes]
+
+        def proxima():
+            user_id, username = sorteio.choice(usuarios)
+            nome = sorteio.choices(nomes, pesos)[0]
+            if nome == 'login':
+                return Requisicao('login', 'POST', '/api/login/', corpo={'usuario': username, 'senha': senha})
+            if nome == 'ultimo':
+                return Requisicao('ultimo-ponto', 'GET', f'/api/ultimo-ponto/?funcionario_id={user_id}')
+            if nome == 'registro':
+                return Requisicao('registro-ponto', 'POST', '/api/registro-ponto/', corpo={'funcionario_id': user_id},
+                                  series_por_status=SERIES_REGISTRO)
+            return Requisicao('historico', 'GET', f'/api/historico-ponto/?funcionario_id={user_id}&page_size=50')
+
+        return proxima
+
+    def verificar_servidor(self, url):
+        partes = urlsplit(url)
+        try:
+            with socket.create_connection((partes.hostname or '127.0.0.1', partes.port or 80), timeout=2):
+                pass
+        except OSError:
+            raise CommandError(f'Servidor não respondeu em {url}: suba-o antes (runserver ou gunicorn).')
+
+    def commit_atual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
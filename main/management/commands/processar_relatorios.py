@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.fila_relatorios import identificador_worker, processar_fila, recuperar_tarefas_travadas
+
+
+class Command(BaseCommand):
+    help = ('Worker da fila de relatórios (TarefaRelatorio): reserva tarefas com '
+            'select_for_update(skip_locked=True) e grava o PDF/ZIP em PONTO_RELATORIOS_DIR. '
+            'Pode haver vários workers rodando ao mesmo tempo.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Processa o que estiver na fila e sai (ex.: cron)')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos de espera quando a fila está vazia')
+
+    def handle(self, *args, **options):
+        worker = identificador_worker()
+        self.stdout.write(f"🛠️ Worker {worker} aguardando tarefas...")
+
+        try:
+            while True:
+                recuperadas = recuperar_tarefas_travadas()
+                if recuperadas:
+                    self.stdout.write(self.style.WARNING(f"↩️ {recuperadas} tarefa(s) travada(s) devolvida(s) à fila"))
+
+                executadas = processar_fila(worker)
+                if executadas:
+                    self.stdout.write(self.style.SUCCESS(f"✅ {executadas} tarefa(s) processada(s)"))
+
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker encerrado.")
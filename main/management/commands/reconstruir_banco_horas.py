@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from main.banco_horas import reconstruir_banco_horas
+
+
+class Command(BaseCommand):
+    help = ('Reconstrói o banco de horas mensal (BancoHoras) a partir da jornada diária. '
+            'Rode após aplicar a migração que cria a tabela.')
+
+    def handle(self, *args, **options):
+        total = reconstruir_banco_horas()
+        self.stdout.write(self.style.SUCCESS(f"✅ Banco de horas reconstruído: {total} mês(es)."))
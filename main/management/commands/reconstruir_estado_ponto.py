@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main.estado_ponto import reconstruir_todos_estados
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a tabela de estado atual do ponto (EstadoPonto) a partir do histórico de registros.'
+
+    def handle(self, *args, **options):
+        total = reconstruir_todos_estados()
+        self.stdout.write(self.style.SUCCESS(f"✅ Estado do ponto reconstruído para {total} funcionário(s)."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from main.jornada import reconstruir_jornadas
+
+
+class Command(BaseCommand):
+    help = ('Reconstrói a tabela de jornada diária (JornadaDiaria) a partir do histórico de registros. '
+            'Rode após aplicar a migração que cria a tabela.')
+
+    def handle(self, *args, **options):
+        total = reconstruir_jornadas()
+        self.stdout.write(self.style.SUCCESS(f"✅ Jornada diária reconstruída: {total} dia(s) de registro."))
@@ -0,0 +1,134 @@
+import random
+import time as relogio
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.escala import garantir_previstos
+from main.estado_ponto import reconstruir_todos_estados
+from main.fuso import localizar
+from main.jornada import reconstruir_jornadas
+from main.models import Funcionario, RegistroPonto
+
+CARGOS = ('Operador', 'Auxiliar administrativo', 'Técnico', 'Analista', 'Supervisor')
+
+
+def marcacoes_do_dia(dia, sorteio):
+    """
+    Horários locais (naive) de um dia útil, em ordem: 4 marcações com almoço ou, às vezes, 2 (meio período)
+    """
+    entrada = datetime.combine(dia, time(8)) + timedelta(minutes=max(-30, min(45, sorteio.gauss(0, 8))))
+    if sorteio.random() < 0.1:
+        return [entrada, entrada + timedelta(minutes=240 + sorteio.gauss(0, 10))]
+
+    almoco = datetime.combine(dia, time(12)) + timedelta(minutes=max(-30, min(30, sorteio.gauss(0, 10))))
+    volta = almoco + timedelta(minutes=max(30, 60 + sorteio.gauss(0, 5)))
+    saida = entrada + timedelta(minutes=max(300, 540 + sorteio.gauss(0, 15)))
+    return [entrada, almoco, volta, max(saida, volta + timedelta(minutes=60))]
+
+
+def planejar_marcacoes(quantidade, ate, sorteio, faltas=0.04):
+    """
+    As `quantidade` marcações mais recentes até `ate`, em ordem cronológica, alternando E/S: os dias úteis
+    são percorridos para trás (com faltas aleatórias) até cobrir a quantidade; o último dia pode ficar
+    incompleto (funcionário ainda em expediente)
+    """
+    dias = []
+    total = 0
+    dia = ate
+    while total < quantidade:
+        if dia.weekday() < 5 and sorteio.random() >= faltas:
+            marcacoes = marcacoes_do_dia(dia, sorteio)
+            dias.append(marcacoes)
+            total += len(marcacoes)
+        dia -= timedelta(days=1)
+
+    horarios = [
+        momento + timedelta(seconds=sorteio.randrange(60))
+        for marcacoes in reversed(dias) for momento in marcacoes
+    ][:quantidade]
+    return [('E' if indice % 2 == 0 else 'S', localizar(momento)) for indice, momento in enumerate(horarios)]
+
+
+class Command(BaseCommand):
+    help = ('Gera dados de carga: N funcionários (User + Funcionario) com M marcações cada, alternando E/S em '
+            'dias úteis com variação de horário, via bulk_create em blocos. Depois consolida estado, jornada '
+            'prevista, jornada diária e banco de horas (--sem-derivados pula essa etapa).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--funcionarios', type=int, default=100)
+        parser.add_argument('--registros', type=int, default=200, help='Marcações por funcionário')
+        parser.add_argument('--prefixo', default='seed', help='Usuários criados como <prefixo>_000001...')
+        parser.add_argument('--senha', default='Senha@123', help='Senha de todos os usuários (para o loadtest)')
+        parser.add_argument('--ate', type=date.fromisoformat, default=None,
+                            help='Último dia com marcações (AAAA-MM-DD); padrão: ontem')
+        parser.add_argument('--semente', type=int, default=42, help='Semente aleatória (dados reproduzíveis)')
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas por bulk_create')
+        parser.add_argument('--sem-derivados', action='store_true',
+                            help='Não reconstrói EstadoPonto, JornadaDiaria e BancoHoras')
+
+    def handle(self, *args, **options):
+        if options['funcionarios'] < 1 or options['registros'] < 0:
+            raise CommandError('Informe ao menos 1 funcionário e uma quantidade de registros não negativa.')
+        prefixo = options['prefixo']
+        if User.objects.filter(username__startswith=f'{prefixo}_').exists():
+            raise CommandError(f'Já existem usuários "{prefixo}_*": use outro --prefixo.')
+
+        ate = options['ate'] or date.today() - timedelta(days=1)
+        sorteio = random.Random(options['semente'])
+        lote = options['lote']
+        inicio = relogio.perf_counter()
+
+        with transaction.atomic():
+            funcionarios = self.criar_funcionarios(options['funcionarios'], prefixo, options['senha'], lote)
+
+            total = 0
+            primeiro_dia = ate
+            pendentes = []
+            for funcionario in funcionarios:
+                marcacoes = planejar_marcacoes(options['registros'], ate, sorteio)
+                if marcacoes:
+                    primeiro_dia = min(primeiro_dia, marcacoes[0][1].date())
+                pendentes.extend(
+                    RegistroPonto(funcionario_id=funcionario.pk, tipo=tipo, timestamp=timestamp)
+                    for tipo, timestamp in marcacoes
+                )
+                if len(pendentes) >= lote:
+                    total += self.gravar(pendentes, lote)
+                    pendentes = []
+            total += self.gravar(pendentes, lote)
+
+        segundos_registros = relogio.perf_counter() - inicio
+        self.stdout.write(f'{len(funcionarios)} funcionário(s) e {total} registro(s) de ponto '
+                          f'em {segundos_registros:.1f}s ({total / max(segundos_registros, 1e-9):,.0f}/s).')
+
+        # bulk_create não dispara os signals: os dados derivados são reconstruídos de uma vez
+        if not options['sem_derivados'] and total:
+            self.stdout.write('Consolidando estado, jornadas previstas, jornadas diárias e banco de horas...')
+            garantir_previstos(primeiro_dia, ate, [funcionario.pk for funcionario in funcionarios])
+            reconstruir_todos_estados()
+            dias = reconstruir_jornadas()
+            self.stdout.write(f'{dias} dia(s) de jornada consolidados.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Dados gerados em {relogio.perf_counter() - inicio:.1f}s (usuários "{prefixo}_*").'))
+
+    def criar_funcionarios(self, quantidade, prefixo, senha, lote):
+        # Um único hash para todos: o PBKDF2 por usuário dominaria o tempo
+        senha_hash = make_password(senha)
+        usuarios = User.objects.bulk_create([
+            User(username=f'{prefixo}_{indice:06d}', first_name='Funcionário', last_name=f'{indice:06d}',
+                 password=senha_hash)
+            for indice in range(1, quantidade + 1)
+        ], batch_size=lote)
+        return Funcionario.objects.bulk_create([
+            Funcionario(user=user, cargo=CARGOS[indice % len(CARGOS)])
+            for indice, user in enumerate(usuarios, start=1)
+        ], batch_size=lote)
+
+    def gravar(self, registros, lote):
+        RegistroPonto.objects.bulk_create(registros, batch_size=lote)
+        return len(registros)
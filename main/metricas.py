@@ -0,0 +1,326 @@
+# metricas.py - MÉTRICAS HTTP POR ROTA (LATÊNCIA, CONSULTAS, TAMANHO, STATUS) NO FORMATO DO PROMETHEUS
+# MetricasMiddleware soma cada requisição em memória, por rota (nome da URL, não o caminho: o número
+# de séries não cresce com ids). As consultas são contadas por um execute_wrapper instalado em cada
+# conexão (connection_created), que só mede quando há uma requisição em andamento no contexto.
+# Vários workers (gunicorn): com PONTO_METRICAS_DIR, cada processo grava as suas séries num arquivo
+# próprio (substituição atômica, no máximo a cada PONTO_METRICAS_INTERVALO_SEGUNDOS e ao sair) e
+# /metrics soma os arquivos de todos. Arquivos de workers encerrados continuam somando, porque
+# contadores do Prometheus não podem voltar; o diretório é limpo quando o servidor sobe.
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# nome: (tipo, ajuda, labels, limites dos buckets)
+METRICAS = {
+    'ponto_http_requisicoes_total': (
+        'counter', 'Requisições atendidas, por rota, método e status.', ('rota', 'metodo', 'status'), None),
+    'ponto_http_duracao_segundos': (
+        'histogram', 'Latência da requisição até a resposta completa.', ('rota', 'metodo'),
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    'ponto_http_consultas': (
+        'histogram', 'Consultas ao banco por requisição.', ('rota',),
+        (0, 1, 2, 3, 5, 10, 20, 50, 100)),
+    'ponto_http_consultas_duracao_segundos': (
+        'histogram', 'Tempo gasto em consultas ao banco por requisição.', ('rota',),
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)),
+    'ponto_http_resposta_bytes': (
+        'histogram', 'Tamanho do corpo da resposta.', ('rota',),
+        (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)),
+}
+
+ROTA_NAO_RESOLVIDA = 'nao_resolvida'
+
+
+class RegistroMetricas:
+    """
+    Séries do processo atual: (nome, valores dos labels) -> total (contador) ou
+    [contagem por bucket..., +Inf, soma] (histograma; buckets não cumulativos até a exportação)
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, nome, labels, valor=1):
+        chave = (nome, labels)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def observar(self, nome, labels, valor):
+        limites = METRICAS[nome][3]
+        chave = (nome, labels)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [0] * (len(limites) + 2)
+            serie[bisect_left(limites, valor)] += 1
+            serie[-1] += valor
+
+    def copiar(self):
+        with self._lock:
+            return {chave: list(valor) if isinstance(valor, list) else valor for chave, valor in self._series.items()}
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+
+registro = RegistroMetricas()
+
+
+def somar_series(destino, series):
+    for chave, valor in series.items():
+        atual = destino.get(chave)
+        if atual is None:
+            destino[chave] = list(valor) if isinstance(valor, list) else valor
+        elif isinstance(valor, list):
+            destino[chave] = [a + b for a, b in zip(atual, valor)]
+        else:
+            destino[chave] = atual + valor
+    return destino
+
+
+# ---------- Multiprocesso (arquivo por worker) ----------
+
+_arquivo_processo = (None, None)
+_ultima_gravacao = 0.0
+
+
+def _nome_arquivo_processo():
+    # Calculado no próprio worker (não no import: com preload, o master importa antes do fork).
+    # pid + instante: um worker novo que reaproveite o pid não sobrescreve o de um encerrado
+    global _arquivo_processo
+    pid, nome = _arquivo_processo
+    if pid != os.getpid():
+        pid = os.getpid()
+        nome = f'metricas_{pid}_{time.time_ns()}.json'
+        _arquivo_processo = (pid, nome)
+    return nome
+
+
+def _diretorio():
+    return getattr(settings, 'PONTO_METRICAS_DIR', None)
+
+
+def gravar_metricas_do_processo(forcar=False):
+    """
+    Grava as séries deste processo em PONTO_METRICAS_DIR (respeitando o intervalo, salvo forcar)
+    """
+    global _ultima_gravacao
+    diretorio = _diretorio()
+    if not diretorio:
+        return
+    agora = time.monotonic()
+    if not forcar and agora - _ultima_gravacao < getattr(settings, 'PONTO_METRICAS_INTERVALO_SEGUNDOS', 5):
+        return
+    _ultima_gravacao = agora
+
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    linhas = [[nome, list(labels), valor] for (nome, labels), valor in registro.copiar().items()]
+    nome = _nome_arquivo_processo()
+    temporario = diretorio / f'.{nome}.tmp'
+    temporario.write_text(json.dumps(linhas))
+    os.replace(temporario, diretorio / nome)
+
+
+def _gravar_ao_sair():
+    try:
+        gravar_metricas_do_processo(forcar=True)
+    except Exception:  # pragma: no cover - encerramento do processo
+        pass
+
+
+atexit.register(_gravar_ao_sair)
+
+
+def coletar_metricas():
+    """
+    Séries somadas de todos os processos (ou só do atual, sem PONTO_METRICAS_DIR)
+    """
+    diretorio = _diretorio()
+    if not diretorio:
+        return registro.copiar()
+
+    gravar_metricas_do_processo(forcar=True)
+    series = {}
+    for arquivo in Path(diretorio).glob('metricas_*.json'):
+        try:
+            linhas = json.loads(arquivo.read_text())
+        except (OSError, ValueError):
+            # Arquivo removido ou de um worker morto no meio da gravação: ignora
+            continue
+        somar_series(series, {(nome, tuple(labels)): valor for nome, labels, valor in linhas})
+    return series
+
+
+def limpar_diretorio_metricas(diretorio):
+    """
+    Remove os arquivos de execuções anteriores (hook on_starting do gunicorn)
+    """
+    if not diretorio or not os.path.isdir(diretorio):
+        return
+    for arquivo in Path(diretorio).glob('*metricas_*.json*'):
+        arquivo.unlink(missing_ok=True)
+
+
+# ---------- Formato texto do Prometheus ----------
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(nomes, valores, extra=()):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in (*zip(nomes, valores), *extra)]
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar_prometheus(series):
+    """
+    Texto no formato de exposição do Prometheus (version=0.0.4)
+    """
+    linhas = []
+    for nome, (tipo, ajuda, nomes_labels, limites) in METRICAS.items():
+        linhas.append(f'# HELP {nome} {ajuda}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        for (nome_serie, labels), valor in sorted(series.items()):
+            if nome_serie != nome:
+                continue
+            if tipo == 'counter':
+                linhas.append(f'{nome}{_labels(nomes_labels, labels)} {_numero(valor)}')
+                continue
+            acumulado = 0
+            for limite, contagem in zip((*limites, '+Inf'), valor[:-1]):
+                acumulado += contagem
+                le = limite if limite == '+Inf' else _numero(float(limite))
+                linhas.append(f'{nome}_bucket{_labels(nomes_labels, labels, [("le", le)])} {acumulado}')
+            linhas.append(f'{nome}_sum{_labels(nomes_labels, labels)} {_numero(float(valor[-1]))}')
+            linhas.append(f'{nome}_count{_labels(nomes_labels, labels)} {acumulado}')
+    return '\n'.join(linhas) + '\n'
+
+
+# ---------- Medição das requisições ----------
+
+class Medicao:
+    __slots__ = ('inicio', 'consultas', 'tempo_consultas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_consultas = 0.0
+
+
+_medicao_atual = ContextVar('ponto_medicao_atual', default=None)
+
+
+def medir_consulta(execute, sql, params, many, context):
+    """
+    execute_wrapper: soma quantidade e tempo das consultas na medição da requisição em andamento
+    """
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.consultas += 1
+        medicao.tempo_consultas += time.perf_counter() - inicio
+
+
+def instalar_medicao_consultas(sender, connection, **kwargs):
+    # connection_created dispara a cada reconexão do mesmo DatabaseWrapper: instala uma vez só
+    if medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_consulta)
+
+
+def registrar_requisicao(medicao, request, response, tamanho):
+    match = getattr(request, 'resolver_match', None)
+    rota = match.view_name if match else ROTA_NAO_RESOLVIDA
+    registro.incrementar('ponto_http_requisicoes_total', (rota, request.method, str(response.status_code)))
+    registro.observar('ponto_http_duracao_segundos', (rota, request.method), time.perf_counter() - medicao.inicio)
+    registro.observar('ponto_http_consultas', (rota,), medicao.consultas)
+    registro.observar('ponto_http_consultas_duracao_segundos', (rota,), medicao.tempo_consultas)
+    if tamanho is not None:
+        registro.observar('ponto_http_resposta_bytes', (rota,), tamanho)
+    gravar_metricas_do_processo()
+
+
+def _contar_bytes(conteudo, aoterminar):
+    tamanho = 0
+    try:
+        for parte in conteudo:
+            tamanho += len(parte)
+            yield parte
+    finally:
+        aoterminar(tamanho)
+
+
+async def _acontar_bytes(conteudo, aoterminar):
+    tamanho = 0
+    try:
+        async for parte in conteudo:
+            tamanho += len(parte)
+            yield parte
+    finally:
+        aoterminar(tamanho)
+
+
+class MetricasMiddleware:
+    """
+    Mede cada requisição (WSGI e ASGI). Streaming sem Content-Length (exportação) é registrado
+    quando o corpo termina de ser enviado: latência, consultas e bytes incluem o streaming.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        response = self.get_response(request)
+        return self.finalizar(medicao, token, request, response)
+
+    async def __acall__(self, request):
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        response = await self.get_response(request)
+        return self.finalizar(medicao, token, request, response)
+
+    def finalizar(self, medicao, token, request, response):
+        if response.streaming and not response.has_header('Content-Length'):
+            # A medição continua no contexto até o fim do corpo (consultas do gerador contam)
+            def aoterminar(tamanho):
+                registrar_requisicao(medicao, request, response, tamanho)
+
+            if response.is_async:
+                response.streaming_content = _acontar_bytes(response.streaming_content, aoterminar)
+            else:
+                response.streaming_content = _contar_bytes(response.streaming_content, aoterminar)
+            return response
+
+        _medicao_atual.reset(token)
+        if response.streaming:
+            tamanho = int(response['Content-Length'])
+        else:
+            tamanho = len(response.content)
+        registrar_requisicao(medicao, request, response, tamanho)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_registroponto_observacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoPonto',
+            fields=[
+                ('funcionario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estado_ponto', serialize=False, to='main.funcionario')),
+                ('ultimo_tipo', models.CharField(blank=True, choices=[('E', 'Entrada'), ('S', 'Saída')], max_length=1, null=True)),
+                ('ultimo_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('ultimo_registro', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='main.registroponto')),
+            ],
+            options={
+                'verbose_name': 'Estado do Ponto',
+                'verbose_name_plural': 'Estados do Ponto',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_estadoponto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['funcionario', '-timestamp'], name='main_registro_func_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_registroponto_funcionario_timestamp_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroponto',
+            index=models.Index(fields=['-timestamp', '-id'], name='main_registro_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_registroponto_timestamp_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JornadaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('minutos_trabalhados', models.PositiveIntegerField(default=0)),
+                ('saldo_minutos', models.IntegerField(default=0)),
+                ('primeira_entrada', models.DateTimeField(blank=True, null=True)),
+                ('ultima_saida', models.DateTimeField(blank=True, null=True)),
+                ('quantidade_registros', models.PositiveIntegerField(default=0)),
+                ('observacao', models.CharField(choices=[('compensado', 'Compensado'), ('falta', 'Falta'), ('incompleta', 'Jornada Incompleta'), ('extras', 'Horas Extras'), ('ok', 'OK')], max_length=12)),
+                ('horarios', models.JSONField(default=list)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('funcionario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jornadas', to='main.funcionario')),
+            ],
+            options={
+                'verbose_name': 'Jornada Diária',
+                'verbose_name_plural': 'Jornadas Diárias',
+                'ordering': ['data'],
+                'constraints': [models.UniqueConstraint(fields=('funcionario', 'data'), name='main_jornada_func_data_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_jornadadiaria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaRelatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('na_fila', 'Na fila'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='na_fila', max_length=10)),
+                ('funcionario_ids', models.JSONField(default=list, verbose_name='Funcionários')),
+                ('data_inicio', models.DateField()),
+                ('data_fim', models.DateField()),
+                ('concluidos', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('arquivo', models.CharField(blank=True, default='', max_length=500, verbose_name='Arquivo gerado')),
+                ('erro', models.TextField(blank=True, default='')),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('finalizada_em', models.DateTimeField(blank=True, null=True)),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Relatório',
+                'verbose_name_plural': 'Tarefas de Relatório',
+                'ordering': ['-criada_em'],
+                'indexes': [models.Index(fields=['status', 'criada_em'], name='main_tarefa_status_idx')],
+            },
+        ),
+    ]
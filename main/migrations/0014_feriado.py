@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_tarefarelatorio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(unique=True)),
+                ('descricao', models.CharField(max_length=100, verbose_name='Descrição')),
+            ],
+            options={
+                'verbose_name': 'Feriado',
+                'verbose_name_plural': 'Feriados',
+                'ordering': ['data'],
+            },
+        ),
+    ]
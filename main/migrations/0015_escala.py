@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_feriado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Escala',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, unique=True)),
+                ('cargo', models.CharField(blank=True, help_text='Aplicada a todos os funcionários deste cargo que não têm escala própria', max_length=100, null=True, unique=True)),
+                ('minutos_segunda', models.PositiveSmallIntegerField(default=450, verbose_name='Segunda (min)')),
+                ('minutos_terca', models.PositiveSmallIntegerField(default=450, verbose_name='Terça (min)')),
+                ('minutos_quarta', models.PositiveSmallIntegerField(default=450, verbose_name='Quarta (min)')),
+                ('minutos_quinta', models.PositiveSmallIntegerField(default=450, verbose_name='Quinta (min)')),
+                ('minutos_sexta', models.PositiveSmallIntegerField(default=450, verbose_name='Sexta (min)')),
+                ('minutos_sabado', models.PositiveSmallIntegerField(default=0, verbose_name='Sábado (min)')),
+                ('minutos_domingo', models.PositiveSmallIntegerField(default=0, verbose_name='Domingo (min)')),
+            ],
+            options={
+                'verbose_name': 'Escala',
+                'verbose_name_plural': 'Escalas',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.AddField(
+            model_name='funcionario',
+            name='escala',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='funcionarios', to='main.escala'),
+        ),
+        migrations.CreateModel(
+            name='JornadaPrevista',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('minutos_previstos', models.PositiveSmallIntegerField()),
+                ('funcionario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jornadas_previstas', to='main.funcionario')),
+            ],
+            options={
+                'verbose_name': 'Jornada Prevista',
+                'verbose_name_plural': 'Jornadas Previstas',
+                'ordering': ['data'],
+                'constraints': [models.UniqueConstraint(fields=('funcionario', 'data'), name='main_prevista_func_data_uniq')],
+            },
+        ),
+    ]
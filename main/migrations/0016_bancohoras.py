@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_escala'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BancoHoras',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês')),
+                ('saldo_mes_minutos', models.IntegerField(default=0)),
+                ('saldo_acumulado_minutos', models.IntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('funcionario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='banco_horas', to='main.funcionario')),
+            ],
+            options={
+                'verbose_name': 'Banco de Horas',
+                'verbose_name_plural': 'Banco de Horas',
+                'ordering': ['mes'],
+                'constraints': [models.UniqueConstraint(fields=('funcionario', 'mes'), name='main_banco_func_mes_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_bancohoras'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MesArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês', unique=True)),
+                ('registros', models.PositiveIntegerField(default=0)),
+                ('iniciado_em', models.DateTimeField(auto_now_add=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Mês Arquivado',
+                'verbose_name_plural': 'Meses Arquivados',
+                'ordering': ['mes'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegistroPontoArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField()),
+                ('tipo', models.CharField(choices=[('E', 'Entrada'), ('S', 'Saída')], max_length=7)),
+                ('observacao', models.TextField(blank=True, max_length=500, null=True, verbose_name='Observações')),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+                ('funcionario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registros_arquivados', to='main.funcionario')),
+            ],
+            options={
+                'verbose_name': 'Registro de Ponto Arquivado',
+                'verbose_name_plural': 'Registros de Ponto Arquivados',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['funcionario', '-timestamp'], name='main_arquivo_func_ts_idx'), models.Index(fields=['-timestamp', '-id'], name='main_arquivo_ts_id_idx')],
+            },
+        ),
+    ]
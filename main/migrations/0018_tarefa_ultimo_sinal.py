@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_arquivo_registros'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarefarelatorio',
+            name='ultimo_sinal_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Último sinal do worker'),
+        ),
+    ]
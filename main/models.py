@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
 from django.contrib.auth.models import User
@@ -52,6 +53,15 @@ class Funcionario(models.Model):
         null=True
     )
 
+    # 🆕 Escala própria; sem ela vale a escala do cargo e, por fim, a jornada padrão (main/escala.py)
+    escala = models.ForeignKey(
+        'Escala',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='funcionarios'
+    )
+
     def __str__(self):
         # Exibe o nome completo do usuário, se disponível, ou o username
         return self.user.get_full_name() or self.user.username
@@ -84,5 +94,275 @@ class RegistroPonto(models.Model):
     def __str__(self):
         return f"{self.funcionario.user.username} - {self.get_tipo_display()} - {self.timestamp.strftime('%d/%m/%Y %H:%M:%S')}"
 
+    def clean(self):
+        # Dia já arquivado (manage.py arquivar_registros): o registro dividiria o dia entre as tabelas
+        from .arquivo_ponto import dia_arquivado
+
+        if self.funcionario_id and self.timestamp and dia_arquivado(self.funcionario_id, self.timestamp):
+            raise ValidationError({
+                'timestamp': 'Este dia do funcionário já foi arquivado: registros de meses arquivados não podem '
+                             'ser incluídos nem alterados.'
+            })
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            # Histórico/relatórios sempre filtram por funcionário + intervalo de timestamp
+            models.Index(fields=['funcionario', '-timestamp'], name='main_registro_func_ts_idx'),
+            # Paginação por cursor do histórico geral (sem filtro de funcionário)
+            models.Index(fields=['-timestamp', '-id'], name='main_registro_ts_id_idx'),
+        ]
+
+
+# Estado atual do ponto de cada funcionário (desnormalizado)
+# Evita varrer RegistroPonto só para descobrir se o próximo ponto é 'E' ou 'S'
+class EstadoPonto(models.Model):
+    funcionario = models.OneToOneField(
+        Funcionario,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estado_ponto'
+    )
+    ultimo_tipo = models.CharField(
+        max_length=1,
+        choices=RegistroPonto.TIPO_PONTO,
+        blank=True,
+        null=True
+    )
+    ultimo_timestamp = models.DateTimeField(blank=True, null=True)
+    ultimo_registro = models.ForeignKey(
+        RegistroPonto,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    @property
+    def proximo_tipo(self):
+        return 'S' if self.ultimo_tipo == 'E' else 'E'
+
+    def __str__(self):
+        return f"{self.funcionario_id} - {self.ultimo_tipo or '-'}"
+
+    class Meta:
+        verbose_name = 'Estado do Ponto'
+        verbose_name_plural = 'Estados do Ponto'
+
+
+# Resumo materializado da jornada de cada funcionário por dia local (Manaus)
+# Mantido pelos signals de RegistroPonto (main/signals.py) e pelo lote; relatórios leem daqui
+class JornadaDiaria(models.Model):
+    OBSERVACOES = [
+        ('compensado', 'Compensado'),
+        ('falta', 'Falta'),
+        ('incompleta', 'Jornada Incompleta'),
+        ('extras', 'Horas Extras'),
+        ('ok', 'OK'),
+    ]
+
+    funcionario = models.ForeignKey(Funcionario, on_delete=models.CASCADE, related_name='jornadas')
+    data = models.DateField()
+    minutos_trabalhados = models.PositiveIntegerField(default=0)
+    # Positivo = horas extras, negativo = déficit em relação à jornada padrão
+    saldo_minutos = models.IntegerField(default=0)
+    primeira_entrada = models.DateTimeField(blank=True, null=True)
+    ultima_saida = models.DateTimeField(blank=True, null=True)
+    quantidade_registros = models.PositiveIntegerField(default=0)
+    observacao = models.CharField(max_length=12, choices=OBSERVACOES)
+    # Horários locais (HH:MM ou '-') das colunas Entrada 1 .. Saída 4 do relatório
+    horarios = models.JSONField(default=list)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.funcionario_id} - {self.data:%d/%m/%Y} - {self.minutos_trabalhados} min"
+
+    class Meta:
+        verbose_name = 'Jornada Diária'
+        verbose_name_plural = 'Jornadas Diárias'
+        ordering = ['data']
+        constraints = [
+            models.UniqueConstraint(fields=['funcionario', 'data'], name='main_jornada_func_data_uniq'),
+        ]
+
+
+# Fila de geração de relatórios PDF em segundo plano (sem broker externo)
+# Processada por "manage.py processar_relatorios" (main/fila_relatorios.py)
+class TarefaRelatorio(models.Model):
+    NA_FILA = 'na_fila'
+    EXECUTANDO = 'executando'
+    CONCLUIDA = 'concluida'
+    FALHOU = 'falhou'
+    STATUS = [
+        (NA_FILA, 'Na fila'),
+        (EXECUTANDO, 'Executando'),
+        (CONCLUIDA, 'Concluída'),
+        (FALHOU, 'Falhou'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS, default=NA_FILA)
+    funcionario_ids = models.JSONField(default=list, verbose_name='Funcionários')
+    data_inicio = models.DateField()
+    data_fim = models.DateField()
+    solicitado_por = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+
+    # Progresso (relatórios prontos / total) e resultado
+    concluidos = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    arquivo = models.CharField(max_length=500, blank=True, default='', verbose_name='Arquivo gerado')
+    erro = models.TextField(blank=True, default='')
+    worker = models.CharField(max_length=100, blank=True, default='')
+
+    criada_em = models.DateTimeField(auto_now_add=True)
+    iniciada_em = models.DateTimeField(blank=True, null=True)
+    # Renovado pelo worker a cada relatório pronto: tarefa sem sinal há muito tempo volta para a fila
+    ultimo_sinal_em = models.DateTimeField(blank=True, null=True, verbose_name='Último sinal do worker')
+    finalizada_em = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Relatório #{self.pk} - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = 'Tarefa de Relatório'
+        verbose_name_plural = 'Tarefas de Relatório'
+        ordering = ['-criada_em']
+        indexes = [
+            # O worker busca sempre a mais antiga na fila
+            models.Index(fields=['status', 'criada_em'], name='main_tarefa_status_idx'),
+        ]
+
+
+# Feriados (nacionais, estaduais, municipais ou pontos facultativos da empresa), editados no admin
+# Entram no calendário de dias úteis (main/calendario.py): dia de feriado não conta como falta
+class Feriado(models.Model):
+    data = models.DateField(unique=True)
+    descricao = models.CharField(max_length=100, verbose_name='Descrição')
+
+    def __str__(self):
+        return f"{self.data:%d/%m/%Y} - {self.descricao}"
+
+    class Meta:
+        verbose_name = 'Feriado'
+        verbose_name_plural = 'Feriados'
+        ordering = ['data']
+
+
+# Escala de trabalho: minutos previstos em cada dia da semana (0 = folga)
+# Atribuída diretamente ao funcionário ou, pelo campo cargo, a todos os funcionários do cargo sem escala própria
+class Escala(models.Model):
+    nome = models.CharField(max_length=100, unique=True)
+    cargo = models.CharField(
+        max_length=100,
+        unique=True,
+        blank=True,
+        null=True,
+        help_text='Aplicada a todos os funcionários deste cargo que não têm escala própria'
+    )
+
+    # Padrão = jornada de 7h30 de segunda a sexta
+    minutos_segunda = models.PositiveSmallIntegerField(default=450, verbose_name='Segunda (min)')
+    minutos_terca = models.PositiveSmallIntegerField(default=450, verbose_name='Terça (min)')
+    minutos_quarta = models.PositiveSmallIntegerField(default=450, verbose_name='Quarta (min)')
+    minutos_quinta = models.PositiveSmallIntegerField(default=450, verbose_name='Quinta (min)')
+    minutos_sexta = models.PositiveSmallIntegerField(default=450, verbose_name='Sexta (min)')
+    minutos_sabado = models.PositiveSmallIntegerField(default=0, verbose_name='Sábado (min)')
+    minutos_domingo = models.PositiveSmallIntegerField(default=0, verbose_name='Domingo (min)')
+
+    CAMPOS_SEMANA = ('minutos_segunda', 'minutos_terca', 'minutos_quarta', 'minutos_quinta', 'minutos_sexta',
+                     'minutos_sabado', 'minutos_domingo')
+
+    @property
+    def minutos_semana(self):
+        # Índice = date.weekday() (0 = segunda)
+        return tuple(getattr(self, campo) for campo in self.CAMPOS_SEMANA)
+
+    def __str__(self):
+        return self.nome
+
+    class Meta:
+        verbose_name = 'Escala'
+        verbose_name_plural = 'Escalas'
+        ordering = ['nome']
+
+
+# Minutos previstos de cada funcionário em cada dia, expandidos a partir da escala e dos feriados
+# Relatórios e fechamentos comparam com esta tabela (busca pelo índice único) em vez de uma constante.
+# Mantida por main/escala.py: mudança de escala vale do dia atual em diante; dias passados ficam congelados.
+class JornadaPrevista(models.Model):
+    funcionario = models.ForeignKey(Funcionario, on_delete=models.CASCADE, related_name='jornadas_previstas')
+    data = models.DateField()
+    minutos_previstos = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"{self.funcionario_id} - {self.data:%d/%m/%Y} - {self.minutos_previstos} min"
+
+    class Meta:
+        verbose_name = 'Jornada Prevista'
+        verbose_name_plural = 'Jornadas Previstas'
+        ordering = ['data']
+        constraints = [
+            models.UniqueConstraint(fields=['funcionario', 'data'], name='main_prevista_func_data_uniq'),
+        ]
+
+
+# Banco de horas: saldo de cada mês (soma dos saldos de JornadaDiaria) e o acumulado até ele.
+# Meses contínuos do primeiro ao último com jornada; a linha mais recente é o saldo atual.
+# Mantido por main/banco_horas.py a cada recálculo de jornada (só do mês alterado em diante)
+class BancoHoras(models.Model):
+    funcionario = models.ForeignKey(Funcionario, on_delete=models.CASCADE, related_name='banco_horas')
+    mes = models.DateField(help_text='Primeiro dia do mês')
+    saldo_mes_minutos = models.IntegerField(default=0)
+    saldo_acumulado_minutos = models.IntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.funcionario_id} - {self.mes:%m/%Y} - {self.saldo_acumulado_minutos} min"
+
+    class Meta:
+        verbose_name = 'Banco de Horas'
+        verbose_name_plural = 'Banco de Horas'
+        ordering = ['mes']
+        constraints = [
+            models.UniqueConstraint(fields=['funcionario', 'mes'], name='main_banco_func_mes_uniq'),
+        ]
+
+
+# Registros de meses fechados movidos de RegistroPonto (manage.py arquivar_registros): a tabela quente
+# fica só com os meses recentes. Mesmo id do registro original; somente leitura.
+# Histórico e relatórios incluem estas linhas quando o período pedido chega aos meses arquivados.
+class RegistroPontoArquivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    funcionario = models.ForeignKey(Funcionario, on_delete=models.CASCADE, related_name='registros_arquivados')
+    timestamp = models.DateTimeField()
+    tipo = models.CharField(max_length=7, choices=RegistroPonto.TIPO_PONTO)
+    observacao = models.TextField(max_length=500, blank=True, null=True, verbose_name='Observações')
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.funcionario_id} - {self.get_tipo_display()} - {self.timestamp:%d/%m/%Y %H:%M:%S}"
+
+    class Meta:
+        verbose_name = 'Registro de Ponto Arquivado'
+        verbose_name_plural = 'Registros de Ponto Arquivados'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['funcionario', '-timestamp'], name='main_arquivo_func_ts_idx'),
+            models.Index(fields=['-timestamp', '-id'], name='main_arquivo_ts_id_idx'),
+        ]
+
+
+# Meses (locais) já arquivados ou em arquivamento; concluido_em vazio = comando interrompido no meio
+class MesArquivado(models.Model):
+    mes = models.DateField(unique=True, help_text='Primeiro dia do mês')
+    registros = models.PositiveIntegerField(default=0)
+    iniciado_em = models.DateTimeField(auto_now_add=True)
+    concluido_em = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y} - {self.registros} registro(s)"
+
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        verbose_name = 'Mês Arquivado'
+        verbose_name_plural = 'Meses Arquivados'
+        ordering = ['mes']
@@ -0,0 +1,96 @@
+# paginacao.py - PAGINAÇÃO POR CURSOR (KEYSET) EM (timestamp, id)
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def codificar_cursor(timestamp, registro_id):
+    bruto = f'{timestamp.isoformat()}|{registro_id}'.encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, registro_id = bruto.split('|')
+        return datetime.fromisoformat(timestamp), int(registro_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Cursor inválido.'})
+
+
+class KeysetPagination(BasePagination):
+    """
+    Páginas em ordem decrescente de (timestamp, id), sem OFFSET nem COUNT:
+    cada página continua de onde a anterior parou, usando o índice.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'PONTO_HISTORICO_PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'PONTO_HISTORICO_MAX_PAGE_SIZE', 500)
+        self.next_cursor = None
+        self.request = None
+
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            tamanho = self.page_size
+        return max(1, min(tamanho, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, registro_id = decodificar_cursor(cursor)
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=registro_id)
+            )
+
+        # Uma linha a mais indica se existe próxima página
+        registros = list(queryset.order_by('-timestamp', '-id')[:page_size + 1])
+        if len(registros) > page_size:
+            registros = registros[:page_size]
+            ultimo = registros[-1]
+            if isinstance(ultimo, dict):
+                # Querysets de values()
+                self.next_cursor = codificar_cursor(ultimo['timestamp'], ultimo['id'])
+            else:
+                self.next_cursor = codificar_cursor(ultimo.timestamp, ultimo.id)
+        else:
+            self.next_cursor = None
+
+        return registros
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,209 @@
+# relatorio_pdf.py - RENDERIZAÇÃO DO RELATÓRIO DE PONTO EM PDF
+# Só desenha: recebe as linhas já formatadas (main/utils.py monta os dados) e não importa Django,
+# então também roda isolado (processos do pool, benchmark).
+# Estilos são montados uma vez por processo; a tabela é dividida em blocos do tamanho de uma página
+# (o platypus mede cada bloco em vez de um Table com o ano inteiro) e o modo "canvas" desenha direto
+# na página, sem o layout do platypus, para relatórios em lote.
+from collections import namedtuple
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+MODOS = ('platypus', 'canvas')
+
+PAGINA = landscape(A4)
+MARGEM_VERTICAL = 15 * mm
+MARGEM_HORIZONTAL = 10 * mm
+
+CABECALHO = ['Data', 'Dia', 'Entrada 1', 'Saída 1', 'Entrada 2', 'Saída 2',
+             'Entrada 3', 'Saída 3', 'Entrada 4', 'Saída 4', 'Total Horas',
+             'Horas Extras', 'Observações']
+# Larguras fixas (cabem no Frame do platypus, que tem 6pt de padding por lado): o Table não mede o conteúdo
+LARGURAS = [20 * mm, 17 * mm] + [18 * mm] * 8 + [18 * mm, 18 * mm, 55 * mm]
+ALTURA_CABECALHO = 7 * mm
+ALTURA_LINHA = 4.6 * mm
+# Linhas de dados que cabem numa página abaixo do cabeçalho da tabela
+LINHAS_POR_PAGINA = int((PAGINA[1] - 2 * MARGEM_VERTICAL - 12 - ALTURA_CABECALHO) // ALTURA_LINHA)
+
+AZUL_CABECALHO = colors.HexColor('#2c3e50')
+CINZA_ZEBRA = colors.HexColor('#f0f0f0')
+
+# (rótulo em negrito, texto)
+LEGENDA = [
+    ('Compensado', 'Registro em dia sem jornada prevista (folga da escala ou feriado)'),
+    ('Falta', 'Dia com jornada prevista e sem registros'),
+    ('Feriado / Folga', 'Feriado ou folga da escala, sem registros'),
+    ('Jornada Incompleta', 'Menos horas que a jornada prevista na escala'),
+    ('Horas Extras', 'Mais horas que a jornada prevista na escala'),
+    ('OK', 'Jornada prevista cumprida'),
+    ('Fuso Horário:', 'Todos os horários em UTC-4 (Manaus)'),
+]
+
+# linhas: [[13 textos]] (sem o cabeçalho); resumo: ['Total de registros: 10', ...]
+DadosRelatorio = namedtuple('DadosRelatorio', 'linhas resumo')
+
+Estilos = namedtuple('Estilos', 'dados tabela')
+
+
+@lru_cache(maxsize=None)
+def estilos():
+    """
+    ParagraphStyle e TableStyle do relatório, criados uma única vez por processo
+    """
+    amostra = getSampleStyleSheet()
+    dados = ParagraphStyle('Dados', parent=amostra['Normal'], fontSize=9, spaceAfter=6)
+    tabela = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), AZUL_CABECALHO),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('TOPPADDING', (0, 1), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 0),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, CINZA_ZEBRA]),
+    ])
+    return Estilos(dados, tabela)
+
+
+@lru_cache(maxsize=None)
+def _legenda_marcada():
+    itens = ''.join(f'• <b>{rotulo}</b> {"" if rotulo.endswith(":") else "= "}{texto}<br/>'
+                    for rotulo, texto in LEGENDA)
+    return f'<b>LEGENDA DAS OBSERVAÇÕES:</b><br/>{itens}'
+
+
+def renderizar_platypus(buffer, dados, linhas_por_bloco=LINHAS_POR_PAGINA):
+    """
+    Layout completo do platypus; a tabela vai em blocos de linhas_por_bloco (None = um único Table)
+    """
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=PAGINA,
+        topMargin=MARGEM_VERTICAL,
+        bottomMargin=MARGEM_VERTICAL,
+        leftMargin=MARGEM_HORIZONTAL,
+        rightMargin=MARGEM_HORIZONTAL
+    )
+    estilo = estilos()
+    elementos = []
+
+    if not dados.linhas:
+        elementos.append(Paragraph("<b>Nenhum registro de ponto encontrado no período.</b>", estilo.dados))
+        doc.build(elementos)
+        return
+
+    tamanho = linhas_por_bloco or len(dados.linhas)
+    for inicio in range(0, len(dados.linhas), tamanho):
+        bloco = dados.linhas[inicio:inicio + tamanho]
+        tabela = Table([CABECALHO] + bloco, colWidths=LARGURAS,
+                       rowHeights=[ALTURA_CABECALHO] + [ALTURA_LINHA] * len(bloco), repeatRows=1)
+        tabela.setStyle(estilo.tabela)
+        elementos.append(tabela)
+
+    elementos.append(Spacer(1, 8 * mm))
+    elementos.append(Paragraph(_legenda_marcada(), estilo.dados))
+    elementos.append(Spacer(1, 8 * mm))
+    elementos.append(Paragraph(
+        '<b>RESUMO DO PERÍODO:</b><br/>' + ''.join(f'• {item}<br/>' for item in dados.resumo), estilo.dados))
+
+    doc.build(elementos)
+
+
+def renderizar_canvas(buffer, dados):
+    """
+    Mesmo conteúdo desenhado direto no canvas: sem medição de flowables nem quebra de página do platypus
+    """
+    largura_pagina, altura_pagina = PAGINA
+    topo = altura_pagina - MARGEM_VERTICAL
+    colunas = [MARGEM_HORIZONTAL]
+    for largura in LARGURAS:
+        colunas.append(colunas[-1] + largura)
+    centros = [(esquerda + direita) / 2 for esquerda, direita in zip(colunas, colunas[1:])]
+
+    pdf = canvas.Canvas(buffer, pagesize=PAGINA)
+    pdf.setLineWidth(0.5)
+    pdf.setStrokeColor(colors.grey)
+
+    def desenhar_pagina(linhas):
+        # Cabeçalho
+        y = topo - ALTURA_CABECALHO
+        pdf.setFillColor(AZUL_CABECALHO)
+        pdf.rect(colunas[0], y, colunas[-1] - colunas[0], ALTURA_CABECALHO, stroke=0, fill=1)
+        pdf.setFillColor(colors.whitesmoke)
+        pdf.setFont('Helvetica-Bold', 8)
+        for centro, titulo in zip(centros, CABECALHO):
+            pdf.drawCentredString(centro, y + (ALTURA_CABECALHO - 8 * 0.7) / 2, titulo)
+
+        # Linhas (zebradas) e grade
+        pdf.setFont('Helvetica', 7)
+        for indice, linha in enumerate(linhas):
+            y -= ALTURA_LINHA
+            if indice % 2:
+                pdf.setFillColor(CINZA_ZEBRA)
+                pdf.rect(colunas[0], y, colunas[-1] - colunas[0], ALTURA_LINHA, stroke=0, fill=1)
+            pdf.setFillColor(colors.black)
+            for centro, texto in zip(centros, linha):
+                pdf.drawCentredString(centro, y + (ALTURA_LINHA - 7 * 0.7) / 2, texto)
+
+        for x in colunas:
+            pdf.line(x, y, x, topo)
+        pdf.line(colunas[0], topo, colunas[-1], topo)
+        for indice in range(len(linhas) + 1):
+            altura = y + indice * ALTURA_LINHA
+            pdf.line(colunas[0], altura, colunas[-1], altura)
+        return y
+
+    def desenhar_texto(y, titulo, itens):
+        pdf.setFillColor(colors.black)
+        for rotulo, texto in [(titulo, '')] + itens:
+            y -= 11
+            if y < MARGEM_VERTICAL:
+                pdf.showPage()
+                y = topo - 11
+            x = MARGEM_HORIZONTAL
+            if rotulo:
+                pdf.setFont('Helvetica-Bold', 9)
+                pdf.drawString(x, y, rotulo)
+                x += stringWidth(rotulo + ' ', 'Helvetica-Bold', 9)
+            pdf.setFont('Helvetica', 9)
+            pdf.drawString(x, y, texto)
+        return y
+
+    if not dados.linhas:
+        pdf.setFont('Helvetica-Bold', 9)
+        pdf.drawString(MARGEM_HORIZONTAL, topo - 11, 'Nenhum registro de ponto encontrado no período.')
+        pdf.save()
+        return
+
+    y = topo
+    for inicio in range(0, len(dados.linhas), LINHAS_POR_PAGINA):
+        if inicio:
+            pdf.showPage()
+        y = desenhar_pagina(dados.linhas[inicio:inicio + LINHAS_POR_PAGINA])
+
+    y -= 8 * mm
+    y = desenhar_texto(y, 'LEGENDA DAS OBSERVAÇÕES:', [
+        (f'• {rotulo}', texto if rotulo.endswith(':') else f'= {texto}') for rotulo, texto in LEGENDA
+    ])
+    y -= 8 * mm
+    desenhar_texto(y, 'RESUMO DO PERÍODO:', [('', f'• {item}') for item in dados.resumo])
+    pdf.save()
+
+
+def renderizar(buffer, dados, modo='platypus'):
+    if modo == 'canvas':
+        renderizar_canvas(buffer, dados)
+    elif modo == 'platypus':
+        renderizar_platypus(buffer, dados)
+    else:
+        raise ValueError(f"Modo de PDF desconhecido: {modo!r} (use {' ou '.join(MODOS)})")
@@ -0,0 +1,138 @@
+# relatorios_lote.py - RELATÓRIOS PDF DE VÁRIOS FUNCIONÁRIOS EM PARALELO (ZIP EM STREAMING)
+# A renderização do ReportLab é CPU-bound: cada PDF roda num processo do pool.
+# Os processos filhos usam "spawn" (não herdam os sockets do banco do processo pai), por isso este
+# módulo não importa modelos no topo: o filho só executa django.setup() no initializer.
+import csv
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+
+from .cache_pdf import obter_relatorio_pdf
+
+
+def _iniciar_processo():
+    django.setup()
+
+
+def renderizar_relatorio(funcionario_id, data_inicio, data_fim, modo=None):
+    """
+    PDF (bytes) de um funcionário; executado dentro do processo do pool.
+    Passa pelo cache em disco: só renderiza se as jornadas do período mudaram.
+    """
+    caminho, _ = obter_relatorio_pdf(funcionario_id, data_inicio, data_fim, modo)
+    return caminho.read_bytes()
+
+
+def gerar_relatorios(funcionario_ids, data_inicio, data_fim, workers=None, progresso=None, modo=None):
+    """
+    Gera os PDFs e devolve (funcionario_id, pdf, erro) na ordem em que ficam prontos.
+    Falha de um funcionário não interrompe os demais: vem com pdf=None e a mensagem em erro.
+    progresso(concluidos, total, funcionario_id, erro) é chamado a cada relatório, se informado.
+    modo: renderizador do PDF (padrão PONTO_PDF_MODO_LOTE; 'canvas' é o mais rápido para lotes grandes)
+    """
+    funcionario_ids = list(funcionario_ids)
+    total = len(funcionario_ids)
+    if workers is None:
+        workers = getattr(settings, 'PONTO_RELATORIOS_WORKERS', 1)
+    if modo is None:
+        modo = getattr(settings, 'PONTO_PDF_MODO_LOTE', getattr(settings, 'PONTO_PDF_MODO', 'platypus'))
+    workers = max(1, min(workers, total))
+
+    def resultado(concluidos, funcionario_id, pdf, erro):
+        if progresso:
+            progresso(concluidos, total, funcionario_id, erro)
+        return funcionario_id, pdf, erro
+
+    if workers == 1:
+        # Sem pool: mesmo processo e mesma conexão (também usado nos testes)
+        for concluidos, funcionario_id in enumerate(funcionario_ids, start=1):
+            try:
+                pdf, erro = renderizar_relatorio(funcionario_id, data_inicio, data_fim, modo), None
+            except Exception as e:
+                pdf, erro = None, str(e)
+            yield resultado(concluidos, funcionario_id, pdf, erro)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_iniciar_processo
+    )
+    try:
+        futuros = {
+            executor.submit(renderizar_relatorio, funcionario_id, data_inicio, data_fim, modo): funcionario_id
+            for funcionario_id in funcionario_ids
+        }
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            try:
+                pdf, erro = futuro.result(), None
+            except Exception as e:
+                pdf, erro = None, str(e)
+            yield resultado(concluidos, futuros[futuro], pdf, erro)
+    finally:
+        # Cliente desistiu do download: descarta o que ainda não começou
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def nome_arquivo_relatorio(username, data_inicio):
+    return f"relatorio_ponto_{username}_{data_inicio.strftime('%Y_%m')}.pdf"
+
+
+class _FluxoZip:
+    """
+    Destino somente-escrita do ZipFile: acumula os bytes até o gerador entregá-los
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def zip_relatorios(funcionario_ids, data_inicio, data_fim, workers=None, progresso=None, modo=None):
+    """
+    Gerador de bytes de um ZIP com um PDF por funcionário e um resumo.csv
+    (status e erro de cada um). Cada PDF sai para o cliente assim que fica pronto.
+    """
+    from .cache_funcionarios import obter_funcionarios
+
+    funcionario_ids = list(funcionario_ids)
+    funcionarios = obter_funcionarios(funcionario_ids)
+
+    fluxo = _FluxoZip()
+    resumo = io.StringIO()
+    escritor = csv.writer(resumo)
+    escritor.writerow(['funcionario_id', 'funcionario', 'arquivo', 'status', 'erro'])
+
+    with zipfile.ZipFile(fluxo, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for funcionario_id, pdf, erro in gerar_relatorios(
+                funcionario_ids, data_inicio, data_fim, workers=workers, progresso=progresso, modo=modo):
+            funcionario = funcionarios.get(funcionario_id)
+            username = funcionario.username if funcionario else str(funcionario_id)
+            nome_arquivo = nome_arquivo_relatorio(username, data_inicio)
+
+            if erro is None:
+                arquivo_zip.writestr(nome_arquivo, pdf)
+                escritor.writerow([funcionario_id, funcionario.nome if funcionario else '', nome_arquivo, 'ok', ''])
+            else:
+                escritor.writerow([funcionario_id, funcionario.nome if funcionario else '', '', 'erro', erro])
+
+            yield fluxo.esvaziar()
+
+        arquivo_zip.writestr('resumo.csv', resumo.getvalue())
+
+    yield fluxo.esvaziar()
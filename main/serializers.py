@@ -1,13 +1,22 @@
 # serializers.py - ATUALIZADO COM CONVERSÃO UTC-4
+from django.db import models
 from rest_framework import serializers
+from .cache_funcionarios import obter_funcionario, obter_funcionarios
+from .fuso import converter_lote, horario_local
 from .models import RegistroPonto, Funcionario
-from django.utils import timezone
-import pytz
+
+
+class PontoHistoricoListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        registros = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        # Carrega os funcionários da lista de uma vez (cache + no máximo um IN)
+        obter_funcionarios(registro.funcionario_id for registro in registros)
+        return super().to_representation(registros)
 
 
 class PontoHistoricoSerializer(serializers.ModelSerializer):
-    funcionarioId = serializers.IntegerField(source='funcionario.user.id', read_only=True)
-    funcionarioNome = serializers.CharField(source='funcionario.user.get_full_name', read_only=True)
+    funcionarioId = serializers.SerializerMethodField()
+    funcionarioNome = serializers.SerializerMethodField()
     tipo = serializers.SerializerMethodField()
     data = serializers.SerializerMethodField()
     hora = serializers.SerializerMethodField()
@@ -17,45 +26,87 @@ class PontoHistoricoSerializer(serializers.ModelSerializer):
         model = RegistroPonto
         fields = ('id', 'funcionarioId', 'funcionarioNome', 'tipo', 'timestamp', 'timestamp_local', 'data', 'hora',
                   'observacao')
+        list_serializer_class = PontoHistoricoListSerializer
+
+    def get_funcionarioId(self, obj):
+        return obter_funcionario(obj.funcionario_id).user_id
+
+    def get_funcionarioNome(self, obj):
+        return obter_funcionario(obj.funcionario_id).nome_completo
 
     def get_tipo(self, obj):
         return obj.get_tipo_display().lower()
 
-    def converter_para_manaus(self, timestamp_utc):
-        """
-        Converte timestamp UTC para UTC-4 (Manaus)
-        """
-        try:
-            utc_tz = pytz.UTC
-            manaus_tz = pytz.timezone('America/Manaus')
-
-            # Se já é timezone aware, converte diretamente
-            if timezone.is_aware(timestamp_utc):
-                return timestamp_utc.astimezone(manaus_tz)
-            else:
-                # Se é naive, assume UTC e converte
-                timestamp_utc = utc_tz.localize(timestamp_utc)
-                return timestamp_utc.astimezone(manaus_tz)
-        except Exception:
-            return timestamp_utc
-
     def get_timestamp_local(self, obj):
         """🆕 Retorna o timestamp convertido para UTC-4"""
-        timestamp_local = self.converter_para_manaus(obj.timestamp)
-        return timestamp_local.strftime('%d/%m/%Y %H:%M:%S')
+        return horario_local(obj.timestamp).completo
 
     def get_data(self, obj):
         """🆕 Agora usa UTC-4"""
-        timestamp_local = self.converter_para_manaus(obj.timestamp)
-        return timestamp_local.strftime('%d/%m/%Y')
+        return horario_local(obj.timestamp).data_formatada
 
     def get_hora(self, obj):
         """🆕 Agora usa UTC-4"""
-        timestamp_local = self.converter_para_manaus(obj.timestamp)
-        return timestamp_local.strftime('%H:%M')
+        return horario_local(obj.timestamp).hora
 
 
 class FuncionarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Funcionario
-        fields = ('id', 'user', 'cpf', 'telefone', 'endereco', 'cargo', 'data_admissao')
\ No newline at end of file
+        fields = ('id', 'user', 'cpf', 'telefone', 'endereco', 'cargo', 'data_admissao')
+
+
+# 🆕 CAMINHO RÁPIDO: linhas planas (values()) em vez de instâncias do modelo
+CAMPOS_HISTORICO = ('id', 'funcionario_id', 'tipo', 'timestamp', 'observacao')
+
+TIPOS_HISTORICO = {'E': 'entrada', 'S': 'saída'}
+
+
+def formatar_registro_historico(linha, funcionario, horario=None):
+    """
+    Mesmo formato de PontoHistoricoSerializer, convertendo o timestamp uma única vez
+    (horario: HorarioLocal já convertido em lote por main/fuso.py)
+    """
+    if horario is None:
+        horario = horario_local(linha['timestamp'])
+    return {
+        'id': linha['id'],
+        'funcionarioId': funcionario.user_id if funcionario else None,
+        'funcionarioNome': funcionario.nome_completo if funcionario else None,
+        'tipo': TIPOS_HISTORICO.get(linha['tipo'], linha['tipo']),
+        'timestamp': horario.local.isoformat(),
+        'timestamp_local': horario.completo,
+        'data': horario.data_formatada,
+        'hora': horario.hora,
+        'observacao': linha['observacao'],
+    }
+
+
+def formatar_historico_lote(linhas, funcionarios):
+    """
+    formatar_registro_historico para uma lista de linhas, com os timestamps convertidos de uma vez
+    """
+    horarios = converter_lote([linha['timestamp'] for linha in linhas])
+    return [
+        formatar_registro_historico(linha, funcionarios.get(linha['funcionario_id']), horario)
+        for linha, horario in zip(linhas, horarios)
+    ]
+
+
+class PontoHistoricoRapidoListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        linhas = list(data)
+        funcionarios = obter_funcionarios(linha['funcionario_id'] for linha in linhas)
+        return formatar_historico_lote(linhas, funcionarios)
+
+
+class PontoHistoricoRapidoSerializer(serializers.BaseSerializer):
+    """
+    Serializer somente leitura sobre RegistroPonto.objects.values(*CAMPOS_HISTORICO)
+    """
+
+    class Meta:
+        list_serializer_class = PontoHistoricoRapidoListSerializer
+
+    def to_representation(self, instance):
+        return formatar_registro_historico(instance, obter_funcionario(instance['funcionario_id']))
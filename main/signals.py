@@ -0,0 +1,122 @@
+# signals.py - MANTÉM DADOS DERIVADOS EM SINCRONIA COM RegistroPonto
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache_funcionarios import invalidar_funcionario
+from .calendario import invalidar_calendario
+from .escala import funcionarios_da_escala, invalidar_escalas, reexpandir_a_partir_de_hoje, reexpandir_previstos
+from .estado_ponto import aplicar_registro, aplicar_troca_funcionario, remover_registro
+from .jornada import (aplicar_registro_jornada, dia_local, recalcular_jornadas, recalcular_jornadas_existentes,
+                      remover_registro_jornada)
+from .models import Escala, Feriado, Funcionario, JornadaDiaria, RegistroPonto
+
+
+@receiver(pre_save, sender=RegistroPonto)
+def registro_ponto_antes_de_salvar(sender, instance, raw=False, **kwargs):
+    # Edição (admin): guarda funcionário/dia de antes para recalcular a jornada antiga também
+    instance._jornada_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    anterior = RegistroPonto.objects.filter(pk=instance.pk).values_list('funcionario_id', 'timestamp').first()
+    if anterior is not None:
+        instance._jornada_anterior = (anterior[0], dia_local(anterior[1]))
+
+
+@receiver(post_save, sender=RegistroPonto)
+def registro_ponto_salvo(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        aplicar_troca_funcionario(instance)
+    aplicar_registro(instance)
+    aplicar_registro_jornada(instance, getattr(instance, '_jornada_anterior', None))
+
+
+@receiver(post_delete, sender=RegistroPonto)
+def registro_ponto_excluido(sender, instance, **kwargs):
+    remover_registro(instance)
+    remover_registro_jornada(instance)
+
+
+@receiver(pre_save, sender=Funcionario)
+def funcionario_antes_de_salvar(sender, instance, raw=False, **kwargs):
+    # Troca de escala ou de cargo muda a jornada prevista
+    instance._escala_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._escala_anterior = Funcionario.objects.filter(pk=instance.pk).values_list('escala_id', 'cargo').first()
+
+
+@receiver(post_save, sender=Funcionario)
+@receiver(post_delete, sender=Funcionario)
+def funcionario_alterado(sender, instance, **kwargs):
+    invalidar_funcionario(funcionario_id=instance.pk, user_id=instance.user_id)
+
+    anterior = getattr(instance, '_escala_anterior', None)
+    if anterior is not None and anterior != (instance.escala_id, instance.cargo):
+        recalcular_jornadas_existentes(reexpandir_a_partir_de_hoje([instance.pk]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_alterado(sender, instance, update_fields=None, **kwargs):
+    # Login só atualiza last_login: nome e vínculo continuam válidos
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_funcionario(user_id=instance.pk)
+    if kwargs.get('signal') is post_save and not kwargs.get('created'):
+        # Resumo pode estar em cache só pela chave do funcionário
+        funcionario_id = Funcionario.objects.filter(user_id=instance.pk).values_list('id', flat=True).first()
+        invalidar_funcionario(funcionario_id=funcionario_id)
+
+
+@receiver(pre_save, sender=Feriado)
+def feriado_antes_de_salvar(sender, instance, raw=False, **kwargs):
+    # Mudança de data: o dia antigo volta a ser útil e também precisa ser reclassificado
+    instance._data_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._data_anterior = Feriado.objects.filter(pk=instance.pk).values_list('data', flat=True).first()
+
+
+@receiver(post_save, sender=Feriado)
+@receiver(post_delete, sender=Feriado)
+def feriado_alterado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    datas = {instance.data, getattr(instance, '_data_anterior', None)} - {None}
+    invalidar_calendario(*{data.year for data in datas})
+    reexpandir_previstos(datas=datas)
+
+    # Jornadas já gravadas nesses dias mudam de classificação (ex.: "Falta"/"Incompleta" -> "Compensado")
+    recalcular_jornadas(JornadaDiaria.objects.filter(data__in=datas).values_list('funcionario_id', 'data'))
+
+
+@receiver(pre_save, sender=Escala)
+def escala_antes_de_salvar(sender, instance, raw=False, **kwargs):
+    # Cargo antigo: funcionários desse cargo deixam de usar esta escala
+    instance._cargo_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._cargo_anterior = Escala.objects.filter(pk=instance.pk).values_list('cargo', flat=True).first()
+
+
+@receiver(pre_delete, sender=Escala)
+def escala_antes_de_excluir(sender, instance, **kwargs):
+    # Depois da exclusão (SET_NULL) não dá mais para saber quem usava a escala
+    instance._funcionarios_afetados = funcionarios_da_escala(instance.pk, [instance.cargo])
+
+
+@receiver(post_save, sender=Escala)
+@receiver(post_delete, sender=Escala)
+def escala_alterada(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidar_escalas()
+
+    afetados = getattr(instance, '_funcionarios_afetados', None)
+    if afetados is None:
+        afetados = funcionarios_da_escala(instance.pk, [instance.cargo, getattr(instance, '_cargo_anterior', None)])
+    if afetados:
+        recalcular_jornadas_existentes(reexpandir_a_partir_de_hoje(afetados))
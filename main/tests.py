@@ -1,3 +1,1405 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import pytz
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (BancoHoras, Escala, EstadoPonto, Feriado, Funcionario, JornadaDiaria, JornadaPrevista,
+                     MesArquivado, RegistroPonto, RegistroPontoArquivado, TarefaRelatorio)
+from .arquivo_ponto import precisa_arquivo
+from .estado_ponto import reconstruir_todos_estados
+from .fila_relatorios import (enfileirar_relatorio, executar_tarefa, processar_fila, recuperar_tarefas_travadas,
+                              reservar_proxima_tarefa)
+from . import cache_ultimo_ponto
+from . import folha_numpy
+from . import fuso
+from . import metricas
+from .horas_sql import horas_por_dia
+from .jornada import calcular_minutos_trabalhados, calcular_saldo, dia_local, reconstruir_jornadas
+from . import relatorios_lote
+from .cache_pdf import aplicar_limite_cache_pdf, estatisticas_cache_pdf, obter_relatorio_pdf
+from .calendario import cache_calendario, calendario_ano, grade_periodo
+from .escala import cache_escalas, garantir_previstos, obter_previstos
+from .relatorio_pdf import LINHAS_POR_PAGINA, MODOS, DadosRelatorio, estilos, renderizar, renderizar_platypus
+from .urls import urlpatterns
+from .utils import filtrar_periodo, gerar_relatorio_ponto_pdf, limites_periodo_manaus, periodo_mes_atual
+from . import views_async
+from .cache_funcionarios import cache_funcionarios, obter_funcionario_por_user
+from .serializers import CAMPOS_HISTORICO, PontoHistoricoRapidoSerializer, PontoHistoricoSerializer
+from .views import respostas_idempotentes
+
+
+class PontoTestCase(TestCase):
+    """
+    Caches por processo sobrevivem ao rollback entre testes: limpa antes de cada um
+    """
+
+    def setUp(self):
+        super().setUp()
+        respostas_idempotentes.clear()
+        cache_funcionarios.clear()
+        cache_calendario.clear()
+        cache_escalas.clear()
+        cache.clear()
+
+    def usar_diretorio_relatorios_temporario(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        configuracao = self.settings(PONTO_RELATORIOS_DIR=diretorio, PONTO_RELATORIOS_WORKERS=1,
+                                     PONTO_CACHE_PDF_DIR=os.path.join(diretorio, 'cache_pdf'))
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        return diretorio
+
+
+class FiltroPeriodoTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('funcionario', password='Senha@123')
+        cls.funcionario = Funcionario.objects.create(user=user)
+
+    def test_limites_sao_semiabertos_em_manaus(self):
+        inicio, fim = limites_periodo_manaus(date(2025, 10, 1), date(2025, 10, 31))
+
+        # Manaus é UTC-4 o ano todo
+        self.assertEqual(inicio, datetime(2025, 10, 1, 4, 0, tzinfo=pytz.UTC))
+        self.assertEqual(fim, datetime(2025, 11, 1, 4, 0, tzinfo=pytz.UTC))
+
+    def test_filtro_respeita_dia_local(self):
+        manaus = pytz.timezone('America/Manaus')
+        # 23:30 em Manaus já é o dia seguinte em UTC
+        dentro = RegistroPonto.objects.create(
+            funcionario=self.funcionario, tipo='E',
+            timestamp=manaus.localize(datetime(2025, 10, 31, 23, 30)))
+        RegistroPonto.objects.create(
+            funcionario=self.funcionario, tipo='S',
+            timestamp=manaus.localize(datetime(2025, 11, 1, 0, 0)))
+
+        queryset = filtrar_periodo(RegistroPonto.objects.all(), date(2025, 10, 31), date(2025, 10, 31))
+        self.assertEqual(list(queryset), [dentro])
+
+    def test_explain_usa_indice_funcionario_timestamp(self):
+        queryset = filtrar_periodo(
+            RegistroPonto.objects.filter(funcionario=self.funcionario),
+            date(2025, 10, 1),
+            date(2025, 10, 31)
+        ).order_by('-timestamp')
+
+        if connection.vendor == 'postgresql':
+            # Com tabelas pequenas o planner prefere seq scan; desliga para validar o índice
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'EXPLAIN não verificado para {connection.vendor}')
+
+        plano = queryset.explain()
+        self.assertIn('main_registro_func_ts_idx', plano)
+
+
+class EstadoPontoTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana, cls.bia = (Funcionario.objects.create(user=User.objects.create_user(nome, password='Senha@123'))
+                            for nome in ('ana', 'bia'))
+
+    def registrar(self, funcionario, tipo, hora):
+        manaus = pytz.timezone('America/Manaus')
+        return RegistroPonto.objects.create(funcionario=funcionario, tipo=tipo,
+                                            timestamp=manaus.localize(datetime(2025, 10, 1, hora)))
+
+    def estado(self, funcionario):
+        return EstadoPonto.objects.values_list('ultimo_tipo', 'ultimo_timestamp', 'ultimo_registro_id').get(
+            pk=funcionario.pk)
+
+    def estados(self):
+        return list(EstadoPonto.objects.order_by('pk').values_list(
+            'funcionario_id', 'ultimo_tipo', 'ultimo_timestamp', 'ultimo_registro_id'))
+
+    def test_edicao_para_antes_do_ultimo_recalcula_pelo_historico(self):
+        entrada = self.registrar(self.ana, 'E', 8)
+        saida = self.registrar(self.ana, 'S', 12)
+        self.assertEqual(self.estado(self.ana), ('S', saida.timestamp, saida.pk))
+
+        saida.timestamp -= timedelta(hours=5)
+        saida.save()
+        self.assertEqual(self.estado(self.ana), ('E', entrada.timestamp, entrada.pk))
+
+    def test_registro_movido_para_outro_funcionario(self):
+        entrada = self.registrar(self.ana, 'E', 8)
+        saida = self.registrar(self.ana, 'S', 12)
+
+        saida.funcionario = self.bia
+        saida.save()
+        self.assertEqual(self.estado(self.ana), ('E', entrada.timestamp, entrada.pk))
+        self.assertEqual(self.estado(self.bia), ('S', saida.timestamp, saida.pk))
+
+    def test_comando_reconstroi_o_mesmo_estado_incremental(self):
+        self.registrar(self.ana, 'E', 8)
+        saida = self.registrar(self.ana, 'S', 12)
+        self.registrar(self.bia, 'E', 9)
+        ultimo_bia = self.registrar(self.bia, 'S', 18)
+        saida.timestamp -= timedelta(hours=6)
+        saida.save()
+        ultimo_bia.delete()
+
+        incremental = self.estados()
+        call_command('reconstruir_estado_ponto', stdout=io.StringIO())
+        self.assertEqual(self.estados(), incremental)
+
+
+class RegistroPontoApiTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('kiosk', password='Senha@123')
+        cls.funcionario = Funcionario.objects.create(user=cls.user)
+
+    def registrar(self, **extra):
+        return self.client.post(
+            '/api/registro-ponto/',
+            json.dumps({'funcionario_id': self.user.pk}),
+            content_type='application/json',
+            **extra
+        )
+
+    def test_reenvio_com_mesma_chave_nao_acessa_banco(self):
+        primeira = self.registrar(HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(primeira.status_code, 201)
+
+        with self.assertNumQueries(0):
+            repetida = self.registrar(HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(repetida.status_code, 201)
+        self.assertEqual(repetida.json(), primeira.json())
+        self.assertEqual(RegistroPonto.objects.count(), 1)
+
+    def test_toque_duplo_dentro_da_janela_nao_cria_registro(self):
+        self.registrar()
+        resposta = self.registrar()
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['tipo_registrado_codigo'], 'E')
+        self.assertEqual(RegistroPonto.objects.count(), 1)
+
+    @override_settings(PONTO_JANELA_DUPLICIDADE_SEGUNDOS=0)
+    def test_alterna_entrada_e_saida(self):
+        tipos = [self.registrar().json()['tipo_registrado_codigo'] for _ in range(3)]
+
+        self.assertEqual(tipos, ['E', 'S', 'E'])
+
+    def ultimo_ponto(self, **extra):
+        return self.client.get('/api/ultimo-ponto/', {'funcionario_id': self.user.pk}, **extra)
+
+    @override_settings(PONTO_CACHE_ULTIMO_PONTO=True)
+    def test_ultimo_ponto_em_cache_com_etag_e_write_through(self):
+        self.assertEqual(self.ultimo_ponto().json()['proximo_tipo'], 'E')
+
+        # Ponto do kiosk: a resposta nova entra no cache no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.registrar()
+        with self.assertNumQueries(0):
+            resposta = self.ultimo_ponto()
+        self.assertEqual(resposta.json()['proximo_tipo'], 'S')
+
+        with self.assertNumQueries(0):
+            revalidada = self.ultimo_ponto(HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual((revalidada.status_code, revalidada.content), (304, b''))
+
+        # Exclusão no admin (signal): ETag muda e o próximo tipo volta a ser entrada
+        with self.captureOnCommitCallbacks(execute=True):
+            RegistroPonto.objects.get().delete()
+        resposta_nova = self.ultimo_ponto(HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta_nova.status_code, 200)
+        self.assertNotEqual(resposta_nova['ETag'], resposta['ETag'])
+        self.assertEqual(resposta_nova.json()['proximo_tipo'], 'E')
+
+    def test_ponto_num_worker_nao_deixa_resposta_velha_em_outro(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        # Dois workers: caches na memória de cada processo ou o mesmo diretório (PONTO_CACHE_BACKEND=arquivo)
+        cenarios = {
+            'memoria': (False, LocMemCache('worker_a', {}), LocMemCache('worker_b', {})),
+            'arquivo': (True, FileBasedCache(diretorio, {}), FileBasedCache(diretorio, {})),
+        }
+        for nome, (compartilhado, worker_a, worker_b) in cenarios.items():
+            with self.subTest(nome), self.settings(PONTO_CACHE_ULTIMO_PONTO=compartilhado,
+                                                   PONTO_JANELA_DUPLICIDADE_SEGUNDOS=0):
+                with mock.patch.object(cache_ultimo_ponto, 'cache', worker_b):
+                    antes = self.ultimo_ponto().json()['proximo_tipo']
+                with mock.patch.object(cache_ultimo_ponto, 'cache', worker_a), \
+                        self.captureOnCommitCallbacks(execute=True):
+                    self.assertEqual(self.registrar().json()['tipo_registrado_codigo'], antes)
+                with mock.patch.object(cache_ultimo_ponto, 'cache', worker_b):
+                    self.assertNotEqual(self.ultimo_ponto().json()['proximo_tipo'], antes)
+
+
+class RegistroPontoLoteApiTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'kiosk{i}', password='Senha@123') for i in range(2)]
+        for user in cls.users:
+            Funcionario.objects.create(user=user)
+
+    def test_lote_alterna_por_funcionario_e_reporta_por_item(self):
+        registros = [
+            {'funcionario_id': self.users[0].pk, 'timestamp': '2025-10-10T12:00:00Z'},
+            {'funcionario_id': self.users[0].pk, 'timestamp': '2025-10-10T21:00:00Z'},
+            {'funcionario_id': self.users[1].pk, 'timestamp': '2025-10-10T12:05:00Z'},
+            {'funcionario_id': 999999, 'timestamp': '2025-10-10T12:05:00Z'},
+            {'funcionario_id': self.users[1].pk},
+        ]
+
+        resposta = self.client.post(
+            '/api/registro-ponto/lote/',
+            json.dumps({'registros': registros}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(resposta.status_code, 200)
+        resultados = resposta.json()['resultados']
+        self.assertEqual([r['status'] for r in resultados], [201, 201, 201, 404, 400])
+        self.assertEqual([r.get('tipo_registrado_codigo') for r in resultados[:3]], ['E', 'S', 'E'])
+        self.assertEqual(RegistroPonto.objects.count(), 3)
+
+    def test_timestamp_sem_fuso_igual_ao_do_ponto_em_tempo_real(self):
+        horario = '2025-10-01T08:00:00'
+        self.client.post('/api/registro-ponto/', json.dumps({'funcionario_id': self.users[0].pk, 'timestamp': horario}),
+                         content_type='application/json')
+        self.client.post('/api/registro-ponto/lote/',
+                         json.dumps({'registros': [{'funcionario_id': self.users[1].pk, 'timestamp': horario}]}),
+                         content_type='application/json')
+
+        tempo_real, lote = (RegistroPonto.objects.get(funcionario__user=user).timestamp for user in self.users)
+        self.assertEqual(tempo_real, lote)
+
+
+class ViewsAsyncTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('async', password='Senha@123')
+        Funcionario.objects.create(user=cls.user)
+
+    async def test_registro_e_ultimo_ponto_assincronos(self):
+        fabrica = AsyncRequestFactory()
+
+        resposta = await views_async.registro_ponto_api(fabrica.post(
+            '/api/registro-ponto/',
+            json.dumps({'funcionario_id': self.user.pk}),
+            content_type='application/json'
+        ))
+        self.assertEqual(resposta.status_code, 201)
+
+        resposta = await views_async.ultimo_ponto_api(
+            fabrica.get('/api/ultimo-ponto/', {'funcionario_id': self.user.pk})
+        )
+        self.assertEqual(json.loads(resposta.content)['proximo_tipo'], 'S')
+
+
+class CacheFuncionariosTests(PontoTestCase):
+    def test_cache_evita_consulta_e_e_invalidado_por_signal(self):
+        user = User.objects.create_user('cache', first_name='Ana', password='Senha@123')
+        funcionario = Funcionario.objects.create(user=user)
+
+        self.assertEqual(obter_funcionario_por_user(user.pk).id, funcionario.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(obter_funcionario_por_user(user.pk).nome, 'Ana')
+
+        user.first_name = 'Beatriz'
+        user.save()
+
+        self.assertEqual(obter_funcionario_por_user(user.pk).nome, 'Beatriz')
+        self.assertGreaterEqual(cache_funcionarios.estatisticas()['hits'], 1)
+
+    def test_funcionario_excluido_em_outro_worker_responde_404(self):
+        user = User.objects.create_user('excluido', password='Senha@123')
+        funcionario = Funcionario.objects.create(user=user)
+        resumo = obter_funcionario_por_user(user.pk)
+        funcionario.delete()
+
+        requisicoes = {
+            'registro': lambda: self.client.post('/api/registro-ponto/', json.dumps({'funcionario_id': user.pk}),
+                                                 content_type='application/json'),
+            'ultimo': lambda: self.client.get('/api/ultimo-ponto/', {'funcionario_id': user.pk}),
+        }
+        for nome, requisicao in requisicoes.items():
+            with self.subTest(nome):
+                # O signal da exclusão só limpou o cache do worker que excluiu
+                cache_funcionarios.set(('user', user.pk), resumo)
+                cache_funcionarios.set(('funcionario', resumo.id), resumo)
+
+                self.assertEqual(requisicao().status_code, 404)
+                self.assertIsNone(cache_funcionarios.get(('user', user.pk)))
+                self.assertFalse(EstadoPonto.objects.filter(pk=resumo.id).exists())
+
+
+class HistoricoPaginacaoTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('historico', password='Senha@123')
+        funcionario = Funcionario.objects.create(user=cls.user)
+        manaus = pytz.timezone('America/Manaus')
+        # Dois registros com o mesmo timestamp: o id desempata no cursor
+        horarios = [datetime(2025, 10, 1, 8), datetime(2025, 10, 1, 12), datetime(2025, 10, 1, 12),
+                    datetime(2025, 10, 1, 13), datetime(2025, 10, 1, 17)]
+        for indice, horario in enumerate(horarios):
+            RegistroPonto.objects.create(funcionario=funcionario, tipo='ES'[indice % 2],
+                                         timestamp=manaus.localize(horario))
+
+    def test_cursor_percorre_todos_sem_repetir(self):
+        ids = []
+        url = f'/api/historico-ponto/?funcionario_id={self.user.pk}&page_size=2'
+        while url:
+            pagina = self.client.get(url).json()
+            ids.extend(registro['id'] for registro in pagina['results'])
+            url = pagina['next']
+
+        esperado = list(RegistroPonto.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperado)
+
+    @override_settings(PONTO_HISTORICO_MAX_LINHAS_COMPLETO=3)
+    def test_modo_completo_respeita_limite(self):
+        resposta = self.client.get('/api/historico-ponto/?completo=1')
+
+        self.assertEqual(len(resposta.json()), 3)
+        self.assertEqual(resposta['X-Resultado-Truncado'], 'true')
+
+    def test_cursor_invalido(self):
+        resposta = self.client.get('/api/historico-ponto/?cursor=lixo')
+
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ExportacaoHistoricoTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exportacao', first_name='Ana', password='Senha@123')
+        funcionario = Funcionario.objects.create(user=cls.user)
+        manaus = pytz.timezone('America/Manaus')
+        for hora, tipo in ((8, 'E'), (12, 'S')):
+            RegistroPonto.objects.create(funcionario=funcionario, tipo=tipo,
+                                         timestamp=manaus.localize(datetime(2025, 10, 1, hora)))
+
+    def test_ndjson_tem_formato_do_serializer(self):
+        resposta = self.client.get(f'/api/historico-ponto/exportar/?funcionario_id={self.user.pk}')
+        linhas = [json.loads(linha) for linha in b''.join(resposta.streaming_content).decode().splitlines()]
+
+        historico = self.client.get(f'/api/historico-ponto/?completo=1&funcionario_id={self.user.pk}').json()
+        self.assertEqual(linhas, list(reversed(historico)))
+
+    def test_csv_com_cabecalho(self):
+        resposta = self.client.get('/api/historico-ponto/exportar/?formato=csv&tipo=entrada')
+        linhas = b''.join(resposta.streaming_content).decode().splitlines()
+
+        self.assertEqual(linhas[0].split(',')[:3], ['id', 'funcionarioId', 'funcionarioNome'])
+        self.assertEqual(len(linhas), 2)
+
+
+class SerializerRapidoTests(PontoTestCase):
+    def test_mesmo_json_do_serializer_de_modelo(self):
+        user = User.objects.create_user('rapido', first_name='Ana', last_name='Lima', password='Senha@123')
+        funcionario = Funcionario.objects.create(user=user)
+        RegistroPonto.objects.create(funcionario=funcionario, tipo='E', observacao='atraso',
+                                     timestamp=datetime(2025, 10, 1, 3, 59, 30, 123456, tzinfo=pytz.UTC))
+        RegistroPonto.objects.create(funcionario=funcionario, tipo='S')
+
+        queryset = RegistroPonto.objects.order_by('id')
+        esperado = PontoHistoricoSerializer(queryset, many=True).data
+        obtido = PontoHistoricoRapidoSerializer(queryset.values(*CAMPOS_HISTORICO), many=True).data
+
+        self.assertEqual(json.loads(json.dumps(obtido)), json.loads(json.dumps(esperado)))
+
+
+class FusoTests(TestCase):
+    def test_lote_igual_a_conversao_com_pytz(self):
+        manaus = pytz.timezone('America/Manaus')
+        timestamps = [datetime(2025, 10, 1, 3, 59, 30, tzinfo=pytz.UTC), datetime(2025, 12, 31, 23, 5),
+                      manaus.localize(datetime(2025, 10, 2, 8, 0, 5))]
+
+        for horario, timestamp in zip(fuso.converter_lote(timestamps), timestamps):
+            if timestamp.tzinfo is None:  # naive: considerado UTC
+                timestamp = pytz.UTC.localize(timestamp)
+            local = timestamp.astimezone(manaus)
+            self.assertEqual(horario.local, local)
+            self.assertEqual((horario.data, horario.completo, horario.hora),
+                             (local.date(), local.strftime('%d/%m/%Y %H:%M:%S'), local.strftime('%H:%M')))
+
+        self.assertEqual(fuso.converter_lote(timestamps[:1])[0].completo, '30/09/2025 23:59:30')
+        self.assertEqual(fuso.dia_semana(date(2025, 10, 4)), 'Sábado')
+        self.assertIsNone(fuso.para_local(None))
+
+
+@override_settings(PONTO_JANELA_DUPLICIDADE_SEGUNDOS=0)
+class OrcamentoConsultasTests(PontoTestCase):
+    """
+    Cada URL de main/urls.py e cada changelist do admin tem um número fixo de consultas,
+    que não pode crescer com o volume de dados (regressão de N+1)
+    """
+    ORCAMENTOS = {
+        'main:inicio': 0,
+        'main:registro': 0,
+        'main:historico': 0,
+        'main:login_api': 10,
+        'main:ultimo_ponto_api': 2,
+        # +1: jornada prevista do dia (JornadaPrevista) para calcular o saldo;
+        # +1: banco de horas do mês (UPDATE com a diferença do dia)
+        'main:registro_ponto_api': 10,
+        # +3: banco de horas de vários funcionários (linhas atuais, saldos dos meses e upsert)
+        'main:registro_ponto_lote_api': 12,
+        'main:logout_api': 4,
+        # +1: período sem data inicial verifica se há meses arquivados
+        'main:historico-ponto-api': 5,
+        'main:historico-ponto-exportar': 3,
+        'main:historico-ponto-resumo': 3,
+        'main:banco_horas_api': 3,
+        'main:relatorios_api': 4,
+        'main:relatorio_status_api': 3,
+        'main:relatorio_download_api': 3,
+        'main:metricas': 0,
+        'admin:main_funcionario_changelist': 6,
+        'admin:main_registroponto_changelist': 5,
+        'admin:main_registroponto_add': 4,
+        'admin:main_feriado_changelist': 7,
+        'admin:main_escala_changelist': 5,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.senha = make_password('Senha@123')
+        cls.admin = User.objects.create_superuser('admin_orcamento', password='Senha@123')
+        cls.funcionarios = []
+        cls.semear(3, 4)
+        # Ponto do mês atual: o do kiosk medido cai no mês que já tem banco de horas (o caso comum;
+        # o primeiro ponto do mês recalcula o banco de horas a partir do mês anterior)
+        RegistroPonto.objects.create(funcionario=cls.funcionarios[0], tipo='E', timestamp=timezone.now())
+
+    @classmethod
+    def semear(cls, quantidade_funcionarios, registros_por_funcionario):
+        inicio = len(cls.funcionarios)
+        usuarios = User.objects.bulk_create([
+            User(username=f'orcamento{indice}', first_name='Funcionário', last_name=str(indice), password=cls.senha)
+            for indice in range(inicio, inicio + quantidade_funcionarios)
+        ])
+        novos = Funcionario.objects.bulk_create([
+            Funcionario(user=user, cpf=f'000.000.{indice:03d}-00', cargo=f'Cargo {indice % 3}')
+            for indice, user in enumerate(usuarios, start=inicio)
+        ])
+        cls.funcionarios.extend(novos)
+
+        base = timezone.now() - timedelta(days=30)
+        RegistroPonto.objects.bulk_create([
+            RegistroPonto(funcionario=funcionario, tipo='ES'[indice % 2],
+                          timestamp=base + timedelta(hours=indice), observacao=f'obs {indice}')
+            for funcionario in novos
+            for indice in range(registros_por_funcionario)
+        ])
+        # bulk_create não dispara signals
+        reconstruir_todos_estados()
+        reconstruir_jornadas()
+        # Mês atual já expandido (como faz "manage.py expandir_jornadas_previstas" em produção)
+        garantir_previstos(*periodo_mes_atual())
+
+    def setUp(self):
+        super().setUp()
+        self.usar_diretorio_relatorios_temporario()
+        enfileirar_relatorio([self.funcionarios[0].pk], date(2025, 10, 1), date(2025, 10, 31))
+        self.tarefa = executar_tarefa(reservar_proxima_tarefa())
+
+    def baixar(self, url):
+        resposta = self.client.get(url)
+        b''.join(resposta.streaming_content)
+        resposta.close()
+        return resposta
+
+    def requisicoes(self):
+        user = self.funcionarios[0].user
+
+        def lote():
+            agora = timezone.now().isoformat()
+            return json.dumps({'registros': [
+                {'funcionario_id': funcionario.user_id, 'timestamp': agora} for funcionario in self.funcionarios[:3]
+            ]})
+
+        return {
+            'main:inicio': lambda: self.client.get(reverse('main:inicio')),
+            'main:registro': lambda: self.client.get(reverse('main:registro')),
+            'main:historico': lambda: self.client.get(reverse('main:historico')),
+            'main:login_api': lambda: self.client.post(
+                reverse('main:login_api'),
+                json.dumps({'usuario': user.username, 'senha': 'Senha@123'}),
+                content_type='application/json'),
+            'main:ultimo_ponto_api': lambda: self.client.get(
+                reverse('main:ultimo_ponto_api'), {'funcionario_id': user.pk}),
+            'main:registro_ponto_api': lambda: self.client.post(
+                reverse('main:registro_ponto_api'),
+                json.dumps({'funcionario_id': user.pk}),
+                content_type='application/json'),
+            'main:registro_ponto_lote_api': lambda: self.client.post(
+                reverse('main:registro_ponto_lote_api'), lote(), content_type='application/json'),
+            'main:logout_api': lambda: self.client.post(reverse('main:logout_api')),
+            'main:historico-ponto-api': lambda: self.client.get(
+                reverse('main:historico-ponto-api'), {'page_size': 500}),
+            'main:historico-ponto-exportar': lambda: b''.join(
+                self.client.get(reverse('main:historico-ponto-exportar')).streaming_content),
+            'main:historico-ponto-resumo': lambda: self.client.get(reverse('main:historico-ponto-resumo')),
+            'main:banco_horas_api': lambda: self.client.get(
+                reverse('main:banco_horas_api'), {'funcionario_id': user.pk}),
+            'main:relatorios_api': lambda: self.client.post(
+                reverse('main:relatorios_api'), json.dumps({'funcionario_ids': [user.pk]}),
+                content_type='application/json'),
+            'main:relatorio_status_api': lambda: self.client.get(
+                reverse('main:relatorio_status_api', args=[self.tarefa.pk])),
+            'main:relatorio_download_api': lambda: self.baixar(
+                reverse('main:relatorio_download_api', args=[self.tarefa.pk])),
+            'main:metricas': lambda: self.client.get(reverse('main:metricas')),
+            'admin:main_funcionario_changelist': lambda: self.client.get(
+                reverse('admin:main_funcionario_changelist')),
+            'admin:main_registroponto_changelist': lambda: self.client.get(
+                reverse('admin:main_registroponto_changelist')),
+            'admin:main_registroponto_add': lambda: self.client.get(
+                reverse('admin:main_registroponto_add')),
+            'admin:main_feriado_changelist': lambda: self.client.get(
+                reverse('admin:main_feriado_changelist')),
+            'admin:main_escala_changelist': lambda: self.client.get(
+                reverse('admin:main_escala_changelist')),
+        }
+
+    def medir(self):
+        consultas = {}
+        for nome, requisicao in self.requisicoes().items():
+            # Mesmo ponto de partida para cada medição: sessão de admin e caches frios
+            self.client.force_login(self.admin)
+            respostas_idempotentes.clear()
+            cache_funcionarios.clear()
+            cache_calendario.clear()
+            cache_escalas.clear()
+            cache.clear()
+            ContentType.objects.clear_cache()
+            with CaptureQueriesContext(connection) as contexto:
+                resposta = requisicao()
+            if hasattr(resposta, 'status_code'):
+                self.assertLess(resposta.status_code, 400, nome)
+            consultas[nome] = len(contexto.captured_queries)
+        return consultas
+
+    def test_toda_url_tem_orcamento(self):
+        nomes = {f'main:{padrao.name}' for padrao in urlpatterns}
+        self.assertLessEqual(nomes, set(self.ORCAMENTOS))
+
+    def test_consultas_nao_crescem_com_volume(self):
+        pequeno = self.medir()
+        self.semear(25, 40)
+        grande = self.medir()
+
+        for nome, orcamento in self.ORCAMENTOS.items():
+            with self.subTest(nome):
+                self.assertEqual(grande[nome], pequeno[nome])
+                self.assertLessEqual(grande[nome], orcamento)
+
+
+class JornadaDiariaTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('jornada', first_name='Ana', password='Senha@123')
+        cls.funcionario = Funcionario.objects.create(user=cls.user)
+
+    def registrar(self, tipo, dia, hora, minuto=0):
+        manaus = pytz.timezone('America/Manaus')
+        return RegistroPonto.objects.create(
+            funcionario=self.funcionario, tipo=tipo,
+            timestamp=manaus.localize(datetime(2025, 10, dia, hora, minuto)))
+
+    def jornadas(self):
+        return list(JornadaDiaria.objects.order_by('funcionario_id', 'data').values(
+            'funcionario_id', 'data', 'minutos_trabalhados', 'saldo_minutos', 'primeira_entrada',
+            'ultima_saida', 'quantidade_registros', 'observacao', 'horarios'))
+
+    def test_atualizada_a_cada_registro_e_igual_a_reconstrucao(self):
+        # Quarta-feira, 01/10/2025: 4h + 4h30 = 8h30 -> +1:00
+        self.registrar('E', 1, 8)
+        self.registrar('S', 1, 12)
+        self.registrar('E', 1, 13)
+        saida = self.registrar('S', 1, 17, 30)
+        # Sábado: compensado; 23:30 local já é dia 5 em UTC
+        self.registrar('E', 4, 23, 30)
+
+        jornada = JornadaDiaria.objects.get(data=date(2025, 10, 1))
+        self.assertEqual((jornada.minutos_trabalhados, jornada.saldo_minutos, jornada.observacao), (510, 60, 'extras'))
+        self.assertEqual(jornada.horarios, ['08:00', '12:00', '13:00', '17:30', '-', '-', '-', '-'])
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 4)).observacao, 'compensado')
+
+        # Edição no admin: a saída muda de dia e os dois dias são recalculados
+        saida.timestamp += timedelta(days=1)
+        saida.save()
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 1)).minutos_trabalhados, 240)
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 2)).quantidade_registros, 1)
+
+        # Exclusão do único registro do dia remove a linha
+        saida.delete()
+        self.assertFalse(JornadaDiaria.objects.filter(data=date(2025, 10, 2)).exists())
+
+        incremental = self.jornadas()
+        reconstruir_jornadas()
+        self.assertEqual(self.jornadas(), incremental)
+
+    def test_lote_atualiza_jornada(self):
+        registros = [
+            {'funcionario_id': self.user.pk, 'timestamp': '2025-10-06T12:00:00Z'},
+            {'funcionario_id': self.user.pk, 'timestamp': '2025-10-06T19:30:00Z'},
+        ]
+        self.client.post('/api/registro-ponto/lote/', json.dumps({'registros': registros}),
+                         content_type='application/json')
+
+        jornada = JornadaDiaria.objects.get(funcionario=self.funcionario, data=date(2025, 10, 6))
+        self.assertEqual((jornada.minutos_trabalhados, jornada.observacao), (450, 'ok'))
+
+    def test_resumo_e_relatorio_leem_a_jornada(self):
+        self.registrar('E', 1, 8)
+        self.registrar('S', 1, 12)
+
+        resposta = self.client.get('/api/historico-ponto/resumo/', {'funcionario_id': self.user.pk})
+        corpo = resposta.json()
+        self.assertEqual(corpo['dias'][0]['saldo'], '-3:30')
+        self.assertEqual(corpo['dias'][0]['observacao'], 'Jornada Incompleta')
+        self.assertEqual(corpo['totais']['total_horas'], '4:00')
+
+        pdf = gerar_relatorio_ponto_pdf(self.funcionario, date(2025, 10, 1), date(2025, 10, 31))
+        self.assertTrue(pdf.getvalue().startswith(b'%PDF'))
+
+
+class BancoHorasTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin_banco', password='Senha@123')
+        cls.user = User.objects.create_user('banco', first_name='Bia', password='Senha@123')
+        cls.funcionario = Funcionario.objects.create(user=cls.user)
+
+    def registrar(self, mes, dia, entrada, saida):
+        manaus = pytz.timezone('America/Manaus')
+        return [RegistroPonto.objects.create(funcionario=self.funcionario, tipo=tipo,
+                                             timestamp=manaus.localize(datetime(2025, mes, dia, hora)))
+                for tipo, hora in (('E', entrada), ('S', saida))]
+
+    def banco(self):
+        return list(BancoHoras.objects.filter(funcionario=self.funcionario).order_by('mes').values_list(
+            'mes', 'saldo_mes_minutos', 'saldo_acumulado_minutos'))
+
+    def test_acumulado_incremental_igual_a_reconstrucao(self):
+        self.registrar(7, 1, 8, 18)   # Terça: 10h -> +2:30
+        self.registrar(9, 1, 8, 12)   # Segunda: 4h -> -3:30 (agosto sem jornada entra com 0)
+        outubro = self.registrar(10, 1, 8, 17)   # Quarta: 9h -> +1:30
+        self.assertEqual(self.banco(), [
+            (date(2025, 7, 1), 150, 150), (date(2025, 8, 1), 0, 150),
+            (date(2025, 9, 1), -210, -60), (date(2025, 10, 1), 90, 30),
+        ])
+
+        # Edição de um ponto passado: só setembro em diante é regravado
+        entrada_setembro = RegistroPonto.objects.get(timestamp__month=9, tipo='E')
+        entrada_setembro.timestamp -= timedelta(hours=4)
+        with CaptureQueriesContext(connection) as contexto:
+            entrada_setembro.save()
+        upsert = [consulta['sql'] for consulta in contexto.captured_queries
+                  if consulta['sql'].startswith('INSERT INTO "main_bancohoras"')]
+        self.assertEqual(len(upsert), 1)
+        self.assertNotIn("'2025-07-01'", upsert[0])
+        self.assertEqual(self.banco()[2:], [(date(2025, 9, 1), 30, 180), (date(2025, 10, 1), 90, 270)])
+
+        # Último mês sem jornada: a linha sai e o saldo atual volta ao de setembro
+        for registro in outubro:
+            registro.delete()
+        self.assertEqual(self.banco()[-1], (date(2025, 9, 1), 30, 180))
+
+        incremental = self.banco()
+        reconstruir_jornadas()
+        self.assertEqual(self.banco(), incremental)
+
+    def test_mes_mais_recente_recebe_a_diferenca_num_update(self):
+        self.registrar(9, 1, 8, 12)   # -3:30
+        self.registrar(10, 1, 8, 17)   # +1:30
+
+        # Quinta, 02/10: 10h -> +2:30; cada ponto só soma a diferença do dia
+        with CaptureQueriesContext(connection) as contexto:
+            _, saida = self.registrar(10, 2, 8, 18)
+        banco_sql = [consulta['sql'] for consulta in contexto.captured_queries if 'main_bancohoras' in consulta['sql']]
+        self.assertEqual([sql.split()[0] for sql in banco_sql], ['UPDATE', 'UPDATE'])
+        self.assertEqual(self.banco()[-1], (date(2025, 10, 1), 240, 30))
+
+        saida.timestamp -= timedelta(hours=1)
+        saida.save()
+        self.assertEqual(self.banco()[-1], (date(2025, 10, 1), 180, -30))
+
+        incremental = self.banco()
+        reconstruir_jornadas()
+        self.assertEqual(self.banco(), incremental)
+
+    def test_api_e_coluna_do_admin(self):
+        self.registrar(10, 1, 8, 17)
+
+        corpo = self.client.get('/api/banco-horas/', {'funcionario_id': self.user.pk}).json()
+        self.assertEqual((corpo['saldo'], corpo['meses'][0]['mes']), ('+1:30', '2025-10'))
+        todos = self.client.get('/api/banco-horas/').json()['funcionarios']
+        self.assertEqual([(linha['funcionarioNome'], linha['saldo_minutos']) for linha in todos], [('Bia', 90)])
+
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get('/admin/main/funcionario/'), '+1:30')
+
+
+class CalendarioTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.funcionario = Funcionario.objects.create(user=User.objects.create_user('calendario', password='Senha@123'))
+        Feriado.objects.create(data=date(2025, 10, 12), descricao='Nossa Senhora Aparecida')  # Domingo
+        Feriado.objects.create(data=date(2025, 11, 20), descricao='Consciência Negra')  # Quinta-feira
+
+    def registrar(self, tipo, dia, hora):
+        manaus = pytz.timezone('America/Manaus')
+        return RegistroPonto.objects.create(funcionario=self.funcionario, tipo=tipo,
+                                            timestamp=manaus.localize(datetime(2025, 10, dia, hora)))
+
+    def test_bitmap_do_ano(self):
+        calendario = calendario_ano(2025)
+        # 2025: 261 dias de segunda a sexta, menos o feriado da quinta-feira
+        self.assertEqual(calendario.total_dias_uteis, 260)
+        self.assertTrue(calendario.dia_util(date(2025, 1, 1)))
+        self.assertFalse(calendario.dia_util(date(2025, 10, 4)))
+        self.assertFalse(calendario.dia_util(date(2025, 11, 20)))
+        self.assertTrue(calendario.dia_util(date(2025, 12, 31)))
+        self.assertEqual(calendario_ano(2024).total_dias_uteis, 262)
+
+    def test_grade_classifica_dias_sem_registro_sem_consultas(self):
+        self.registrar('E', 1, 8)
+        self.registrar('S', 1, 16)
+        jornadas = {jornada.data: jornada for jornada in JornadaDiaria.objects.all()}
+        calendario_ano(2025)
+
+        with self.assertNumQueries(0):
+            grade = grade_periodo(date(2025, 10, 1), date(2025, 10, 31), jornadas, hoje=date(2025, 10, 20))
+
+        self.assertEqual(len(grade), 31)
+        observacoes = {dia.data.day: dia.observacao for dia in grade}
+        self.assertEqual(observacoes[1], 'extras')
+        self.assertEqual(observacoes[2], 'falta')
+        self.assertEqual(observacoes[4], 'folga')
+        self.assertEqual(observacoes[12], 'feriado')
+        self.assertEqual(observacoes[20], '')
+        self.assertEqual(grade[11].feriado, 'Nossa Senhora Aparecida')
+        self.assertEqual(grade[1].observacao_display, 'Falta')
+        self.assertEqual(sum(1 for dia in grade if dia.observacao == 'falta'), 12)
+
+    def test_feriado_novo_reclassifica_jornada_gravada(self):
+        self.registrar('E', 2, 8)
+        self.registrar('S', 2, 12)
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 2)).observacao, 'incompleta')
+
+        feriado = Feriado.objects.create(data=date(2025, 10, 2), descricao='Ponto facultativo')
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 2)).observacao, 'compensado')
+
+        feriado.data = date(2025, 10, 3)
+        feriado.save()
+        self.assertEqual(JornadaDiaria.objects.get(data=date(2025, 10, 2)).observacao, 'incompleta')
+        self.assertFalse(calendario_ano(2025).dia_util(date(2025, 10, 3)))
+
+        feriado.delete()
+        self.assertTrue(calendario_ano(2025).dia_util(date(2025, 10, 3)))
+
+
+class EscalaTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.escala_vigia = Escala.objects.create(nome='Vigia 6x1', cargo='Vigia', minutos_sabado=240)
+        cls.funcionario = Funcionario.objects.create(
+            user=User.objects.create_user('escala', password='Senha@123'), cargo='Vigia')
+        cls.sem_escala = Funcionario.objects.create(user=User.objects.create_user('sem_escala', password='Senha@123'))
+        Feriado.objects.create(data=date(2025, 10, 2), descricao='Feriado municipal')
+
+    def registrar(self, data, hora_entrada, hora_saida):
+        manaus = pytz.timezone('America/Manaus')
+        for tipo, hora in (('E', hora_entrada), ('S', hora_saida)):
+            RegistroPonto.objects.create(funcionario=self.funcionario, tipo=tipo,
+                                         timestamp=manaus.localize(datetime(data.year, data.month, data.day, hora)))
+
+    def test_prioridade_funcionario_cargo_padrao_e_feriado(self):
+        # 01/10/2025 = quarta, 02 = feriado, 04 = sábado, 05 = domingo
+        dias = [date(2025, 10, dia) for dia in (1, 2, 4, 5)]
+        previstos = obter_previstos((funcionario.pk, dia) for funcionario in (self.funcionario, self.sem_escala)
+                                    for dia in dias)
+
+        self.assertEqual([previstos[(self.funcionario.pk, dia)] for dia in dias], [450, 0, 240, 0])
+        self.assertEqual([previstos[(self.sem_escala.pk, dia)] for dia in dias], [450, 0, 0, 0])
+        self.assertEqual(JornadaPrevista.objects.count(), 8)
+
+        # Segunda leitura: só o índice da tabela
+        with self.assertNumQueries(1):
+            self.assertEqual(obter_previstos([(self.funcionario.pk, dias[2])]), {(self.funcionario.pk, dias[2]): 240})
+
+    def test_jornada_compara_com_a_escala(self):
+        sabado = date(2025, 10, 4)
+        self.registrar(sabado, 8, 12)
+        jornada = JornadaDiaria.objects.get(data=sabado)
+        # 4h num sábado com 4h previstas: jornada cumprida, não "compensado"
+        self.assertEqual((jornada.saldo_minutos, jornada.observacao), (0, 'ok'))
+
+    def test_mudanca_de_escala_vale_de_hoje_em_diante(self):
+        hoje = timezone.localdate()
+        passado = hoje - timedelta(days=7)
+        self.registrar(hoje, 8, 12)
+        self.registrar(passado, 8, 12)
+        previsto_passado = JornadaPrevista.objects.get(funcionario=self.funcionario, data=passado).minutos_previstos
+
+        escala = Escala.objects.create(nome='Meio período', **{campo: 240 for campo in Escala.CAMPOS_SEMANA})
+        self.funcionario.escala = escala
+        self.funcionario.save()
+
+        self.assertEqual(JornadaPrevista.objects.get(funcionario=self.funcionario, data=hoje).minutos_previstos, 240)
+        self.assertEqual(JornadaDiaria.objects.get(data=hoje).saldo_minutos, 0)
+        self.assertEqual(JornadaPrevista.objects.get(funcionario=self.funcionario, data=passado).minutos_previstos,
+                         previsto_passado)
+
+        # Editar a escala reexpande quem a usa
+        for campo in Escala.CAMPOS_SEMANA:
+            setattr(escala, campo, 180)
+        escala.save()
+        self.assertEqual(JornadaDiaria.objects.get(data=hoje).saldo_minutos, 60)
+
+        # Excluir a escala volta para a escala do cargo
+        escala.delete()
+        self.assertEqual(JornadaPrevista.objects.get(funcionario=self.funcionario, data=hoje).minutos_previstos,
+                         self.escala_vigia.minutos_semana[hoje.weekday()])
+
+    def test_relatorio_usa_previstos_e_expande_uma_vez(self):
+        self.usar_diretorio_relatorios_temporario()
+        caminho, do_cache = obter_relatorio_pdf(self.funcionario.pk, date(2025, 10, 1), date(2025, 10, 31))
+        self.assertFalse(do_cache)
+        self.assertEqual(JornadaPrevista.objects.filter(funcionario=self.funcionario).count(), 31)
+        self.assertEqual(obter_relatorio_pdf(self.funcionario.pk, date(2025, 10, 1), date(2025, 10, 31)),
+                         (caminho, True))
+
+        self.escala_vigia.minutos_sabado = 0
+        self.escala_vigia.save()
+        # Outubro/2025 já passou: os dias do relatório continuam congelados
+        self.assertEqual(obter_relatorio_pdf(self.funcionario.pk, date(2025, 10, 1), date(2025, 10, 31)),
+                         (caminho, True))
+
+
+@override_settings(PONTO_RELATORIOS_WORKERS=1)
+class RelatoriosLoteTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin_relatorios', password='Senha@123')
+        cls.funcionarios = [
+            Funcionario.objects.create(user=User.objects.create_user(f'relatorio{i}', password='Senha@123'))
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.usar_diretorio_relatorios_temporario()
+
+    def test_acao_do_admin_devolve_zip_com_um_pdf_por_funcionario(self):
+        self.client.force_login(self.admin)
+        resposta = self.client.post('/admin/main/funcionario/', {
+            'action': 'gerar_relatorio_mensal_pdf',
+            '_selected_action': [funcionario.pk for funcionario in self.funcionarios],
+        })
+
+        self.assertEqual(resposta['Content-Type'], 'application/zip')
+        arquivo_zip = zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+        pdfs = [nome for nome in arquivo_zip.namelist() if nome.endswith('.pdf')]
+        self.assertEqual(len(pdfs), 3)
+        self.assertIn('resumo.csv', arquivo_zip.namelist())
+
+    def test_falha_de_um_funcionario_nao_interrompe_os_demais(self):
+        original = relatorios_lote.renderizar_relatorio
+        com_falha = self.funcionarios[1].pk
+
+        def renderizar(funcionario_id, *args):
+            if funcionario_id == com_falha:
+                raise ValueError('sem dados')
+            return original(funcionario_id, *args)
+
+        progresso = []
+        with mock.patch.object(relatorios_lote, 'renderizar_relatorio', renderizar):
+            conteudo = b''.join(relatorios_lote.zip_relatorios(
+                [funcionario.pk for funcionario in self.funcionarios], date(2025, 10, 1), date(2025, 10, 31),
+                progresso=lambda concluidos, total, funcionario_id, erro: progresso.append((concluidos, erro))))
+
+        arquivo_zip = zipfile.ZipFile(io.BytesIO(conteudo))
+        resumo = arquivo_zip.read('resumo.csv').decode().splitlines()
+        self.assertEqual([linha.split(',')[3] for linha in resumo[1:]], ['ok', 'erro', 'ok'])
+        self.assertEqual(progresso, [(1, None), (2, 'sem dados'), (3, None)])
+
+
+class FilaRelatoriosTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin_fila', password='Senha@123')
+        cls.users = [User.objects.create_user(f'fila{i}', password='Senha@123') for i in range(2)]
+        for user in cls.users:
+            Funcionario.objects.create(user=user)
+
+    def setUp(self):
+        super().setUp()
+        self.usar_diretorio_relatorios_temporario()
+
+    def enfileirar(self, user_ids):
+        return self.client.post('/api/relatorios/', json.dumps({
+            'funcionario_ids': user_ids, 'data_inicio': '2025-10-01', 'data_fim': '2025-10-31',
+        }), content_type='application/json')
+
+    def test_enfileira_processa_e_baixa(self):
+        self.client.force_login(self.admin)
+        tarefa = self.enfileirar([user.pk for user in self.users]).json()
+        self.assertEqual(tarefa['status'], TarefaRelatorio.NA_FILA)
+
+        self.assertEqual(processar_fila(), 1)
+
+        status = self.client.get(tarefa['status_url']).json()
+        self.assertEqual((status['status'], status['concluidos'], status['total']), ('concluida', 2, 2))
+
+        resposta = self.client.get(status['download_url'])
+        conteudo = b''.join(resposta.streaming_content)
+        resposta.close()
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="relatorios_ponto_2025_10.zip"')
+        self.assertEqual(len(zipfile.ZipFile(io.BytesIO(conteudo)).namelist()), 3)
+
+    def test_tarefa_reservada_nao_e_pega_de_novo(self):
+        self.client.force_login(self.admin)
+        self.enfileirar([self.users[0].pk])
+
+        self.assertIsNotNone(reservar_proxima_tarefa('a'))
+        self.assertIsNone(reservar_proxima_tarefa('b'))
+
+    def test_apenas_administracao(self):
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.enfileirar([self.users[0].pk]).status_code, 403)
+
+    def test_so_volta_para_a_fila_tarefa_sem_sinal_do_worker(self):
+        self.client.force_login(self.admin)
+        viva, travada = (self.enfileirar([user.pk for user in self.users]).json()['id'] for _ in range(2))
+        for worker in ('a', 'b'):
+            reservar_proxima_tarefa(worker)
+
+        # As duas começaram há 2h; o worker da primeira está vivo, no meio do ZIP
+        duas_horas = timezone.now() - timedelta(hours=2)
+        TarefaRelatorio.objects.update(iniciada_em=duas_horas, ultimo_sinal_em=duas_horas)
+        recuperadas = []
+
+        def zip_demorado(funcionario_ids, data_inicio, data_fim, progresso):
+            yield b'parte 1'
+            progresso(1, len(funcionario_ids), funcionario_ids[0], None)
+            recuperadas.append(recuperar_tarefas_travadas(3600))
+            yield b'parte 2'
+
+        with mock.patch('main.fila_relatorios.zip_relatorios', zip_demorado):
+            executar_tarefa(TarefaRelatorio.objects.get(pk=viva))
+
+        self.assertEqual(recuperadas, [1])
+        self.assertEqual(dict(TarefaRelatorio.objects.values_list('pk', 'status')),
+                         {viva: TarefaRelatorio.CONCLUIDA, travada: TarefaRelatorio.NA_FILA})
+
+    def test_worker_que_perdeu_a_tarefa_descarta_o_resultado(self):
+        self.client.force_login(self.admin)
+        self.enfileirar([user.pk for user in self.users])
+        lenta = reservar_proxima_tarefa('a')
+
+        def zip_perdido(funcionario_ids, data_inicio, data_fim, progresso):
+            yield b'parte de a'
+            # O worker "a" ficou sem sinal; a tarefa voltou para a fila e "b" a terminou
+            TarefaRelatorio.objects.update(ultimo_sinal_em=timezone.now() - timedelta(hours=2))
+            recuperar_tarefas_travadas(3600)
+            with mock.patch('main.fila_relatorios.zip_relatorios', lambda *args, **kwargs: iter([b'zip de b'])):
+                executar_tarefa(reservar_proxima_tarefa('b'))
+            progresso(2, len(funcionario_ids), funcionario_ids[-1], None)
+            yield b'resto de a'
+
+        with mock.patch('main.fila_relatorios.zip_relatorios', zip_perdido):
+            executar_tarefa(lenta)
+
+        tarefa = TarefaRelatorio.objects.get(pk=lenta.pk)
+        self.assertEqual((tarefa.status, tarefa.worker), (TarefaRelatorio.CONCLUIDA, 'b'))
+        with open(tarefa.arquivo, 'rb') as arquivo:
+            self.assertEqual(arquivo.read(), b'zip de b')
+        self.assertEqual(os.listdir(os.path.dirname(tarefa.arquivo)), [os.path.basename(tarefa.arquivo)])
+
+
+class CachePdfTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin_cache_pdf', password='Senha@123')
+        cls.funcionario = Funcionario.objects.create(user=User.objects.create_user('cache_pdf', password='Senha@123'))
+
+    def setUp(self):
+        super().setUp()
+        self.usar_diretorio_relatorios_temporario()
+        manaus = pytz.timezone('America/Manaus')
+        self.registro = RegistroPonto.objects.create(funcionario=self.funcionario, tipo='E',
+                                                     timestamp=manaus.localize(datetime(2025, 10, 1, 8)))
+
+    def obter(self):
+        return obter_relatorio_pdf(self.funcionario.pk, date(2025, 10, 1), date(2025, 10, 31))
+
+    def test_acerto_nao_renderiza_e_alteracao_muda_a_chave(self):
+        caminho, do_cache = self.obter()
+        self.assertFalse(do_cache)
+
+        with mock.patch('main.utils.gerar_relatorio_ponto_pdf') as gerar, self.assertNumQueries(1):
+            self.assertEqual(self.obter(), (caminho, True))
+        gerar.assert_not_called()
+
+        self.registro.observacao = 'ajuste'
+        self.registro.timestamp += timedelta(minutes=5)
+        self.registro.save()
+        novo_caminho, do_cache = self.obter()
+        self.assertFalse(do_cache)
+        self.assertNotEqual(novo_caminho, caminho)
+
+    def test_limite_remove_os_menos_usados(self):
+        antigo, _ = self.obter()
+        os.utime(antigo, (0, 0))
+        RegistroPonto.objects.create(funcionario=self.funcionario, tipo='S',
+                                     timestamp=self.registro.timestamp + timedelta(hours=4))
+        recente, _ = self.obter()
+
+        self.assertEqual(aplicar_limite_cache_pdf(max_bytes=recente.stat().st_size), 1)
+        self.assertFalse(antigo.exists())
+        self.assertTrue(recente.exists())
+        self.assertEqual(estatisticas_cache_pdf()['arquivos'], 1)
+
+    def test_acao_do_admin_serve_arquivo_do_cache(self):
+        self.client.force_login(self.admin)
+        resposta = self.client.post('/admin/main/funcionario/', {
+            'action': 'gerar_relatorio_mensal_pdf', '_selected_action': [self.funcionario.pk],
+        })
+        conteudo = b''.join(resposta.streaming_content)
+        resposta.close()
+
+        self.assertTrue(conteudo.startswith(b'%PDF'))
+        self.assertEqual(estatisticas_cache_pdf()['arquivos'], 1)
+
+    def test_modo_do_pdf_faz_parte_da_chave(self):
+        platypus, _ = self.obter()
+        canvas, do_cache = obter_relatorio_pdf(self.funcionario.pk, date(2025, 10, 1), date(2025, 10, 31), 'canvas')
+
+        self.assertFalse(do_cache)
+        self.assertNotEqual(canvas, platypus)
+        self.assertTrue(canvas.read_bytes().startswith(b'%PDF'))
+
+
+class RelatorioPdfTests(TestCase):
+    def paginas(self, pdf):
+        return len(re.findall(rb'/Type /Page\b(?!s)', pdf.getvalue()))
+
+    def test_modos_quebram_as_mesmas_paginas(self):
+        linha = ['01/10/2025', 'Quarta', '08:00', '12:00', '13:00', '17:30'] + ['-'] * 4 + ['8:30', '+1:00', 'OK']
+        dados = DadosRelatorio([linha] * (LINHAS_POR_PAGINA * 2 + 1), ['Total de registros: 4'])
+
+        paginas = {}
+        for modo in MODOS:
+            pdf = io.BytesIO()
+            renderizar(pdf, dados, modo)
+            paginas[modo] = self.paginas(pdf)
+        unica = io.BytesIO()
+        renderizar_platypus(unica, dados, linhas_por_bloco=None)
+
+        self.assertEqual(paginas, {'platypus': 3, 'canvas': 3})
+        self.assertEqual(self.paginas(unica), 3)
+        self.assertIs(estilos(), estilos())
+        with self.assertRaises(ValueError):
+            renderizar(io.BytesIO(), dados, 'html')
+
+
+class HorasSqlTests(PontoTestCase):
+    def test_mesmo_resultado_do_pareamento_em_python(self):
+        manaus = pytz.timezone('America/Manaus')
+        aleatorio = random.Random(15)
+        funcionarios = [
+            Funcionario.objects.create(user=User.objects.create_user(f'sql{i}', password='Senha@123'))
+            for i in range(4)
+        ]
+
+        registros = []
+        for funcionario in funcionarios:
+            momento = manaus.localize(datetime(2025, 10, 1, 6))
+            for _ in range(60):
+                # Intervalos variados (inclusive cruzando a meia-noite local) e sequências sem par: E E S, S S, ...
+                momento += timedelta(minutes=aleatorio.randint(1, 600), seconds=aleatorio.randint(0, 59),
+                                     microseconds=aleatorio.randint(0, 999999))
+                registros.append(RegistroPonto(funcionario=funcionario, tipo=aleatorio.choice('EES'),
+                                               timestamp=momento))
+        # Empate de timestamp: o id decide a ordem
+        registros.append(RegistroPonto(funcionario=funcionarios[0], tipo='S', timestamp=registros[0].timestamp))
+        RegistroPonto.objects.bulk_create(registros)
+
+        esperado = {}
+        for registro in RegistroPonto.objects.order_by('funcionario_id', 'timestamp', 'id'):
+            esperado.setdefault((registro.funcionario_id, dia_local(registro.timestamp)), []).append(
+                (registro.tipo, registro.timestamp))
+
+        # +1: mês fechado, verifica se há meses arquivados (main/arquivo_ponto.py)
+        with self.assertNumQueries(2):
+            obtido = horas_por_dia(date(2025, 10, 1), date(2025, 10, 31))
+
+        self.assertEqual(set(obtido), set(esperado))
+        for chave, marcacoes in esperado.items():
+            self.assertEqual(obtido[chave].minutos_trabalhados, calcular_minutos_trabalhados(marcacoes), chave)
+            self.assertEqual(obtido[chave].quantidade_registros, len(marcacoes))
+
+        # Jornada prevista expandida entra no mesmo SELECT (LEFT JOIN)
+        garantir_previstos(date(2025, 10, 1), date(2025, 10, 31))
+        with self.assertNumQueries(2):
+            obtido = horas_por_dia(date(2025, 10, 1), date(2025, 10, 31))
+        previstos = obter_previstos(esperado)
+        for chave, horas in obtido.items():
+            self.assertEqual(horas.minutos_previstos, previstos[chave])
+            self.assertEqual(horas.saldo_minutos, calcular_saldo(horas.minutos_trabalhados, previstos[chave]))
+
+
+@skipUnless(folha_numpy.numpy_disponivel(), 'NumPy não instalado')
+class FolhaNumpyTests(PontoTestCase):
+    def test_totais_iguais_as_funcoes_de_jornada(self):
+        manaus = pytz.timezone('America/Manaus')
+        aleatorio = random.Random(16)
+        funcionarios = [
+            Funcionario.objects.create(user=User.objects.create_user(f'folha{i}', password='Senha@123'))
+            for i in range(5)
+        ]
+        registros = []
+        for funcionario in funcionarios:
+            momento = manaus.localize(datetime(2025, 9, 30, 20))
+            for _ in range(80):
+                momento += timedelta(minutes=aleatorio.randint(30, 400), microseconds=aleatorio.randint(0, 999999))
+                registros.append(RegistroPonto(funcionario=funcionario, tipo=aleatorio.choice('EES'),
+                                               timestamp=momento))
+        RegistroPonto.objects.bulk_create(registros)
+
+        esperado = {}
+        for registro in filtrar_periodo(RegistroPonto.objects.all(), date(2025, 10, 1), date(2025, 10, 31)).order_by(
+                'funcionario_id', 'timestamp', 'id'):
+            esperado.setdefault(registro.funcionario_id, {}).setdefault(
+                dia_local(registro.timestamp), []).append((registro.tipo, registro.timestamp))
+
+        # Escala com sábado: o saldo de cada dia é contra a jornada prevista, não contra 7h30
+        Escala.objects.create(nome='Seis dias', minutos_sabado=240, minutos_sexta=480)
+        funcionarios[0].escala = Escala.objects.get()
+        funcionarios[0].save()
+
+        totais = folha_numpy.fechar_periodo(date(2025, 10, 1), date(2025, 10, 31))
+        previstos = obter_previstos(
+            (funcionario_id, dia) for funcionario_id, dias in esperado.items() for dia in dias)
+
+        self.assertEqual(set(totais), set(esperado))
+        for funcionario_id, dias in esperado.items():
+            minutos = [calcular_minutos_trabalhados(marcacoes) for marcacoes in dias.values()]
+            saldos = [calcular_saldo(valor, previstos[(funcionario_id, dia)]) for dia, valor in zip(dias, minutos)]
+            self.assertEqual(totais[funcionario_id], folha_numpy.TotaisFolha(
+                funcionario_id, len(dias), sum(minutos),
+                sum(max(saldo, 0) for saldo in saldos), sum(max(-saldo, 0) for saldo in saldos)))
+
+    def test_periodo_sem_registros(self):
+        self.assertEqual(folha_numpy.fechar_periodo(date(2025, 10, 1), date(2025, 10, 31)), {})
+
+
+class MetricasTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('metricas', password='Senha@123')
+        Funcionario.objects.create(user=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        metricas.registro.limpar()
+
+    def amostras(self, **extra):
+        resposta = self.client.get(reverse('main:metricas'), **extra)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta['Content-Type'].startswith('text/plain; version=0.0.4'))
+        valores = {}
+        for linha in resposta.content.decode().splitlines():
+            if not linha.startswith('#'):
+                serie, valor = linha.rsplit(' ', 1)
+                valores[serie] = float(valor)
+        return valores
+
+    def test_latencia_consultas_tamanho_e_status_por_rota(self):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get('/api/ultimo-ponto/', {'funcionario_id': self.user.pk})
+            self.client.get('/api/ultimo-ponto/', {'funcionario_id': 999999})
+        consultas = len(contexto.captured_queries)  # cada requisição nova limpa connection.queries
+        self.client.get('/nao-existe/')
+
+        valores = self.amostras()
+        rota = 'rota="main:ultimo_ponto_api"'
+        self.assertEqual(valores[f'ponto_http_requisicoes_total{{{rota},metodo="GET",status="200"}}'], 1)
+        self.assertEqual(valores[f'ponto_http_requisicoes_total{{{rota},metodo="GET",status="404"}}'], 1)
+        self.assertEqual(valores['ponto_http_requisicoes_total{rota="nao_resolvida",metodo="GET",status="404"}'], 1)
+        self.assertEqual(valores[f'ponto_http_duracao_segundos_count{{{rota},metodo="GET"}}'], 2)
+        self.assertEqual(valores[f'ponto_http_duracao_segundos_bucket{{{rota},metodo="GET",le="+Inf"}}'], 2)
+
+        self.assertEqual(valores[f'ponto_http_consultas_sum{{{rota}}}'], consultas)
+        self.assertEqual(valores[f'ponto_http_consultas_bucket{{{rota},le="0.0"}}'], 0)
+        self.assertGreater(valores[f'ponto_http_consultas_duracao_segundos_sum{{{rota}}}'], 0)
+        self.assertGreaterEqual(valores[f'ponto_http_resposta_bytes_sum{{{rota}}}'], len(resposta.content))
+
+    def test_streaming_registrado_ao_fim_do_corpo(self):
+        resposta = self.client.get(reverse('main:historico-ponto-exportar'))
+        self.assertNotIn('ponto_http_resposta_bytes_sum{rota="main:historico-ponto-exportar"}', self.amostras())
+
+        corpo = b''.join(resposta.streaming_content)
+        valores = self.amostras()
+        self.assertEqual(valores['ponto_http_resposta_bytes_sum{rota="main:historico-ponto-exportar"}'], len(corpo))
+        self.assertGreater(valores['ponto_http_consultas_sum{rota="main:historico-ponto-exportar"}'], 0)
+
+    def test_soma_arquivos_de_todos_os_workers(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        # Outro worker, com uma requisição à mesma rota e outra a uma rota diferente
+        with open(os.path.join(diretorio, 'metricas_1_1.json'), 'w') as arquivo:
+            json.dump([
+                ['ponto_http_requisicoes_total', ['main:inicio', 'GET', '200'], 3],
+                ['ponto_http_requisicoes_total', ['main:login_api', 'POST', '401'], 1],
+            ], arquivo)
+
+        with override_settings(PONTO_METRICAS_DIR=diretorio, PONTO_METRICAS_TOKEN='segredo'):
+            self.client.get(reverse('main:inicio'))
+            self.assertEqual(self.client.get(reverse('main:metricas')).status_code, 403)
+            valores = self.amostras(HTTP_AUTHORIZATION='Bearer segredo')
+
+            self.assertEqual(valores['ponto_http_requisicoes_total{rota="main:inicio",metodo="GET",status="200"}'], 4)
+            self.assertEqual(valores['ponto_http_requisicoes_total{rota="main:login_api",metodo="POST",status="401"}'], 1)
+            self.assertEqual(len(os.listdir(diretorio)), 2)
+
+            metricas.limpar_diretorio_metricas(diretorio)
+            self.assertEqual(os.listdir(diretorio), [])
+
+
+class SeedPontoTests(PontoTestCase):
+    def test_gera_funcionarios_e_marcacoes_alternadas_com_derivados(self):
+        call_command('seed_ponto', funcionarios=3, registros=11, ate=date(2025, 10, 31), stdout=io.StringIO())
+
+        funcionarios = Funcionario.objects.filter(user__username__startswith='seed_')
+        self.assertEqual(funcionarios.count(), 3)
+        self.assertTrue(self.client.login(username='seed_000001', password='Senha@123'))
+        for funcionario in funcionarios:
+            tipos = list(RegistroPonto.objects.filter(funcionario=funcionario).order_by('timestamp')
+                         .values_list('tipo', flat=True))
+            self.assertEqual(tipos, ['E', 'S'] * 5 + ['E'])
+            # bulk_create não passa pelos signals: o estado foi reconstruído pelo comando
+            self.assertEqual(funcionario.estado_ponto.proximo_tipo, 'S')
+
+        jornadas = JornadaDiaria.objects.filter(funcionario__in=funcionarios)
+        self.assertEqual(sum(jornadas.values_list('quantidade_registros', flat=True)), 33)
+        self.assertTrue(BancoHoras.objects.filter(funcionario__in=funcionarios).exists())
+
+        with self.assertRaises(CommandError):
+            call_command('seed_ponto', funcionarios=1, stdout=io.StringIO())
+
+
+class ArquivoRegistrosTests(PontoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'arquivo{i}', password='Senha@123') for i in range(2)]
+        funcionarios = [Funcionario.objects.create(user=user) for user in cls.users]
+        manaus = pytz.timezone('America/Manaus')
+        # Agosto e setembro de 2025 (meses fechados); o segundo funcionário para de bater ponto em setembro
+        for dia in (29, 32, 33):
+            for funcionario in funcionarios:
+                for hora, tipo in ((8, 'E'), (12, 'S'), (13, 'E'), (17, 'S')):
+                    RegistroPonto.objects.create(funcionario=funcionario, tipo=tipo, timestamp=manaus.localize(
+                        datetime(2025, 8, 1, hora) + timedelta(days=dia - 1)))
+        RegistroPonto.objects.create(funcionario=funcionarios[0], tipo='E', timestamp=timezone.now())
+
+    def historico(self, **filtros):
+        ids = []
+        url = reverse('main:historico-ponto-api') + '?' + '&'.join(
+            f'{chave}={valor}' for chave, valor in {'page_size': 5, **filtros}.items())
+        while url:
+            pagina = self.client.get(url).json()
+            ids.extend(registro['id'] for registro in pagina['results'])
+            url = pagina['next']
+        return ids
+
+    def consultas(self):
+        setembro = {'data_inicio': '2025-09-01', 'data_fim': '2025-09-30'}
+        return {
+            'historico': self.historico(),
+            'historico_setembro': self.historico(funcionario_id=self.users[1].pk, **setembro),
+            'completo': self.client.get(reverse('main:historico-ponto-api'), {'completo': 1, **setembro}).json(),
+            'exportacao': b''.join(self.client.get(reverse('main:historico-ponto-exportar')).streaming_content),
+            'horas': horas_por_dia(date(2025, 8, 1), date(2025, 9, 30)),
+            'folha': folha_numpy.fechar_periodo(date(2025, 8, 1), date(2025, 9, 30))
+            if folha_numpy.numpy_disponivel() else None,
+        }
+
+    def jornadas(self):
+        return list(JornadaDiaria.objects.order_by('funcionario_id', 'data').values_list(
+            'funcionario_id', 'data', 'minutos_trabalhados', 'saldo_minutos', 'quantidade_registros', 'horarios'))
+
+    def test_meses_fechados_saem_da_tabela_quente_e_consultas_nao_mudam(self):
+        antes, jornadas = self.consultas(), self.jornadas()
+
+        call_command('arquivar_registros', meses_quentes=0, lote=4, stdout=io.StringIO())
+
+        # Fica na quente: o mês atual e o dia do último ponto do segundo funcionário (EstadoPonto aponta para ele)
+        quentes = RegistroPonto.objects.all()
+        self.assertEqual(quentes.count(), 5)
+        self.assertEqual({dia_local(timestamp) for timestamp in quentes.filter(
+            funcionario__user=self.users[1]).values_list('timestamp', flat=True)}, {date(2025, 9, 2)})
+        self.assertEqual(RegistroPontoArquivado.objects.count(), 20)
+        self.assertFalse(MesArquivado.objects.filter(concluido_em__isnull=True).exists())
+
+        self.assertEqual(self.consultas(), antes)
+        reconstruir_jornadas()
+        self.assertEqual(self.jornadas(), jornadas)
+
+        # Período do mês atual: nem consulta os meses arquivados
+        with self.assertNumQueries(0):
+            self.assertFalse(precisa_arquivo(timezone.localdate()))
+        self.assertTrue(precisa_arquivo(date(2025, 9, 1)))
+
+    def test_retoma_de_onde_parou(self):
+        antes = self.consultas()['historico']
+
+        call_command('arquivar_registros', meses_quentes=0, lote=3, max_lotes=1, stdout=io.StringIO())
+        self.assertEqual(RegistroPontoArquivado.objects.count(), 3)
+        self.assertEqual(MesArquivado.objects.get().concluido_em, None)
+        # No meio do arquivamento o histórico já junta as duas tabelas
+        self.assertEqual(self.historico(), antes)
+
+        call_command('arquivar_registros', meses_quentes=0, lote=3, stdout=io.StringIO())
+        self.assertEqual(RegistroPontoArquivado.objects.count(), 20)
+        self.assertEqual(self.historico(), antes)
+
+    def test_admin_recusa_registro_em_dia_arquivado(self):
+        call_command('arquivar_registros', meses_quentes=0, stdout=io.StringIO())
+        self.client.force_login(User.objects.create_superuser('admin_arquivo', password='Senha@123'))
+        funcionario = Funcionario.objects.get(user=self.users[0])
+
+        def incluir(data):
+            return self.client.post(reverse('admin:main_registroponto_add'), {
+                'funcionario': funcionario.pk, 'tipo': 'S', 'timestamp_0': data, 'timestamp_1': '18:00:00'})
+
+        # 29/08 está no arquivo: o dia ficaria dividido entre as tabelas
+        resposta = incluir('2025-08-29')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('timestamp', resposta.context['adminform'].form.errors)
+        self.assertEqual(RegistroPonto.objects.filter(funcionario=funcionario).count(), 1)
+
+        # Dia sem registros arquivados do funcionário (mês arquivado): pode
+        self.assertEqual(incluir('2025-08-30').status_code, 302)
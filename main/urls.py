@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
-from .views import main, registro, login_api, registro_ponto_api, logout_api, historico, HistoricoPontoAPIView, ultimo_ponto_api  # 🟢 Adicione a nova view
+from .views import main, registro, login_api, registro_ponto_api, logout_api, historico, HistoricoPontoAPIView, ultimo_ponto_api, registro_ponto_lote_api, exportar_historico_api, resumo_jornadas_api, banco_horas_api, relatorios_api, relatorio_status_api, relatorio_download_api, metricas  # 🟢 Adicione a nova view
+
+# 🆕 Perfil ASGI: APIs do kiosk em versão assíncrona
+if getattr(settings, 'PONTO_ASYNC_VIEWS', False):
+    from .views_async import login_api, registro_ponto_api, ultimo_ponto_api
 
 app_name = 'main'
 
@@ -10,6 +15,14 @@ urlpatterns =[
     path('api/login/', login_api, name='login_api'),
     path('api/ultimo-ponto/', ultimo_ponto_api, name='ultimo_ponto_api'),  # 🟢 Nova URL
     path('api/registro-ponto/', registro_ponto_api, name='registro_ponto_api'),
+    path('api/registro-ponto/lote/', registro_ponto_lote_api, name='registro_ponto_lote_api'),
     path('api/logout/', logout_api, name='logout_api'),
     path("api/historico-ponto/", HistoricoPontoAPIView.as_view(), name="historico-ponto-api"),
+    path("api/historico-ponto/exportar/", exportar_historico_api, name="historico-ponto-exportar"),
+    path("api/historico-ponto/resumo/", resumo_jornadas_api, name="historico-ponto-resumo"),
+    path('api/banco-horas/', banco_horas_api, name='banco_horas_api'),
+    path('api/relatorios/', relatorios_api, name='relatorios_api'),
+    path('api/relatorios/<int:tarefa_id>/', relatorio_status_api, name='relatorio_status_api'),
+    path('api/relatorios/<int:tarefa_id>/download/', relatorio_download_api, name='relatorio_download_api'),
+    path('metrics', metricas, name='metricas'),  # Prometheus
 ]
\ No newline at end of file
@@ -1,18 +1,39 @@
 # views.py - ATUALIZADO COM CONVERSÃO UTC-4
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 import json
-from django.http import JsonResponse
+import logging
+import os
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import parse_etags
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login, logout
 from rest_framework.response import Response
-
-from .models import Funcionario, RegistroPonto
+from django.conf import settings
+
+from .cache_funcionarios import (invalidar_funcionario, obter_funcionario_por_user, obter_funcionarios,
+                                 obter_funcionarios_por_user)
+from .cache_local import CacheLRU
+from .cache_ultimo_ponto import obter_ultimo_ponto
+from .arquivo_ponto import registros_periodo
+from .banco_horas import saldo_atual_subquery
+from .models import BancoHoras, Funcionario, JornadaDiaria, RegistroPonto, TarefaRelatorio
+from .estado_ponto import obter_estado_ponto, bloquear_estado_ponto
+from .fila_relatorios import enfileirar_relatorio
+from .fuso import horario_local, interpretar_iso, para_local
+from .metricas import coletar_metricas, exportar_prometheus
+from .lote_ponto import ItemLote, processar_lote, validar_itens
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework import generics
-from .serializers import PontoHistoricoSerializer
-from django.db.models import Q
+from .exportacao import exportar_csv, exportar_ndjson
+from .paginacao import KeysetPagination
+from .serializers import CAMPOS_HISTORICO, PontoHistoricoRapidoSerializer
+from .utils import formatar_minutos, formatar_saldo, periodo_mes_atual
+from django.db.models import Count, Sum
 from datetime import datetime, timedelta
-import pytz  # 🆕 IMPORT ADICIONADO
+
+logger = logging.getLogger(__name__)
 
 
 # Create your views here.
@@ -44,10 +65,7 @@ def login_api(request):
         if user is not None:
             login(request, user)
 
-            try:
-                funcionario = Funcionario.objects.get(user=user)
-            except Funcionario.DoesNotExist:
-                funcionario = None
+            funcionario = obter_funcionario_por_user(user.pk)
 
             return JsonResponse({
                 'usuario': user.username,
@@ -61,22 +79,18 @@ def login_api(request):
     return JsonResponse({'detail': 'Método não permitido.'}, status=405)
 
 
-def converter_para_manaus(timestamp_utc):
+def resposta_ultimo_ponto(request, conteudo, etag):
     """
-    Converte timestamp UTC para UTC-4 (Manaus)
+    JSON do último ponto com ETag; If-None-Match igual devolve 304 sem corpo.
+    no-cache: o navegador guarda a resposta, mas revalida a cada chamada do kiosk.
     """
-    try:
-        utc_tz = pytz.UTC
-        manaus_tz = pytz.timezone('America/Manaus')
-
-        if timezone.is_aware(timestamp_utc):
-            return timestamp_utc.astimezone(manaus_tz)
-        else:
-            timestamp_utc = utc_tz.localize(timestamp_utc)
-            return timestamp_utc.astimezone(manaus_tz)
-    except Exception as e:
-        print(f"Erro na conversão de timezone: {e}")
-        return timestamp_utc
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(conteudo, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @csrf_exempt
@@ -91,43 +105,134 @@ def ultimo_ponto_api(request):
             if not funcionario_id:
                 return JsonResponse({'detail': 'ID do funcionário não fornecido.'}, status=400)
 
+            funcionario = obter_funcionario_por_user(funcionario_id)
+            if funcionario is None:
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+            # 🆕 Resposta em cache por funcionário (regravada a cada ponto); no cache frio,
+            # o estado atual vem por chave primária, sem varrer o histórico
             try:
-                funcionario = Funcionario.objects.get(user__pk=funcionario_id)
+                conteudo, etag = obter_ultimo_ponto(funcionario.id, obter_estado_ponto)
             except Funcionario.DoesNotExist:
+                # Excluído por outro worker: o cache deste ainda tinha o funcionário
+                invalidar_funcionario(funcionario.id, funcionario.user_id)
                 return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
 
-            # Buscar o último registro de ponto do funcionário
-            ultimo_registro = RegistroPonto.objects.filter(
-                funcionario=funcionario
-            ).order_by('-timestamp').first()
+            return resposta_ultimo_ponto(request, conteudo, etag)
+
+        except Exception:
+            logger.exception("Erro ao buscar último ponto")
+            return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
+
+    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
+
+# Chaves de idempotência recentes: (funcionario_id, chave) -> (status, payload)
+respostas_idempotentes = CacheLRU(
+    max_itens=getattr(settings, 'PONTO_IDEMPOTENCIA_MAX_CHAVES', 10000),
+    ttl=getattr(settings, 'PONTO_IDEMPOTENCIA_TTL_SEGUNDOS', 600)
+)
+
+
+def chave_idempotencia_da_requisicao(request, data):
+    """
+    Chave de idempotência do header Idempotency-Key ou do campo idempotency_key do corpo
+    """
+    chave = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    if not chave:
+        return None
+    return str(data.get('funcionario_id')), str(chave)
+
+
+def montar_resposta_registro(registro_id, tipo, timestamp, fonte, detail='Ponto registrado com sucesso.'):
+    """
+    Monta o payload de resposta de um ponto registrado
+    """
+    proximo_tipo = 'S' if tipo == 'E' else 'E'
+
+    # 🆕 CONVERTE PARA MANAUS ANTES DE FORMATAR
+    horario = horario_local(timestamp)
+
+    return {
+        'detail': detail,
+        'tipo_registrado': 'Saída' if tipo == 'S' else 'Entrada',
+        'tipo_registrado_codigo': tipo,
+        'proximo_tipo': proximo_tipo,
+        'proximo_tipo_display': 'Saída' if proximo_tipo == 'S' else 'Entrada',
+        'timestamp_formatado': horario.hora_segundos,  # 🆕 UTC-4
+        'data_formatada': horario.data_formatada,  # 🆕 UTC-4
+        'registro_id': registro_id,
+        'fonte_timestamp': fonte
+    }
+
+
+def interpretar_timestamp_frontend(timestamp_frontend):
+    """
+    Interpreta o timestamp enviado pelo frontend; retorna (timestamp_final, fonte)
+    """
+    # CORREÇÃO DO FUSO HORÁRIO: mesmo parser do lote (main/fuso.py)
+    if timestamp_frontend:
+        try:
+            timestamp_final = interpretar_iso(timestamp_frontend)
+            fonte = 'frontend'
+            logger.debug("Timestamp convertido: %r -> Manaus %s", timestamp_frontend, timestamp_final)
+
+        except ValueError:
+            logger.warning("Erro ao converter timestamp frontend: %r", timestamp_frontend, exc_info=True)
+            timestamp_final = timezone.now()
+            fonte = 'servidor (fallback)'
+    else:
+        timestamp_final = timezone.now()
+        fonte = 'servidor'
 
-            # Determinar o próximo tipo
-            if ultimo_registro:
-                proximo_tipo = 'S' if ultimo_registro.tipo == 'E' else 'E'
-                ultimo_tipo = ultimo_registro.tipo
+    return timestamp_final, fonte
 
-                # 🆕 CONVERTER PARA UTC-4 (Manaus)
-                timestamp_manaus = converter_para_manaus(ultimo_registro.timestamp)
-                ultimo_timestamp = timestamp_manaus.strftime('%d/%m/%Y %H:%M')
 
+def registrar_ponto(funcionario_id, timestamp_final, fonte):
+    """
+    Registra o ponto do funcionário (tipo automático); retorna (status, payload).
+    Funcionario.DoesNotExist se o funcionário foi excluído (id vindo de cache desatualizado)
+    """
+    janela_duplicidade = timedelta(
+        seconds=getattr(settings, 'PONTO_JANELA_DUPLICIDADE_SEGUNDOS', 60)
+    )
+
+    # Lógica do tipo automático + criação do registro na mesma transação.
+    # O lock na linha de estado serializa pontos simultâneos do mesmo funcionário;
+    # o estado é atualizado pelo signal post_save de RegistroPonto.
+    try:
+        with transaction.atomic():
+            estado = bloquear_estado_ponto(funcionario_id)
+
+            # 🆕 TOQUE DUPLO: ponto dentro da janela devolve o registro anterior
+            if (janela_duplicidade and estado.ultimo_registro_id
+                    and abs(timestamp_final - estado.ultimo_timestamp) < janela_duplicidade):
+                status = 200
+                payload = montar_resposta_registro(
+                    estado.ultimo_registro_id,
+                    estado.ultimo_tipo,
+                    estado.ultimo_timestamp,
+                    fonte,
+                    detail='Ponto já registrado há instantes.'
+                )
             else:
-                proximo_tipo = 'E'
-                ultimo_tipo = None
-                ultimo_timestamp = None
+                tipo = estado.proximo_tipo
 
-            return JsonResponse({
-                'proximo_tipo': proximo_tipo,
-                'proximo_tipo_display': 'Saída' if proximo_tipo == 'S' else 'Entrada',
-                'ultimo_tipo': ultimo_tipo,
-                'ultimo_timestamp': ultimo_timestamp,
-                'cor_botao': 'vermelho' if proximo_tipo == 'S' else 'verde'
-            })
+                registro = RegistroPonto.objects.create(
+                    funcionario_id=funcionario_id,
+                    tipo=tipo,
+                    timestamp=timestamp_final
+                )
 
-        except Exception as e:
-            print(f"Erro ao buscar último ponto: {e}")
-            return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
+                status = 201
+                payload = montar_resposta_registro(registro.pk, tipo, registro.timestamp, fonte)
+    except IntegrityError:
+        # FK violada no commit: o funcionário foi excluído no meio do registro
+        if Funcionario.objects.filter(pk=funcionario_id).exists():
+            raise
+        raise Funcionario.DoesNotExist
 
-    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+    return status, payload
 
 
 @csrf_exempt
@@ -138,72 +243,101 @@ def registro_ponto_api(request):
             funcionario_id = data.get('funcionario_id')
             timestamp_frontend = data.get('timestamp')
 
+            # 🆕 IDEMPOTÊNCIA: reenvio com a mesma chave devolve a resposta original sem ir ao banco
+            chave_idempotencia = chave_idempotencia_da_requisicao(request, data)
+            if chave_idempotencia:
+                resposta_anterior = respostas_idempotentes.get(chave_idempotencia)
+                if resposta_anterior is not None:
+                    status, payload = resposta_anterior
+                    return JsonResponse(payload, status=status)
+
+            funcionario = obter_funcionario_por_user(funcionario_id)
+            if funcionario is None:
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+            timestamp_final, fonte = interpretar_timestamp_frontend(timestamp_frontend)
+
             try:
-                funcionario = Funcionario.objects.get(user__pk=funcionario_id)
+                status, payload = registrar_ponto(funcionario.id, timestamp_final, fonte)
             except Funcionario.DoesNotExist:
+                # Excluído por outro worker: o cache deste ainda tinha o funcionário
+                invalidar_funcionario(funcionario.id, funcionario.user_id)
                 return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
 
-            # Lógica do tipo automático
-            ultimo_registro = RegistroPonto.objects.filter(
-                funcionario=funcionario
-            ).order_by('-timestamp').first()
+            if chave_idempotencia:
+                respostas_idempotentes.set(chave_idempotencia, (status, payload))
 
-            if ultimo_registro:
-                tipo = 'S' if ultimo_registro.tipo == 'E' else 'E'
-            else:
-                tipo = 'E'
-
-            # CORREÇÃO DO FUSO HORÁRIO
-            if timestamp_frontend:
-                try:
-                    # Converte o ISO string para datetime (em UTC)
-                    timestamp_str = timestamp_frontend.replace('Z', '+00:00')
-                    user_timestamp_utc = datetime.fromisoformat(timestamp_str)
-
-                    # CONVERTE PARA O FUSO HORÁRIO LOCAL (Manaus)
-                    timezone_local = pytz.timezone('America/Manaus')
-                    user_timestamp_local = user_timestamp_utc.astimezone(timezone_local)
-
-                    timestamp_final = user_timestamp_local
-                    fonte = 'frontend'
-                    print(f"✅ Timestamp convertido: UTC {user_timestamp_utc} -> Manaus {user_timestamp_local}")
-
-                except Exception as e:
-                    print(f"Erro ao converter timestamp frontend: {e}")
-                    timestamp_final = timezone.now()
-                    fonte = 'servidor (fallback)'
-            else:
-                timestamp_final = timezone.now()
-                fonte = 'servidor'
+            return JsonResponse(payload, status=status)
 
-            # Cria o registro
-            registro = RegistroPonto.objects.create(
-                funcionario=funcionario,
-                tipo=tipo,
-                timestamp=timestamp_final
-            )
+        except Exception:
+            logger.exception("Erro ao salvar ponto")
+            return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
 
-            proximo_tipo = 'S' if tipo == 'E' else 'E'
 
-            # 🆕 CONVERTE PARA MANAUS ANTES DE FORMATAR
-            timestamp_manaus = converter_para_manaus(registro.timestamp)
+@csrf_exempt
+def registro_ponto_lote_api(request):
+    """
+    Recebe vários pontos de uma vez (kiosk que ficou offline) e devolve um resultado por item
+    """
+    if request.method == 'POST':
+        try:
+            try:
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({'detail': 'Dados JSON inválidos.'}, status=400)
+
+            dados_itens = data.get('registros') if isinstance(data, dict) else data
+            if not isinstance(dados_itens, list) or not dados_itens:
+                return JsonResponse({'detail': 'Envie uma lista de registros.'}, status=400)
+
+            max_itens = getattr(settings, 'PONTO_LOTE_MAX_ITENS', 1000)
+            if len(dados_itens) > max_itens:
+                return JsonResponse({'detail': f'Máximo de {max_itens} registros por lote.'}, status=400)
+
+            itens = [ItemLote(indice, dados) for indice, dados in enumerate(dados_itens)]
+            validos = validar_itens(itens)
+
+            # Itens já processados (mesma chave de idempotência) não voltam ao banco
+            pendentes = []
+            for item in validos:
+                resposta_anterior = None
+                if item.chave_idempotencia:
+                    resposta_anterior = respostas_idempotentes.get(item.chave_idempotencia)
+                if resposta_anterior is not None:
+                    item.status, item.payload = resposta_anterior
+                else:
+                    pendentes.append(item)
+
+            processar_lote(pendentes)
+
+            resultados = []
+            for item in itens:
+                if item.payload is None and item.registro is not None:
+                    registro, tipo, timestamp = item.registro
+                    registro_id = registro.pk if isinstance(registro, RegistroPonto) else registro
+                    item.payload = montar_resposta_registro(
+                        registro_id, tipo, timestamp, 'frontend', detail=item.detail
+                    )
+                    if item.chave_idempotencia:
+                        respostas_idempotentes.set(item.chave_idempotencia, (item.status, item.payload))
+
+                resultado = {'indice': item.indice, 'status': item.status}
+                resultado.update(item.payload or {'detail': item.detail})
+                resultados.append(resultado)
 
             return JsonResponse({
-                'detail': 'Ponto registrado com sucesso.',
-                'tipo_registrado': registro.get_tipo_display(),
-                'tipo_registrado_codigo': tipo,
-                'proximo_tipo': proximo_tipo,
-                'proximo_tipo_display': 'Saída' if proximo_tipo == 'S' else 'Entrada',
-                'timestamp_formatado': timestamp_manaus.strftime('%H:%M:%S'),  # 🆕 UTC-4
-                'data_formatada': timestamp_manaus.strftime('%d/%m/%Y'),  # 🆕 UTC-4
-                'registro_id': registro.pk,
-                'fonte_timestamp': fonte
-            }, status=201)
-
-        except Exception as e:
-            print(f"Erro ao salvar ponto: {e}")
+                'detail': 'Lote processado.',
+                'total': len(itens),
+                'registrados': sum(1 for item in itens if item.status == 201),
+                'resultados': resultados,
+            })
+
+        except Exception:
+            logger.exception("Erro ao processar lote de pontos")
             return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
 
+    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
 
 @csrf_exempt
 def logout_api(request):
@@ -214,54 +348,293 @@ def logout_api(request):
     return JsonResponse({'detail': 'Desconectado com sucesso.'})
 
 
+def interpretar_data(valor):
+    """
+    'AAAA-MM-DD' -> date; vazio ou inválido -> None (filtro ignorado)
+    """
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def filtrar_historico(params):
+    """
+    Aplica os filtros do histórico (funcionario_id, data_inicio, data_fim, tipo)
+    """
+    funcionario_id = params.get('funcionario_id')
+    data_inicio_str = params.get('data_inicio')
+    data_fim_str = params.get('data_fim')
+    tipo = params.get('tipo')
+
+    # Intervalo semiaberto em timestamp (usa o índice, ao contrário de timestamp__date).
+    # 🆕 Períodos que chegam aos meses arquivados incluem RegistroPontoArquivado (UNION ALL)
+    queryset = registros_periodo(interpretar_data(data_inicio_str), interpretar_data(data_fim_str))
+
+    # Filtro por funcionário
+    if funcionario_id:
+        try:
+            queryset = queryset.filter(funcionario__user__id=funcionario_id)
+        except ValueError:
+            pass
+
+    # Filtro por tipo
+    if tipo:
+        tipo_map = {'entrada': 'E', 'saida': 'S'}
+        tipo_db = tipo_map.get(tipo.lower())
+        if tipo_db:
+            queryset = queryset.filter(tipo=tipo_db)
+
+    # Ordenar por data/hora (mais recente primeiro; id desempata para o cursor)
+    queryset = queryset.order_by('-timestamp', '-id')
+
+    return queryset
+
+
 class HistoricoPontoAPIView(generics.ListAPIView):
-    serializer_class = PontoHistoricoSerializer
+    # 🆕 Linhas planas (values) + serializer rápido; mesmo JSON de PontoHistoricoSerializer
+    serializer_class = PontoHistoricoRapidoSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        queryset = RegistroPonto.objects.all()
+        return filtrar_historico(self.request.query_params).values(*CAMPOS_HISTORICO)
 
-        funcionario_id = self.request.query_params.get('funcionario_id')
-        data_inicio_str = self.request.query_params.get('data_inicio')
-        data_fim_str = self.request.query_params.get('data_fim')
-        tipo = self.request.query_params.get('tipo')
+    def modo_completo(self):
+        return self.request.query_params.get('completo') in ('1', 'true', 'sim')
 
-        # Filtro por funcionário
-        if funcionario_id:
-            try:
-                queryset = queryset.filter(funcionario__user__id=funcionario_id)
-            except ValueError:
-                pass
+    def list(self, request, *args, **kwargs):
+        if not self.modo_completo():
+            # Padrão: páginas por cursor em (timestamp, id)
+            return super().list(request, *args, **kwargs)
 
-        # Filtro por data início
-        if data_inicio_str:
-            try:
-                data_inicio = datetime.strptime(data_inicio_str, '%Y-%m-%d').date()
-                queryset = queryset.filter(timestamp__date__gte=data_inicio)
-            except ValueError:
-                pass
+        # 🆕 MODO LEGADO (?completo=1): lista simples, limitada a PONTO_HISTORICO_MAX_LINHAS_COMPLETO
+        limite = getattr(settings, 'PONTO_HISTORICO_MAX_LINHAS_COMPLETO', 5000)
+        registros = list(self.get_queryset()[:limite + 1])
+        truncado = len(registros) > limite
 
-        # Filtro por data fim
-        if data_fim_str:
-            try:
-                data_fim = datetime.strptime(data_fim_str, '%Y-%m-%d').date()
-                queryset = queryset.filter(timestamp__date__lte=data_fim)
-            except ValueError:
-                pass
+        serializer = self.get_serializer(registros[:limite], many=True)
+        response = Response(serializer.data)
+        response['X-Resultado-Truncado'] = 'true' if truncado else 'false'
+        return response
 
-        # Filtro por tipo
-        if tipo:
-            tipo_map = {'entrada': 'E', 'saida': 'S'}
-            tipo_db = tipo_map.get(tipo.lower())
-            if tipo_db:
-                queryset = queryset.filter(tipo=tipo_db)
 
-        # Ordenar por data/hora (mais recente primeiro)
-        queryset = queryset.order_by('-timestamp')
+def exportar_historico_api(request):
+    """
+    Exporta o histórico filtrado em streaming (NDJSON ou CSV), sem montar tudo em memória
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Método não permitido.'}, status=405)
 
-        return queryset
+    formato = request.GET.get('formato', 'ndjson').lower()
+    if formato not in ('ndjson', 'csv'):
+        return JsonResponse({'detail': 'Formato inválido. Use ndjson ou csv.'}, status=400)
 
-    def paginate_queryset(self, queryset):
-        return None
+    # Mesmos filtros da API de histórico; ordem cronológica para a folha de pagamento
+    queryset = filtrar_historico(request.GET).order_by('timestamp', 'id')
+
+    if formato == 'csv':
+        response = StreamingHttpResponse(exportar_csv(queryset), content_type='text/csv; charset=utf-8')
+    else:
+        response = StreamingHttpResponse(exportar_ndjson(queryset), content_type='application/x-ndjson')
+
+    nome_arquivo = f"historico_ponto_{timezone.localdate().strftime('%Y_%m_%d')}.{formato}"
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return response
+
+
+def resumo_jornadas_api(request):
+    """
+    Resumo diário do histórico (horas trabalhadas, saldo, observação), lido de JornadaDiaria.
+    Filtros: funcionario_id (id do usuário), data_inicio, data_fim.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
+    jornadas = JornadaDiaria.objects.all()
+    funcionario_id = request.GET.get('funcionario_id')
+    if funcionario_id:
+        try:
+            jornadas = jornadas.filter(funcionario__user__id=int(funcionario_id))
+        except ValueError:
+            return JsonResponse({'detail': 'funcionario_id inválido.'}, status=400)
+
+    data_inicio = interpretar_data(request.GET.get('data_inicio'))
+    data_fim = interpretar_data(request.GET.get('data_fim'))
+    if data_inicio:
+        jornadas = jornadas.filter(data__gte=data_inicio)
+    if data_fim:
+        jornadas = jornadas.filter(data__lte=data_fim)
+
+    totais = jornadas.aggregate(
+        dias=Count('id'),
+        minutos_trabalhados=Sum('minutos_trabalhados', default=0),
+        saldo_minutos=Sum('saldo_minutos', default=0),
+        quantidade_registros=Sum('quantidade_registros', default=0),
+    )
+
+    limite = getattr(settings, 'PONTO_HISTORICO_MAX_LINHAS_COMPLETO', 5000)
+    linhas = list(jornadas.order_by('-data', 'funcionario_id')[:limite])
+    funcionarios = obter_funcionarios(jornada.funcionario_id for jornada in linhas)
+
+    dias = []
+    for jornada in linhas:
+        funcionario = funcionarios.get(jornada.funcionario_id)
+        dias.append({
+            'funcionarioId': funcionario.user_id if funcionario else None,
+            'funcionarioNome': funcionario.nome_completo if funcionario else None,
+            'data': jornada.data.isoformat(),
+            'horarios': jornada.horarios,
+            'primeira_entrada': para_local(jornada.primeira_entrada).isoformat()
+            if jornada.primeira_entrada else None,
+            'ultima_saida': para_local(jornada.ultima_saida).isoformat()
+            if jornada.ultima_saida else None,
+            'minutos_trabalhados': jornada.minutos_trabalhados,
+            'total_horas': formatar_minutos(jornada.minutos_trabalhados),
+            'saldo_minutos': jornada.saldo_minutos,
+            'saldo': formatar_saldo(jornada.saldo_minutos),
+            'quantidade_registros': jornada.quantidade_registros,
+            'observacao_codigo': jornada.observacao,
+            'observacao': jornada.get_observacao_display(),
+        })
+
+    totais['total_horas'] = formatar_minutos(totais['minutos_trabalhados'])
+    totais['saldo'] = formatar_saldo(totais['saldo_minutos'])
+
+    response = JsonResponse({'dias': dias, 'totais': totais})
+    response['X-Resultado-Truncado'] = 'true' if totais['dias'] > limite else 'false'
+    return response
+
+
+def banco_horas_api(request):
+    """
+    Banco de horas (BancoHoras): com funcionario_id (id do usuário), os meses e o saldo acumulado;
+    sem ele, o saldo atual de cada funcionário. Uma consulta (mais o resumo do funcionário, em cache).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
+    user_id = request.GET.get('funcionario_id')
+    if not user_id:
+        funcionarios = Funcionario.objects.select_related('user').annotate(
+            saldo_banco_horas=saldo_atual_subquery()).order_by('user__first_name', 'user__last_name', 'id')
+        return JsonResponse({'funcionarios': [{
+            'funcionarioId': funcionario.user_id,
+            'funcionarioNome': funcionario.user.get_full_name(),
+            'saldo_minutos': funcionario.saldo_banco_horas,
+            'saldo': formatar_saldo(funcionario.saldo_banco_horas),
+        } for funcionario in funcionarios]})
+
+    funcionario = obter_funcionario_por_user(user_id)
+    if funcionario is None:
+        return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+    meses = [{
+        'mes': linha.mes.strftime('%Y-%m'),
+        'saldo_mes_minutos': linha.saldo_mes_minutos,
+        'saldo_mes': formatar_saldo(linha.saldo_mes_minutos),
+        'saldo_acumulado_minutos': linha.saldo_acumulado_minutos,
+        'saldo_acumulado': formatar_saldo(linha.saldo_acumulado_minutos),
+    } for linha in BancoHoras.objects.filter(funcionario_id=funcionario.id).order_by('mes')]
+    saldo = meses[-1]['saldo_acumulado_minutos'] if meses else 0
+
+    return JsonResponse({
+        'funcionarioId': funcionario.user_id,
+        'funcionarioNome': funcionario.nome_completo,
+        'saldo_minutos': saldo,
+        'saldo': formatar_saldo(saldo),
+        'meses': meses,
+    })
+
+
+def montar_resposta_tarefa(tarefa):
+    return {
+        'id': tarefa.pk,
+        'status': tarefa.status,
+        'status_display': tarefa.get_status_display(),
+        'concluidos': tarefa.concluidos,
+        'total': tarefa.total,
+        'erro': tarefa.erro or None,
+        'criada_em': tarefa.criada_em.isoformat(),
+        'finalizada_em': tarefa.finalizada_em.isoformat() if tarefa.finalizada_em else None,
+        'status_url': reverse('main:relatorio_status_api', args=[tarefa.pk]),
+        'download_url': reverse('main:relatorio_download_api', args=[tarefa.pk])
+        if tarefa.status == TarefaRelatorio.CONCLUIDA else None,
+    }
+
+
+def relatorios_api(request):
+    """
+    Enfileira a geração de relatórios (processada por manage.py processar_relatorios).
+    Corpo: {"funcionario_ids": [ids de usuário], "data_inicio": "AAAA-MM-DD", "data_fim": "AAAA-MM-DD"};
+    sem datas, usa o mês atual. Responde 202 com a URL para acompanhar a tarefa.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+    if not request.user.is_staff:
+        return JsonResponse({'detail': 'Acesso restrito à administração.'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+        user_ids = [int(user_id) for user_id in data.get('funcionario_ids', [])]
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return JsonResponse({'detail': 'Dados JSON inválidos.'}, status=400)
+
+    if not user_ids:
+        return JsonResponse({'detail': 'Informe ao menos um funcionario_id.'}, status=400)
+
+    data_inicio, data_fim = periodo_mes_atual()
+    data_inicio = interpretar_data(data.get('data_inicio')) or data_inicio
+    data_fim = interpretar_data(data.get('data_fim')) or data_fim
+    if data_fim < data_inicio:
+        return JsonResponse({'detail': 'data_fim anterior a data_inicio.'}, status=400)
+
+    funcionarios = obter_funcionarios_por_user(user_ids)
+    nao_encontrados = [user_id for user_id in user_ids if user_id not in funcionarios]
+    if nao_encontrados:
+        return JsonResponse({'detail': 'Funcionário não encontrado.', 'funcionario_ids': nao_encontrados}, status=404)
+
+    tarefa = enfileirar_relatorio(
+        [funcionario.id for funcionario in funcionarios.values()], data_inicio, data_fim, solicitado_por=request.user
+    )
+    return JsonResponse(montar_resposta_tarefa(tarefa), status=202)
+
+
+def relatorio_status_api(request, tarefa_id):
+    if not request.user.is_staff:
+        return JsonResponse({'detail': 'Acesso restrito à administração.'}, status=403)
+
+    tarefa = get_object_or_404(TarefaRelatorio, pk=tarefa_id)
+    return JsonResponse(montar_resposta_tarefa(tarefa))
+
+
+def relatorio_download_api(request, tarefa_id):
+    if not request.user.is_staff:
+        return JsonResponse({'detail': 'Acesso restrito à administração.'}, status=403)
+
+    tarefa = get_object_or_404(TarefaRelatorio, pk=tarefa_id)
+    if tarefa.status != TarefaRelatorio.CONCLUIDA:
+        return JsonResponse({'detail': 'Relatório ainda não está pronto.', **montar_resposta_tarefa(tarefa)},
+                            status=409)
+
+    try:
+        arquivo = open(tarefa.arquivo, 'rb')
+    except FileNotFoundError:
+        return JsonResponse({'detail': 'Arquivo do relatório não encontrado.'}, status=410)
+
+    # Arquivos são gravados como "<id>_<nome>"; o download usa só o nome
+    nome = os.path.basename(tarefa.arquivo).split('_', 1)[1]
+    return FileResponse(arquivo, as_attachment=True, filename=nome)
+
+
+def metricas(request):
+    """
+    Métricas por rota no formato texto do Prometheus (somadas entre os workers com PONTO_METRICAS_DIR)
+    """
+    token = getattr(settings, 'PONTO_METRICAS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return JsonResponse({'detail': 'Token inválido.'}, status=403)
 
-    def get_paginated_response(self, data):
-        return Response(data)
\ No newline at end of file
+    return HttpResponse(exportar_prometheus(coletar_metricas()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,132 @@
+# views_async.py - VERSÕES ASSÍNCRONAS (ASGI) DAS APIs DO KIOSK
+# Mesmo contrato de main/views.py; usadas quando PONTO_ASYNC_VIEWS está ativo (perfil ASGI).
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .estado_ponto import criar_estado_ponto
+from .cache_funcionarios import aobter_funcionario_por_user, invalidar_funcionario
+from .cache_ultimo_ponto import aobter_ultimo_ponto
+from .models import EstadoPonto, Funcionario
+from .views import (
+    chave_idempotencia_da_requisicao,
+    interpretar_timestamp_frontend,
+    registrar_ponto,
+    respostas_idempotentes,
+    resposta_ultimo_ponto,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _acarregar_estado(funcionario_id):
+    estado = await EstadoPonto.objects.filter(pk=funcionario_id).afirst()
+    if estado is None:
+        # Primeira consulta do funcionário: constrói o estado pelo histórico
+        estado = await sync_to_async(criar_estado_ponto)(funcionario_id)
+    return estado
+
+
+@csrf_exempt
+async def login_api(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            username = data.get('usuario')
+            password = data.get('senha')
+        except json.JSONDecodeError:
+            return JsonResponse({'detail': 'Dados JSON inválidos.'}, status=400)
+
+        user = await aauthenticate(request, username=username, password=password)
+
+        if user is not None:
+            await alogin(request, user)
+
+            eh_funcionario = await aobter_funcionario_por_user(user.pk) is not None
+
+            return JsonResponse({
+                'usuario': user.username,
+                'nome': user.get_full_name() or user.username,
+                'id': user.pk,
+                'perfil_tipo': 'funcionario' if eh_funcionario else 'admin',
+            })
+        else:
+            return JsonResponse({'detail': 'Usuário ou senha incorretos.'}, status=401)
+
+    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
+
+@csrf_exempt
+async def ultimo_ponto_api(request):
+    """
+    Retorna o último registro de ponto do funcionário para determinar o próximo tipo
+    """
+    if request.method == 'GET':
+        try:
+            funcionario_id = request.GET.get('funcionario_id')
+
+            if not funcionario_id:
+                return JsonResponse({'detail': 'ID do funcionário não fornecido.'}, status=400)
+
+            funcionario = await aobter_funcionario_por_user(funcionario_id)
+            if funcionario is None:
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+            try:
+                conteudo, etag = await aobter_ultimo_ponto(funcionario.id, _acarregar_estado)
+            except Funcionario.DoesNotExist:
+                invalidar_funcionario(funcionario.id, funcionario.user_id)
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+            return resposta_ultimo_ponto(request, conteudo, etag)
+
+        except Exception:
+            logger.exception("Erro ao buscar último ponto")
+            return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
+
+    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
+
+
+@csrf_exempt
+async def registro_ponto_api(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            funcionario_id = data.get('funcionario_id')
+            timestamp_frontend = data.get('timestamp')
+
+            # 🆕 IDEMPOTÊNCIA: reenvio com a mesma chave devolve a resposta original sem ir ao banco
+            chave_idempotencia = chave_idempotencia_da_requisicao(request, data)
+            if chave_idempotencia:
+                resposta_anterior = respostas_idempotentes.get(chave_idempotencia)
+                if resposta_anterior is not None:
+                    status, payload = resposta_anterior
+                    return JsonResponse(payload, status=status)
+
+            funcionario = await aobter_funcionario_por_user(funcionario_id)
+            if funcionario is None:
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+            timestamp_final, fonte = interpretar_timestamp_frontend(timestamp_frontend)
+
+            # transaction.atomic() e select_for_update ainda não têm API assíncrona no Django:
+            # o trecho transacional (lock do estado + INSERT) roda numa thread
+            try:
+                status, payload = await sync_to_async(registrar_ponto)(funcionario.id, timestamp_final, fonte)
+            except Funcionario.DoesNotExist:
+                invalidar_funcionario(funcionario.id, funcionario.user_id)
+                return JsonResponse({'detail': 'Funcionário não encontrado.'}, status=404)
+
+            if chave_idempotencia:
+                respostas_idempotentes.set(chave_idempotencia, (status, payload))
+
+            return JsonResponse(payload, status=status)
+
+        except Exception:
+            logger.exception("Erro ao salvar ponto")
+            return JsonResponse({'detail': 'Erro interno do servidor.'}, status=500)
+
+    return JsonResponse({'detail': 'Método não permitido.'}, status=405)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ponto.settings')
+# Servindo via ASGI, as APIs do kiosk usam as views assíncronas (main/views_async.py)
+os.environ.setdefault('PONTO_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.metricas.MetricasMiddleware',  # primeiro: a latência medida inclui os demais middlewares
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +100,24 @@ if not all([os.environ.get('DB_NAME'), os.environ.get('DB_USER'), os.environ.get
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 
+# Cache (framework do Django): memória local do processo por padrão; PONTO_CACHE_BACKEND=arquivo
+# usa um diretório compartilhado pelos workers do mesmo servidor (padrão do perfil gunicorn_asgi.py)
+PONTO_CACHE_BACKEND = os.environ.get('PONTO_CACHE_BACKEND', 'memoria')
+if PONTO_CACHE_BACKEND == 'arquivo':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('PONTO_CACHE_DIR', BASE_DIR / 'cache_django'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ponto',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -145,6 +164,77 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 LOGOUT_REDIRECT_URL =  os.environ.get('LOGOUT_REDIRECT_URL', '/')
 
+# Registro de ponto (kiosk)
+# Reenvios com o mesmo Idempotency-Key dentro do TTL devolvem a resposta original
+PONTO_IDEMPOTENCIA_TTL_SEGUNDOS = int(os.environ.get('PONTO_IDEMPOTENCIA_TTL_SEGUNDOS', 600))
+PONTO_IDEMPOTENCIA_MAX_CHAVES = int(os.environ.get('PONTO_IDEMPOTENCIA_MAX_CHAVES', 10000))
+# Pontos do mesmo funcionário dentro desta janela são tratados como toque duplo (0 desativa)
+PONTO_JANELA_DUPLICIDADE_SEGUNDOS = int(os.environ.get('PONTO_JANELA_DUPLICIDADE_SEGUNDOS', 60))
+# Cache por processo user_id -> funcionário (invalidado por signals; TTL limita defasagem entre workers)
+PONTO_CACHE_FUNCIONARIOS_MAX = int(os.environ.get('PONTO_CACHE_FUNCIONARIOS_MAX', 5000))
+PONTO_CACHE_FUNCIONARIOS_TTL_SEGUNDOS = int(os.environ.get('PONTO_CACHE_FUNCIONARIOS_TTL_SEGUNDOS', 300))
+# Calendário de dias úteis por ano (feriados do admin), também por processo
+PONTO_CACHE_CALENDARIO_TTL_SEGUNDOS = int(os.environ.get('PONTO_CACHE_CALENDARIO_TTL_SEGUNDOS', 300))
+# Escalas de trabalho (main/escala.py), idem
+PONTO_CACHE_ESCALAS_TTL_SEGUNDOS = int(os.environ.get('PONTO_CACHE_ESCALAS_TTL_SEGUNDOS', 300))
+# Resposta de /api/ultimo-ponto/ por funcionário (main/cache_ultimo_ponto.py), regravada a cada ponto.
+# Só com cache compartilhado: na memória local, o ponto gravado por um worker não chegaria aos outros
+PONTO_CACHE_ULTIMO_PONTO = os.environ.get(
+    'PONTO_CACHE_ULTIMO_PONTO', str(PONTO_CACHE_BACKEND == 'arquivo')) == 'True'
+PONTO_CACHE_ULTIMO_PONTO_TTL_SEGUNDOS = int(os.environ.get('PONTO_CACHE_ULTIMO_PONTO_TTL_SEGUNDOS', 60))
+# APIs do kiosk assíncronas (ativado pelo perfil ASGI em ponto/asgi.py)
+PONTO_ASYNC_VIEWS = os.environ.get('PONTO_ASYNC_VIEWS', 'False') == 'True'
+# Limite de itens aceitos por /api/registro-ponto/lote/
+PONTO_LOTE_MAX_ITENS = int(os.environ.get('PONTO_LOTE_MAX_ITENS', 1000))
+
+# Histórico (/api/historico-ponto/): paginação por cursor e limite do modo legado ?completo=1
+PONTO_HISTORICO_PAGE_SIZE = int(os.environ.get('PONTO_HISTORICO_PAGE_SIZE', 50))
+PONTO_HISTORICO_MAX_PAGE_SIZE = int(os.environ.get('PONTO_HISTORICO_MAX_PAGE_SIZE', 500))
+PONTO_HISTORICO_MAX_LINHAS_COMPLETO = int(os.environ.get('PONTO_HISTORICO_MAX_LINHAS_COMPLETO', 5000))
+# Exportação em streaming (/api/historico-ponto/exportar/): linhas lidas do banco por bloco
+PONTO_EXPORTACAO_CHUNK_SIZE = int(os.environ.get('PONTO_EXPORTACAO_CHUNK_SIZE', 2000))
+# Relatórios PDF de vários funcionários (ação do admin): processos em paralelo (1 = sem pool)
+PONTO_RELATORIOS_WORKERS = int(os.environ.get('PONTO_RELATORIOS_WORKERS', os.cpu_count() or 1))
+# Fila de relatórios (manage.py processar_relatorios): onde os arquivos ficam e quanto tempo uma
+# tarefa "executando" pode ficar sem sinal do worker antes de ser considerada travada e voltar para a fila
+PONTO_RELATORIOS_DIR = os.environ.get('PONTO_RELATORIOS_DIR', BASE_DIR / 'relatorios')
+PONTO_FILA_TIMEOUT_SEGUNDOS = int(os.environ.get('PONTO_FILA_TIMEOUT_SEGUNDOS', 3600))
+# Cache em disco dos PDFs (chave = funcionário + período + impressão digital das jornadas), LRU por tamanho
+PONTO_CACHE_PDF_DIR = os.environ.get('PONTO_CACHE_PDF_DIR', BASE_DIR / 'cache_pdf')
+PONTO_CACHE_PDF_MAX_BYTES = int(os.environ.get('PONTO_CACHE_PDF_MAX_BYTES', 512 * 1024 * 1024))
+# Renderizador do PDF: 'platypus' (layout completo) ou 'canvas' (desenho direto, mais rápido);
+# o segundo vale para os lotes (ZIP do admin e fila de relatórios)
+PONTO_PDF_MODO = os.environ.get('PONTO_PDF_MODO', 'platypus')
+PONTO_PDF_MODO_LOTE = os.environ.get('PONTO_PDF_MODO_LOTE', PONTO_PDF_MODO)
+
+# Arquivamento mensal de RegistroPonto (manage.py arquivar_registros): meses fechados mantidos na tabela
+# quente além do atual e registros movidos por transação
+PONTO_ARQUIVO_MESES_QUENTES = int(os.environ.get('PONTO_ARQUIVO_MESES_QUENTES', 3))
+PONTO_ARQUIVO_LOTE = int(os.environ.get('PONTO_ARQUIVO_LOTE', 5000))
+
+# Métricas por rota em /metrics (formato do Prometheus, main/metricas.py). Com vários workers,
+# PONTO_METRICAS_DIR é o diretório compartilhado onde cada processo grava as suas séries (o hook
+# on_starting de gunicorn_asgi.py o limpa); vazio = só o processo que atende o /metrics.
+# Com PONTO_METRICAS_TOKEN, o /metrics exige "Authorization: Bearer <token>"
+PONTO_METRICAS_DIR = os.environ.get('PONTO_METRICAS_DIR', '')
+PONTO_METRICAS_INTERVALO_SEGUNDOS = float(os.environ.get('PONTO_METRICAS_INTERVALO_SEGUNDOS', 5))
+PONTO_METRICAS_TOKEN = os.environ.get('PONTO_METRICAS_TOKEN', '')
+
+# Logs da aplicação (main.*) no console; erros das views saem com traceback
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simples': {'format': '{asctime} {levelname} {name} {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simples'},
+    },
+    'loggers': {
+        'main': {'handlers': ['console'], 'level': os.environ.get('PONTO_LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 